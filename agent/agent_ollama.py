@@ -9,6 +9,8 @@ import aiohttp
 import platform
 from pathlib import Path
 
+import protocol
+
 # Load .env.local if present (next to this script, next to the exe, or in parent dir)
 def _load_env_local():
     """Load key=value pairs from .env.local into os.environ (won't overwrite existing vars)."""
@@ -78,54 +80,112 @@ async def verify_token(token: str) -> bool:
         async with aiohttp.ClientSession() as session:
             # We'll test by connecting to WebSocket briefly
             async with session.ws_connect(SERVER_URL, heartbeat=10) as ws:
-                await ws.send_str(json.dumps({
-                    "type": "register",
-                    "node_id": "verify-check",
-                    "auth_token": token,
-                    "gpu_info": {"models": [], "provider": "verify"}
-                }))
+                await ws.send_str(protocol.encode(protocol.Register(
+                    node_id="verify-check",
+                    auth_token=token,
+                    gpu_info={"models": [], "provider": "verify"},
+                )))
                 msg = await asyncio.wait_for(ws.receive(), timeout=5)
                 if msg.type == aiohttp.WSMsgType.TEXT:
-                    data = json.loads(msg.data)
-                    if data.get("type") == "registered":
-                        return True
-                    elif data.get("type") == "auth_error":
-                        return False
+                    reply = protocol.decode_server_message(msg.data)
+                    return isinstance(reply, protocol.Registered)
                 return False
     except Exception:
         return False
 
 
 async def check_ollama_status():
-    """Checks if local Ollama is running and lists models."""
+    """Checks if local Ollama is running and lists models.
+
+    Each model is reported with its size on disk, its quantization and
+    whether it is loaded in memory, for the server's model catalog.
+    """
     try:
         async with aiohttp.ClientSession() as session:
             async with session.get(f"{OLLAMA_URL}/api/tags") as response:
-                if response.status == 200:
-                    data = await response.json()
-                    models = [m['name'] for m in data.get('models', [])]
-                    logger.info(f"Ollama connected. Available models: {models}")
-                    return models
-                else:
+                if response.status != 200:
                     logger.error(f"Ollama returned status {response.status}")
                     return []
+                data = await response.json()
+            loaded = await loaded_ollama_models(session)
     except Exception as e:
         logger.error(f"Could not connect to Ollama at {OLLAMA_URL}: {e}")
         return []
 
+    models = [
+        {
+            "name": m['name'],
+            "size": m.get('size'),
+            "quantization": (m.get('details') or {}).get('quantization_level', ""),
+            "loaded": m['name'] in loaded,
+        }
+        for m in data.get('models', [])
+    ]
+    logger.info(f"Ollama connected. Available models: {[m['name'] for m in models]}")
+    return models
+
+
+async def loaded_ollama_models(session):
+    """Names of the models Ollama currently holds in memory."""
+    try:
+        async with session.get(f"{OLLAMA_URL}/api/ps") as response:
+            if response.status != 200:
+                return set()
+            data = await response.json()
+            return {m['name'] for m in data.get('models', [])}
+    except Exception as e:
+        logger.warning(f"Could not list loaded Ollama models: {e}")
+        return set()
+
+
+class ServerConnection:
+    """WebSocket to the server plus the wire encoding negotiated at register."""
+
+    def __init__(self, ws):
+        self.ws = ws
+        self.encoding = protocol.JSON
+        # Server keeps streamed chunks, so streamed results only carry a digest
+        self.stream_assembly = False
 
-async def execute_task(ws, task_data):
+    async def send(self, msg):
+        """Send a protocol message as a text (JSON) or binary (MessagePack) frame."""
+        data = protocol.encode(msg, self.encoding)
+        if isinstance(data, bytes):
+            await self.ws.send_bytes(data)
+        else:
+            await self.ws.send_str(data)
+
+
+async def send_chunk(conn, task_id, owner_id, chunk_text):
+    """Send one partial response for a streaming task to the server."""
+    await conn.send(protocol.JobStream(
+        result=protocol.StreamChunk(task_id=task_id, owner_id=owner_id, chunk=chunk_text),
+    ))
+
+
+def ollama_eval_stats(data: dict) -> dict:
+    """Token count and generation time (ns) from a final Ollama response."""
+    return {
+        key: data[key] for key in ("eval_count", "eval_duration")
+        if isinstance(data.get(key), int)
+    }
+
+
+async def execute_task(conn, task_data: protocol.JobData):
     """Executes a task on local Ollama, optionally streaming results."""
-    task_id = task_data.get('task_id')
-    owner_id = task_data.get('owner_id')
-    model = task_data.get('model')
-    prompt = task_data.get('prompt')
-    stream = task_data.get('stream', False)
+    task_id = task_data.task_id
+    owner_id = task_data.owner_id
+    model = task_data.model
+    prompt = task_data.prompt
+    stream = task_data.stream
 
     logger.info(f"Executing Task {task_id}: model={model} prompt='{prompt[:50]}...' stream={stream}")
 
     full_response = ""
+    # Generation stats from Ollama's final message, reported with the result
+    stats = {}
     try:
+        await conn.send(protocol.JobAccepted(task_id=task_id))
         async with aiohttp.ClientSession() as session:
             payload = {"model": model, "prompt": prompt, "stream": stream}
             async with session.post(
@@ -155,17 +215,10 @@ async def execute_task(ws, task_data):
 
                                 if chunk_text:
                                     # Send partial chunk to server
-                                    stream_payload = json.dumps({
-                                        "type": "job_stream",
-                                        "result": {
-                                            "task_id": task_id,
-                                            "owner_id": owner_id,
-                                            "chunk": chunk_text
-                                        }
-                                    }, ensure_ascii=False)
-                                    await ws.send_str(stream_payload)
+                                    await send_chunk(conn, task_id, owner_id, chunk_text)
 
                                 if chunk_data.get("done"):
+                                    stats = ollama_eval_stats(chunk_data)
                                     buffer = b""
                                     break
 
@@ -173,49 +226,50 @@ async def execute_task(ws, task_data):
                         if buffer.strip():
                             try:
                                 chunk_data = json.loads(buffer.decode("utf-8"))
+                                stats = ollama_eval_stats(chunk_data)
                                 chunk_text = chunk_data.get("response", "")
                                 full_response += chunk_text
                                 if chunk_text:
-                                    stream_payload = json.dumps({
-                                        "type": "job_stream",
-                                        "result": {
-                                            "task_id": task_id,
-                                            "owner_id": owner_id,
-                                            "chunk": chunk_text
-                                        }
-                                    }, ensure_ascii=False)
-                                    await ws.send_str(stream_payload)
+                                    await send_chunk(conn, task_id, owner_id, chunk_text)
                             except json.JSONDecodeError:
                                 pass
                         
                         logger.info(f"Streaming Task {task_id} Completed. ({len(full_response)} chars)")
-                        return {"status": "success", "response": full_response, "task_id": task_id}
+                        if conn.stream_assembly:
+                            length, sha256 = protocol.stream_digest(full_response)
+                            return protocol.JobOutcome(
+                                task_id=task_id, status="success",
+                                response_length=length, response_sha256=sha256, **stats,
+                            )
+                        return protocol.JobOutcome(task_id=task_id, status="success", response=full_response, **stats)
                     else:
                         result = await response.json()
                         output_text = result.get("response", "")
                         logger.info(f"Task {task_id} Completed. ({len(output_text)} chars)")
-                        return {"status": "success", "response": output_text, "task_id": task_id}
+                        return protocol.JobOutcome(
+                            task_id=task_id, status="success", response=output_text,
+                            **ollama_eval_stats(result),
+                        )
                 else:
                     error_text = await response.text()
                     logger.error(f"Task {task_id} Failed: Ollama {response.status}")
-                    return {"status": "failed", "error": error_text[:500], "task_id": task_id}
+                    return protocol.JobOutcome(task_id=task_id, error=error_text[:500])
     except asyncio.TimeoutError:
         logger.error(f"Task {task_id} timed out (600s)")
-        return {"status": "failed", "error": "Inference timed out after 600s", "task_id": task_id}
+        return protocol.JobOutcome(task_id=task_id, error="Inference timed out after 600s")
     except Exception as e:
         logger.error(f"Task {task_id} Exception: {e}")
-        return {"status": "failed", "error": str(e), "task_id": task_id}
+        return protocol.JobOutcome(task_id=task_id, error=str(e))
 
 
-async def handle_job(ws, job_data):
+async def handle_job(conn, job_data: protocol.JobData):
     """Run a job in the background and send the result back."""
-    result = await execute_task(ws, job_data)
+    result = await execute_task(conn, job_data)
     try:
-        payload = json.dumps({"type": "job_result", "result": result}, ensure_ascii=False)
-        await ws.send_str(payload)
-        logger.info(f"Result for Task {result.get('task_id')} sent successfully")
+        await conn.send(protocol.JobResult(result=result))
+        logger.info(f"Result for Task {result.task_id} sent successfully")
     except Exception as e:
-        logger.error(f"Failed to send result for Task {result.get('task_id')}: {e}")
+        logger.error(f"Failed to send result for Task {result.task_id}: {e}")
 
 
 async def agent_loop(auth_token: str):
@@ -231,39 +285,47 @@ async def agent_loop(auth_token: str):
             async with aiohttp.ClientSession() as session:
                 async with session.ws_connect(SERVER_URL, heartbeat=20) as ws:
                     logger.info(f"Connected to Server at {SERVER_URL}")
+                    conn = ServerConnection(ws)
+                    # Re-read on every connect so the loaded state is current
+                    models = await check_ollama_status() or models
 
                     # Register with agent token
-                    register_msg = {
-                        "type": "register",
-                        "node_id": NODE_ID,
-                        "auth_token": auth_token,
-                        "gpu_info": {
+                    register_msg = protocol.Register(
+                        node_id=NODE_ID,
+                        auth_token=auth_token,
+                        gpu_info={
                             "provider": "Ollama-Local",
                             "models": models,
                             "platform": platform.platform()
-                        }
-                    }
-                    await ws.send_str(json.dumps(register_msg, ensure_ascii=False))
+                        },
+                        encodings=list(protocol.ENCODINGS),
+                    )
+                    await conn.send(register_msg)
 
                     async for msg in ws:
-                        if msg.type == aiohttp.WSMsgType.TEXT:
-                            data = json.loads(msg.data)
-                            msg_type = data.get("type")
-
-                            if msg_type == "registered":
-                                owner = data.get("owner", "unknown")
-                                logger.info(f"✅ Node registered as {NODE_ID} (owner: {owner})")
-                            elif msg_type == "auth_error":
-                                logger.error(f"❌ Token rejected: {data.get('error')}")
+                        if msg.type in (aiohttp.WSMsgType.TEXT, aiohttp.WSMsgType.BINARY):
+                            try:
+                                data = protocol.decode_server_message(msg.data)
+                            except protocol.DecodeError as e:
+                                logger.warning(f"Ignoring malformed server message: {e}")
+                                continue
+
+                            if isinstance(data, protocol.Registered):
+                                conn.encoding = data.encoding
+                                conn.stream_assembly = data.stream_assembly
+                                logger.info(f"✅ Node registered as {NODE_ID} (owner: {data.owner or 'unknown'})")
+                                logger.info(f"Wire encoding: {conn.encoding}")
+                            elif isinstance(data, protocol.AuthError):
+                                logger.error(f"❌ Token rejected: {data.error}")
                                 clear_token()
                                 logger.info("Stored token cleared. Please re-authenticate.")
                                 print("\n  ❌ Authentication failed. Token revoked or invalid.")
                                 input("  Press Enter to exit...")
                                 return
-                            elif msg_type == "job_dispatch":
-                                asyncio.create_task(handle_job(ws, data.get("job_data")))
-                            elif msg_type == "ping":
-                                await ws.send_str(json.dumps({"type": "pong"}))
+                            elif isinstance(data, protocol.JobDispatch):
+                                asyncio.create_task(handle_job(conn, data.job_data))
+                            elif isinstance(data, protocol.Ping):
+                                await conn.send(protocol.Pong())
 
                         elif msg.type == aiohttp.WSMsgType.ERROR:
                             logger.error(f"WebSocket error: {ws.exception()}")
@@ -20,6 +20,7 @@ mkdir dist\gpu-connect-agent-linux
 
 REM Copy files into package
 copy /Y ..\agent_ollama.py       dist\gpu-connect-agent-linux\ >nul
+copy /Y ..\protocol.py           dist\gpu-connect-agent-linux\ >nul
 copy /Y requirements.txt         dist\gpu-connect-agent-linux\ >nul
 copy /Y install.sh               dist\gpu-connect-agent-linux\ >nul
 copy /Y uninstall.sh             dist\gpu-connect-agent-linux\ >nul
@@ -25,6 +25,7 @@ mkdir -p "$BUILD_DIR/$PKG_NAME"
 
 # Copy files into package
 cp "$AGENT_DIR/agent_ollama.py"    "$BUILD_DIR/$PKG_NAME/"
+cp "$AGENT_DIR/protocol.py"        "$BUILD_DIR/$PKG_NAME/"
 cp "$SCRIPT_DIR/requirements.txt"  "$BUILD_DIR/$PKG_NAME/"
 cp "$SCRIPT_DIR/install.sh"        "$BUILD_DIR/$PKG_NAME/"
 cp "$SCRIPT_DIR/uninstall.sh"      "$BUILD_DIR/$PKG_NAME/"
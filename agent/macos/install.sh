@@ -49,6 +49,7 @@ echo ""
 echo "  [1/5] Setting up install directory..."
 mkdir -p "$INSTALL_DIR"
 cp agent_ollama.py "$INSTALL_DIR/"
+cp protocol.py "$INSTALL_DIR/"
 cp requirements.txt "$INSTALL_DIR/"
 echo "  ✅ Agent files copied to $INSTALL_DIR"
 
@@ -0,0 +1 @@
+"""Standalone micro-benchmarks; run modules with ``python -m benchmarks.<name>``."""
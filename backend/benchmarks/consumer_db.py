@@ -0,0 +1,176 @@
+"""Per-message cost of the consumers' read/write helpers.
+
+Compares the previous ``database_sync_to_async``-wrapped sync ORM helpers
+with the async ORM versions now in ``computing.consumers``. For each case it
+reports the mean latency of one call made in isolation, and the throughput
+reached when ``concurrency`` calls are in flight at once, as happens when
+many dashboards connect together.
+
+Runs against a throwaway test database created from the configured one.
+
+Usage (from ``backend/``)::
+
+    python -m benchmarks.consumer_db [iterations] [concurrency]
+"""
+import asyncio
+import os
+import sys
+import time
+from decimal import Decimal
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+django.setup()
+
+# pylint: disable=wrong-import-position
+from asgiref.sync import sync_to_async
+from django.db import connection
+from django.test.utils import setup_test_environment
+
+from computing import consumers
+from computing.models import Job, Node
+from core.executor import database_sync_to_async
+from core.models import User
+
+
+def _old_aggregate_models(gpu_infos):
+    model_counts = {}
+    for info in gpu_infos:
+        for m in (info or {}).get("models", []):
+            name = m.get("name") if isinstance(m, dict) else m
+            if name:
+                model_counts[name] = model_counts.get(name, 0) + 1
+    return [{"name": k, "providers": v} for k, v in model_counts.items()]
+
+
+@database_sync_to_async
+def _old_snapshot():
+    cutoff = consumers.timezone.now() - consumers.NODE_STALE_THRESHOLD
+    Node.objects.filter(is_active=True, last_heartbeat__lt=cutoff).update(is_active=False)
+    active_nodes = Node.objects.filter(is_active=True).count()
+    completed_jobs = Job.objects.filter(status="COMPLETED").count()
+    models = _old_aggregate_models(
+        node.gpu_info for node in Node.objects.filter(is_active=True)
+    )
+    return {
+        "active_nodes": active_nodes,
+        "completed_jobs": completed_jobs,
+        "available_models": len(models),
+    }, models
+
+
+@database_sync_to_async
+def _old_balance(user_id):
+    try:
+        return User.objects.get(id=user_id).wallet_balance
+    except User.DoesNotExist:
+        return Decimal("0.00")
+
+
+@database_sync_to_async
+def _old_recent_jobs(user_id):
+    return [
+        {
+            "id": job.id,
+            "session_id": str(job.session_id) if job.session_id else None,
+            "status": job.status,
+            "prompt": job.input_data.get("prompt", ""),
+            "model": job.input_data.get("model", ""),
+            "cost": str(job.cost) if job.cost else None,
+            "result": job.result,
+            "created_at": str(job.created_at),
+            "completed_at": str(job.completed_at) if job.completed_at else None,
+        }
+        for job in Job.objects.filter(user_id=user_id).order_by("-created_at")[:10]
+    ]
+
+
+@database_sync_to_async
+def _old_mark_inactive(node_id):
+    Node.objects.filter(node_id=node_id).update(is_active=False)
+
+
+def _seed():
+    owner = User.objects.create_user(
+        username="bench", password="x", wallet_balance=Decimal("100.00"),
+    )
+    for i in range(20):
+        Node.objects.create(
+            owner=owner, node_id=f"bench-{i}", name=f"Node {i}", is_active=True,
+            gpu_info={"models": ["llama3", {"name": f"model-{i % 5}"}]},
+        )
+    Job.objects.bulk_create([
+        Job(
+            user=owner, status="COMPLETED", model="llama3", prompt_preview="hi",
+            input_data={"prompt": "hi", "model": "llama3"},
+        )
+        for _ in range(200)
+    ])
+    return owner.id
+
+
+def _cases(user_id):
+    dashboard = consumers.DashboardConsumer()
+    gpu = consumers.GPUConsumer()
+    return [
+        ("network snapshot", _old_snapshot,
+         consumers._network_snapshot),  # pylint: disable=protected-access
+        ("wallet balance", lambda: _old_balance(user_id),
+         lambda: dashboard._get_balance(user_id)),  # pylint: disable=protected-access
+        ("recent jobs", lambda: _old_recent_jobs(user_id),
+         lambda: dashboard._get_recent_jobs(user_id)),  # pylint: disable=protected-access
+        ("mark node inactive", lambda: _old_mark_inactive("bench-0"),
+         lambda: gpu._mark_node_inactive("bench-0")),  # pylint: disable=protected-access
+    ]
+
+
+async def _latency_us(call, iterations):
+    await call()  # warm up
+    started = time.perf_counter()
+    for _ in range(iterations):
+        await call()
+    return (time.perf_counter() - started) / iterations * 1e6
+
+
+async def _throughput(call, iterations, concurrency):
+    async def worker(count):
+        for _ in range(count):
+            await call()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(iterations // concurrency) for _ in range(concurrency)))
+    done = iterations // concurrency * concurrency
+    return done / (time.perf_counter() - started)
+
+
+async def _run(iterations, concurrency):
+    user_id = await sync_to_async(_seed)()
+    print(f"{'case':<22}{'sync hop (us)':>15}{'async ORM (us)':>16}"
+          f"{'sync hop (msg/s)':>18}{'async ORM (msg/s)':>19}")
+    for name, old, new in _cases(user_id):
+        print(
+            f"{name:<22}"
+            f"{await _latency_us(old, iterations):>15.0f}"
+            f"{await _latency_us(new, iterations):>16.0f}"
+            f"{await _throughput(old, iterations, concurrency):>18.0f}"
+            f"{await _throughput(new, iterations, concurrency):>19.0f}"
+        )
+
+
+def main(iterations=500, concurrency=20):
+    """Print latency and throughput for each helper, old and new."""
+    setup_test_environment()
+    old_name = connection.settings_dict["NAME"]
+    connection.creation.create_test_db(verbosity=0)
+    try:
+        asyncio.run(_run(iterations, concurrency))
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 500,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 20,
+    )
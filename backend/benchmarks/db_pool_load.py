@@ -0,0 +1,139 @@
+"""Database connection counts under sustained WebSocket load.
+
+Opens ``clients`` authenticated dashboard sockets and has each send
+``subscribe_provider_stats`` requests, every one of which runs queries
+through ``database_sync_to_async``. A sampler records, every 50 ms, how
+many Django connection wrappers hold an open connection and, when the
+database is pooled, the pool's own size and waiting-request count. Under
+ASGI without a pool the held count grows with the number of threads that
+ever ran a query; with a pool it stays at or below ``DB_POOL_MAX_SIZE``.
+
+Runs against a throwaway test database created from the configured one, so
+point ``DATABASE_URL`` at Postgres to exercise the pool, and set
+``DB_EXECUTOR_THREADS`` to size the consumer executor.
+
+Usage (from ``backend/``)::
+
+    python -m benchmarks.db_pool_load [clients] [messages_per_client]
+"""
+import asyncio
+import json
+import os
+import sys
+import time
+import weakref
+from decimal import Decimal
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+django.setup()
+
+# pylint: disable=wrong-import-position
+from asgiref.sync import sync_to_async
+from channels.testing import WebsocketCommunicator
+from django.conf import settings
+from django.db import connection
+from django.db.backends.signals import connection_created
+from django.test.utils import setup_test_environment
+from rest_framework_simplejwt.tokens import AccessToken
+
+from computing.consumers import DashboardConsumer
+from core.models import User
+
+_wrappers = weakref.WeakSet()
+
+
+def _track(sender, connection, **kwargs):  # pylint: disable=redefined-outer-name,unused-argument
+    _wrappers.add(connection)
+
+
+def _held():
+    return sum(1 for wrapper in list(_wrappers) if wrapper.connection is not None)
+
+
+def _pool_stats():
+    pool = getattr(connection, "pool", None)
+    return pool.get_stats() if pool is not None else None
+
+
+def _seed(clients):
+    tokens = []
+    for i in range(clients):
+        user = User.objects.create_user(
+            username=f"load{i}", password="x", wallet_balance=Decimal("10.00"),
+        )
+        tokens.append(str(AccessToken.for_user(user)))
+    return tokens
+
+
+async def _receive_until(communicator, msg_type):
+    while True:
+        data = json.loads(await communicator.receive_from(timeout=30))
+        if data.get("type") == msg_type:
+            return data
+
+
+async def _client(token, messages):
+    communicator = WebsocketCommunicator(
+        DashboardConsumer.as_asgi(), f"/ws/dashboard/?token={token}",
+    )
+    await communicator.connect()
+    await _receive_until(communicator, "provider_stats_update")
+    request = json.dumps({"type": "subscribe_provider_stats", "days": 30})
+    for _ in range(messages):
+        await communicator.send_to(text_data=request)
+        await _receive_until(communicator, "provider_stats_update")
+    await communicator.disconnect()
+
+
+async def _sample(samples, stop):
+    while not stop.is_set():
+        stats = _pool_stats() or {}
+        samples.append((
+            _held(), stats.get("pool_size"), stats.get("requests_waiting"),
+        ))
+        await asyncio.sleep(0.05)
+
+
+async def _run(clients, messages):
+    tokens = await sync_to_async(_seed)(clients)
+    samples = []
+    stop = asyncio.Event()
+    sampler = asyncio.ensure_future(_sample(samples, stop))
+    started = time.perf_counter()
+    await asyncio.gather(*(_client(token, messages) for token in tokens))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await sampler
+
+    held = [s[0] for s in samples]
+    print(f"engine                 {connection.vendor}")
+    print(f"DB_EXECUTOR_THREADS    {settings.DB_EXECUTOR_THREADS}")
+    print(f"messages               {clients * messages} from {clients} sockets")
+    print(f"throughput             {clients * messages / elapsed:.0f} msg/s")
+    print(f"held connections       peak {max(held)}, last {held[-1]}")
+    sizes = [s[1] for s in samples if s[1] is not None]
+    if sizes:
+        waiting = max(s[2] or 0 for s in samples)
+        print(f"pool size              peak {max(sizes)} of max {settings.DB_POOL_MAX_SIZE}")
+        print(f"pool requests waiting  peak {waiting}")
+
+
+def main(clients=50, messages=40):
+    """Drive the dashboard sockets and print connection-count statistics."""
+    connection_created.connect(_track)
+    setup_test_environment()
+    old_name = connection.settings_dict["NAME"]
+    connection.creation.create_test_db(verbosity=0)
+    try:
+        asyncio.run(_run(clients, messages))
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 50,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 40,
+    )
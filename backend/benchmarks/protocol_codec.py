@@ -0,0 +1,115 @@
+"""Encode/decode cost per message on the agent stream path.
+
+Compares the previous ``json.loads`` + ``dict.get`` handling with the typed
+msgspec codec in ``computing.protocol``, over JSON text frames and over the
+negotiated MessagePack binary frames.
+
+Usage (from ``backend/``)::
+
+    python -m benchmarks.protocol_codec [iterations]
+"""
+import json
+import sys
+import timeit
+
+from computing import protocol
+
+STREAM_FRAME = json.dumps({
+    "type": "job_stream",
+    "result": {"task_id": 12345, "owner_id": 678, "chunk": " the quick brown"},
+}, ensure_ascii=False)
+
+RESULT_FRAME = json.dumps({
+    "type": "job_result",
+    "result": {
+        "task_id": 12345, "status": "success",
+        "response": "lorem ipsum dolor sit amet " * 200,
+    },
+}, ensure_ascii=False)
+
+STREAM_MSG = protocol.decode_agent_message(STREAM_FRAME)
+RESULT_MSG = protocol.decode_agent_message(RESULT_FRAME)
+STREAM_PACKED = protocol.encode(STREAM_MSG, protocol.MSGPACK)
+RESULT_PACKED = protocol.encode(RESULT_MSG, protocol.MSGPACK)
+
+
+def _json_decode_stream():
+    data = json.loads(STREAM_FRAME)
+    result = data.get("result", {})
+    return data.get("type"), result.get("task_id"), result.get("owner_id"), result.get("chunk", "")
+
+
+def _msgspec_decode_stream():
+    msg = protocol.decode_agent_message(STREAM_FRAME)
+    return msg.result.task_id, msg.result.owner_id, msg.result.chunk
+
+
+def _json_encode_stream():
+    return json.dumps({
+        "type": "job_stream",
+        "result": {"task_id": 12345, "owner_id": 678, "chunk": " the quick brown"},
+    }, ensure_ascii=False)
+
+
+def _msgspec_encode_stream():
+    return protocol.encode(protocol.JobStream(
+        result=protocol.StreamChunk(task_id=12345, owner_id=678, chunk=" the quick brown"),
+    ))
+
+
+def _msgpack_decode_stream():
+    msg = protocol.decode_agent_message(STREAM_PACKED)
+    return msg.result.task_id, msg.result.owner_id, msg.result.chunk
+
+
+def _msgpack_encode_stream():
+    return protocol.encode(protocol.JobStream(
+        result=protocol.StreamChunk(task_id=12345, owner_id=678, chunk=" the quick brown"),
+    ), protocol.MSGPACK)
+
+
+def _json_decode_result():
+    data = json.loads(RESULT_FRAME)
+    return data.get("result", {}).get("response", "")
+
+
+def _msgspec_decode_result():
+    return protocol.decode_agent_message(RESULT_FRAME).result.response
+
+
+def _msgpack_decode_result():
+    return protocol.decode_agent_message(RESULT_PACKED).result.response
+
+
+CASES = [
+    ("decode job_stream", _json_decode_stream, _msgspec_decode_stream, _msgpack_decode_stream),
+    ("encode job_stream", _json_encode_stream, _msgspec_encode_stream, _msgpack_encode_stream),
+    ("decode job_result (5 KB)", _json_decode_result, _msgspec_decode_result, _msgpack_decode_result),
+]
+
+
+def _per_call_ns(func, iterations):
+    best = min(timeit.repeat(func, number=iterations, repeat=5))
+    return best / iterations * 1e9
+
+
+def main(iterations=100_000):
+    """Print per-message cost for each case, best of five runs."""
+    print(f"{'case':<26}{'json (ns)':>12}{'msgspec (ns)':>14}{'msgpack (ns)':>14}")
+    for name, baseline, typed, packed in CASES:
+        print(
+            f"{name:<26}{_per_call_ns(baseline, iterations):>12.0f}"
+            f"{_per_call_ns(typed, iterations):>14.0f}"
+            f"{_per_call_ns(packed, iterations):>14.0f}"
+        )
+    print()
+    print(f"{'frame size (bytes)':<26}{'json':>12}{'msgpack':>14}")
+    for name, text, packed in (
+        ("job_stream", STREAM_FRAME, STREAM_PACKED),
+        ("job_result", RESULT_FRAME, RESULT_PACKED),
+    ):
+        print(f"{name:<26}{len(text.encode()):>12}{len(packed):>14}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
@@ -0,0 +1,123 @@
+"""Per-job cost of settling completed jobs.
+
+Compares the previous settlement, one transaction of ORM calls per job,
+with the batched writer in ``computing.settlement``. For each level of
+``concurrency`` (completions in flight at once, as when many nodes
+finish together) it reports completions settled per second and the
+mean wall time per completion.
+
+Runs against a throwaway test database created from the configured one.
+
+Usage (from ``backend/``)::
+
+    python -m benchmarks.settlement [jobs] [concurrency ...]
+"""
+import asyncio
+import os
+import sys
+import time
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+django.setup()
+
+# pylint: disable=wrong-import-position
+from asgiref.sync import sync_to_async
+from django.db import connection, transaction
+from django.test.utils import setup_test_environment
+from django.utils import timezone
+
+from computing import consumers
+from computing.models import Job, Node
+from computing.settlement import SettlementQueue
+from core.executor import database_sync_to_async
+from core.models import User
+from payments.models import CreditLog
+from payments.services import CreditService
+
+
+@database_sync_to_async
+def _old_complete_job(task_id, result_data, provider_user_id, lifecycle):
+    job = Job.objects.get(id=task_id)
+    job.status = "COMPLETED"
+    job.result = result_data
+    job.completed_at = timezone.now()
+    job.cost = consumers.JOB_COST
+    consumers._apply_lifecycle(job, lifecycle)  # pylint: disable=protected-access
+    job.save()
+    provider = User.objects.get(id=provider_user_id)
+    with transaction.atomic():
+        CreditService.credit(provider, consumers.PROVIDER_SHARE)
+        CreditLog.record(
+            provider, amount=consumers.PROVIDER_SHARE,
+            description=f"Earned: Job #{task_id} completed (model: {job.model})",
+        )
+
+
+def _seed(count):
+    consumer = User.objects.create_user(username=f"bench-c{time.time_ns()}", password="x")
+    providers = [
+        User.objects.create_user(username=f"bench-p{i}-{time.time_ns()}", password="x")
+        for i in range(8)
+    ]
+    for i, provider in enumerate(providers):
+        Node.objects.get_or_create(
+            node_id=f"bench-{i}", defaults={"owner": provider, "name": f"Node {i}"},
+        )
+    jobs = Job.objects.bulk_create([
+        Job(
+            user=consumer, status="RUNNING", model="llama3", prompt_preview="hi",
+            input_data={"prompt": "hi", "model": "llama3"},
+        )
+        for _ in range(count)
+    ])
+    return [
+        (job.id, providers[i % len(providers)].id, f"bench-{i % len(providers)}")
+        for i, job in enumerate(jobs)
+    ]
+
+
+async def _run_case(settle, count, concurrency):
+    work = await sync_to_async(_seed)(count)
+    lifecycle = {"eval_count": 100}
+
+    async def worker(items):
+        for task_id, provider_id, node_id in items:
+            await settle(
+                task_id, {"output": "done"}, provider_id, {**lifecycle, "node_id": node_id},
+            )
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(work[i::concurrency]) for i in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return count / elapsed, elapsed / count * 1e6
+
+
+async def _run(count, levels):
+    queue = SettlementQueue(consumers.JOB_COST, consumers.PROVIDER_SHARE)
+    print(f"{'in flight':>9}{'per-job (jobs/s)':>18}{'batched (jobs/s)':>18}"
+          f"{'per-job (us/job)':>18}{'batched (us/job)':>18}")
+    for concurrency in levels:
+        old_rate, old_us = await _run_case(_old_complete_job, count, concurrency)
+        new_rate, new_us = await _run_case(queue.settle, count, concurrency)
+        print(f"{concurrency:>9}{old_rate:>18.0f}{new_rate:>18.0f}"
+              f"{old_us:>18.0f}{new_us:>18.0f}")
+
+
+def main(count=2000, levels=(1, 10, 100, 500)):
+    """Print throughput and time per completion, old and new."""
+    setup_test_environment()
+    old_name = connection.settings_dict["NAME"]
+    connection.creation.create_test_db(verbosity=0)
+    try:
+        asyncio.run(_run(count, levels))
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 2000,
+        tuple(int(a) for a in sys.argv[2:]) or (1, 10, 100, 500),
+    )
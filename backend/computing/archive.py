@@ -0,0 +1,60 @@
+"""Move finished jobs past the retention window into :class:`ArchivedJob`.
+
+Archiving keeps the ``Job`` table to the jobs still worth indexing in
+full. Counters that cover all time add the archive's rows back in, and
+``JobDetailView`` restores an archived job on request.
+"""
+import datetime
+import logging
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import ArchivedJob, Job
+
+logger = logging.getLogger(__name__)
+
+FINISHED_STATUSES = ("COMPLETED", "FAILED")
+
+
+def archive_cutoff(days=None):
+    """Return the completion time before which jobs are archived, or None."""
+    days = settings.JOB_RETENTION_DAYS if days is None else days
+    if days <= 0:
+        return None
+    return timezone.now() - datetime.timedelta(days=days)
+
+
+def archivable_jobs(cutoff):
+    """Finished jobs completed before ``cutoff``, oldest first."""
+    return Job.objects.filter(
+        status__in=FINISHED_STATUSES, completed_at__lt=cutoff,
+    ).order_by("completed_at", "id")
+
+
+def archive_jobs(days=None, batch_size=None, limit=None):
+    """Archive finished jobs older than ``days``; return how many moved.
+
+    Each batch is copied and deleted in one transaction, so a job is
+    always in exactly one of the two tables. A job already present in the
+    archive raises ``IntegrityError`` and rolls its batch back rather than
+    deleting a live row whose copy was not written.
+    """
+    cutoff = archive_cutoff(days)
+    if cutoff is None:
+        return 0
+    batch_size = batch_size or settings.JOB_ARCHIVE_BATCH_SIZE
+    moved = 0
+    while limit is None or moved < limit:
+        size = batch_size if limit is None else min(batch_size, limit - moved)
+        with transaction.atomic():
+            jobs = list(archivable_jobs(cutoff).select_for_update(skip_locked=True)[:size])
+            if not jobs:
+                break
+            ArchivedJob.objects.bulk_create([ArchivedJob.from_job(job) for job in jobs])
+            Job.objects.filter(id__in=[job.id for job in jobs]).delete()
+        moved += len(jobs)
+    if moved:
+        logger.info("Archived %d job(s) completed before %s", moved, cutoff)
+    return moved
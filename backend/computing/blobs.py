@@ -0,0 +1,83 @@
+"""Content-addressed, zstd-compressed storage for large job results.
+
+A result whose JSON encoding reaches ``JOB_RESULT_BLOB_THRESHOLD`` bytes
+is written to the ``job_results`` storage (see ``STORAGES``) under the
+SHA-256 of that encoding, so identical outputs are stored once.
+``Job.result`` then holds only a reference::
+
+    {"blob": {"sha256": "<hex digest>", "size": <uncompressed bytes>}}
+
+Lists return the reference as-is; detail reads call :func:`load_result`
+or stream the document with :func:`stream_result`.
+"""
+import hashlib
+import json
+
+import zstandard
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import storages
+
+STORAGE_ALIAS = "job_results"
+# Bytes per chunk when streaming a blob back
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+def _storage():
+    return storages[STORAGE_ALIAS]
+
+
+def blob_name(digest):
+    """Return the storage name of the blob with SHA-256 ``digest``."""
+    return f"results/{digest[:2]}/{digest}.json.zst"
+
+
+def is_reference(result):
+    """Whether ``result`` is a blob reference rather than the result itself."""
+    return (
+        isinstance(result, dict) and len(result) == 1
+        and isinstance(result.get("blob"), dict) and "sha256" in result["blob"]
+    )
+
+
+def offload_result(result):
+    """Return ``result``, or a reference to it once it is in the blob store.
+
+    Results under the threshold, ``None`` and existing references are
+    returned unchanged. A threshold of 0 disables offloading.
+    """
+    threshold = settings.JOB_RESULT_BLOB_THRESHOLD
+    if result is None or threshold <= 0 or is_reference(result):
+        return result
+    raw = json.dumps(result, separators=(",", ":")).encode()
+    if len(raw) < threshold:
+        return result
+    digest = hashlib.sha256(raw).hexdigest()
+    name = blob_name(digest)
+    storage = _storage()
+    if not storage.exists(name):
+        storage.save(name, ContentFile(zstandard.ZstdCompressor().compress(raw)))
+    return {"blob": {"sha256": digest, "size": len(raw)}}
+
+
+def load_result(result):
+    """Return ``result`` with a blob reference replaced by its document."""
+    if not is_reference(result):
+        return result
+    with _storage().open(blob_name(result["blob"]["sha256"]), "rb") as fh:
+        return json.loads(zstandard.ZstdDecompressor().stream_reader(fh).read())
+
+
+def stream_result(result):
+    """Yield the JSON encoding of ``result`` in chunks.
+
+    A referenced blob is decompressed as it is read, so it is never held
+    in memory whole.
+    """
+    if not is_reference(result):
+        yield json.dumps(result).encode()
+        return
+    with _storage().open(blob_name(result["blob"]["sha256"]), "rb") as fh:
+        yield from zstandard.ZstdDecompressor().read_to_iter(
+            fh, read_size=STREAM_CHUNK_SIZE, write_size=STREAM_CHUNK_SIZE,
+        )
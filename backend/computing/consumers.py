@@ -5,38 +5,123 @@ import logging
 from datetime import timedelta
 from decimal import Decimal
 
-from channels.db import database_sync_to_async
+from asgiref.sync import sync_to_async
 from channels.generic.websocket import AsyncWebsocketConsumer
+from django.db.models import Count
 from django.utils import timezone
 
+from core.db_router import mark_written, read_from_replica
+from core.executor import database_sync_to_async
+from core.loop_monitor import loop_monitor
+from core.metrics import (
+    DASHBOARD_CONSUMERS,
+    GPU_CONSUMERS,
+    JOB_FIRST_TOKEN,
+    JOB_LATENCY,
+    JOBS_COMPLETED,
+    JOBS_FAILED,
+)
+
+from . import protocol
+from .blobs import is_reference, load_result, offload_result
+from .inflight import InFlightJobs
+from .outbound import OUTBOUND_OVERFLOW_CLOSE_CODE, OutboundOverflow, OutboundQueue
+from .presence import presence
+from .settlement import SettlementQueue
+from .streaming import (
+    STREAM_RESUME_LIMIT,
+    STREAM_RESUME_TIMEOUT,
+    StreamAggregator,
+    replay_group,
+)
+
 logger = logging.getLogger(__name__)
 
 JOB_COST = Decimal("1.00")
 PROVIDER_SHARE = Decimal("1.00")
 
+# Completed jobs are settled in batches by one writer per event loop
+settlement = SettlementQueue(JOB_COST, PROVIDER_SHARE)
+
 # Nodes with no heartbeat for this long are auto-marked inactive
 NODE_STALE_THRESHOLD = timedelta(seconds=45)
 
 
-def _cleanup_stale_nodes():
+def _advertised_models(gpu_info):
+    """Return the model names in a node's ``gpu_info``."""
+    from .models import NodeModel  # pylint: disable=import-outside-toplevel
+    entries = (gpu_info or {}).get("models") or []
+    return {fields["model_name"] for fields in map(NodeModel.parse, entries) if fields}
+
+
+def _revocation_group(auth_token):
+    """Channel-layer group announcing the revocation of an agent token."""
+    from core.models import AgentToken  # pylint: disable=import-outside-toplevel
+    return AgentToken.revocation_group(AgentToken.hash_token(auth_token))
+
+
+def _apply_lifecycle(job, lifecycle):
+    """Copy lifecycle timestamps, token counts and the serving node onto a job."""
+    from .models import Node  # pylint: disable=import-outside-toplevel
+    for field, value in (lifecycle or {}).items():
+        if value is None:
+            continue
+        if field == "node_id":
+            job.node = Node.objects.filter(node_id=value).first()
+        else:
+            setattr(job, field, value)
+
+
+async def _cleanup_stale_nodes():
     """Mark nodes inactive if their last heartbeat is older than threshold."""
     from .models import Node  # pylint: disable=import-outside-toplevel
     cutoff = timezone.now() - NODE_STALE_THRESHOLD
     stale = Node.objects.filter(is_active=True, last_heartbeat__lt=cutoff)
-    count = stale.update(is_active=False)
+    count = await stale.aupdate(is_active=False)
     if count:
         logger.info("Marked %d stale node(s) inactive (no heartbeat since %s)", count, cutoff)
 
 
+async def _available_models():
+    """Count, per model name, the active nodes serving it."""
+    from .models import NodeModel  # pylint: disable=import-outside-toplevel
+    rows = NodeModel.objects.filter(node__is_active=True).values(
+        "model_name",
+    ).annotate(providers=Count("id")).order_by("model_name")
+    return [{"name": row["model_name"], "providers": row["providers"]} async for row in rows]
+
+
+async def _network_snapshot():
+    """Return ``(stats, models)`` for the dashboards: active nodes, completed
+    jobs and the models available across active nodes."""
+    from .models import ArchivedJob, Node, Job  # pylint: disable=import-outside-toplevel
+    await _cleanup_stale_nodes()
+    models = await _available_models()
+    stats = {
+        "active_nodes": await Node.objects.filter(is_active=True).acount(),
+        "completed_jobs": (
+            await Job.objects.filter(status="COMPLETED").acount()
+            + await ArchivedJob.objects.filter(status="COMPLETED").acount()
+        ),
+        "available_models": len(models),
+    }
+    return stats, models
+
+
 class GPUConsumer(AsyncWebsocketConsumer):
     """Handles GPU provider node WebSocket connections and job dispatching."""
+    group_name = "gpu_nodes"
 
     async def connect(self):
         """Accept the WebSocket and start keep-alive pings."""
+        GPU_CONSUMERS.inc()
+        loop_monitor.ensure_running()
         self.node_id = "unknown"
         self.provider_user_id = None
         self.auth_token = None
-        self.group_name = "gpu_nodes"
+        self.encoding = protocol.JSON
+        self._stream = StreamAggregator(self._send_stream_frame)
+        self._inflight = InFlightJobs()
         await self.channel_layer.group_add(
             self.group_name,
             self.channel_name
@@ -47,8 +132,7 @@ class GPUConsumer(AsyncWebsocketConsumer):
 
     async def _broadcast_dashboard_update(self):
         """Trigger a recalculation and broadcast to dashboard consumers."""
-        stats = await self._get_stats()
-        models = await self._get_models()
+        stats, models = await _network_snapshot()
 
         await self.channel_layer.group_send(
             "dashboard_updates",
@@ -71,84 +155,58 @@ class GPUConsumer(AsyncWebsocketConsumer):
             }
         )
 
-    # Re-use the logic from DashboardConsumer
-    @database_sync_to_async
-    def _get_stats(self):
-        """Return network stats: active nodes, completed jobs, model count."""
-        from .models import Node, Job  # pylint: disable=import-outside-toplevel
-        _cleanup_stale_nodes()
-        active_nodes = Node.objects.filter(is_active=True).count()
-        completed_jobs = Job.objects.filter(status="COMPLETED").count()
-        models = self._get_models_sync_shared()
-        return {
-            "active_nodes": active_nodes,
-            "completed_jobs": completed_jobs,
-            "available_models": len(models)
-        }
-
-    @database_sync_to_async
-    def _get_models(self):
-        """Return available models aggregated from active nodes."""
-        _cleanup_stale_nodes()
-        return self._get_models_sync_shared()
-
-    def _get_models_sync_shared(self):
-        """Synchronous helper: aggregate model counts from active nodes."""
-        from .models import Node  # pylint: disable=import-outside-toplevel
-        nodes = Node.objects.filter(is_active=True)
-        model_counts = {}
-        for node in nodes:
-            info = node.gpu_info or {}
-            node_models = info.get("models", [])
-            for m in node_models:
-                if isinstance(m, dict):
-                    name = m.get("name")
-                else:
-                    name = m
-                if name:
-                    model_counts[name] = model_counts.get(name, 0) + 1
-        return [{"name": k, "providers": v} for k, v in model_counts.items()]
-
     async def _keep_alive(self):
-        """Send periodic pings and RE-VALIDATE token to handle revocation."""
+        """Send periodic pings.
+
+        Token revocation is pushed via ``token_revoked`` rather than polled.
+        """
         try:
             while True:
                 await asyncio.sleep(15)
-
-                # Re-validate token if we are registered
-                if self.auth_token:
-                    user_id = await self._validate_token(self.auth_token)
-                    if not user_id:
-                        logger.warning(
-                            "Token revoked for node %s. Disconnecting.",
-                            self.node_id,
-                        )
-                        await self.send(json.dumps({
-                            "type": "auth_error",
-                            "error": "Token revoked or expired."
-                        }, ensure_ascii=False))
-                        await self.close()
-                        return
-
-                # Update node's last_heartbeat to keep it active
-                if self.node_id != "unknown":
-                    await self._touch_node_heartbeat(self.node_id)
-
-                await self.send(json.dumps(
-                    {"type": "ping"}, ensure_ascii=False,
-                ))
+                await self._send_message(protocol.Ping())
         except Exception:  # pylint: disable=broad-except
             pass
 
+    async def token_revoked(self, event):  # pylint: disable=unused-argument
+        """Close the connection as soon as the agent's token is revoked."""
+        logger.warning(
+            "Token revoked for node %s. Disconnecting.", self.node_id,
+        )
+        await self._send_message(protocol.AuthError(
+            error="Token revoked or expired.",
+        ))
+        await self.close()
+
     async def disconnect(self, close_code):
         """Clean up on WebSocket disconnect."""
         logger.info("WebSocket Disconnected: %s", close_code)
+        GPU_CONSUMERS.dec()
         if hasattr(self, '_ping_task'):
             self._ping_task.cancel()
+        if hasattr(self, '_stream'):
+            streaming = list(self._stream)
+            # Keep what was streamed for jobs whose final result never came
+            for task_id in streaming:
+                text = self._stream.text(task_id)
+                if text:
+                    await self._save_partial_output(task_id, text)
+            await self._stream.close()
+            for task_id in streaming:
+                await self.channel_layer.group_discard(
+                    replay_group(task_id),
+                    self.channel_name
+                )
         await self.channel_layer.group_discard(
             self.group_name,
             self.channel_name
         )
+        if getattr(self, 'auth_token', None):
+            await self.channel_layer.group_discard(
+                _revocation_group(self.auth_token),
+                self.channel_name
+            )
+        if getattr(self, 'provider_user_id', None):
+            presence.disconnect(self.node_id)
         if self.node_id != "unknown":
             await self._mark_node_inactive(self.node_id)
             await self._broadcast_dashboard_update()
@@ -161,107 +219,205 @@ class GPUConsumer(AsyncWebsocketConsumer):
                     }
                 )
 
-    async def receive(self, text_data):
-        """Route incoming WebSocket messages by type."""
-        data = json.loads(text_data)
-        msg_type = data.get("type")
-
-        if msg_type == "register":
-            self.node_id = data.get("node_id")
-            gpu_info = data.get("gpu_info")
-            auth_token = data.get("auth_token")
-
-            # Validate JWT and get user
-            user_id = await self._validate_token(auth_token)
-            if not user_id:
-                await self.send(json.dumps({
-                    "type": "auth_error",
-                    "error": "Invalid or expired token. Please re-login."
-                }, ensure_ascii=False))
-                await self.close()
-                return
-
-            self.auth_token = auth_token
-            self.provider_user_id = user_id
-            logger.info(
-                "Registering Node: %s (user_id=%s)", self.node_id, user_id,
+    async def receive(self, text_data=None, bytes_data=None):
+        """Decode an agent frame (JSON text or MessagePack binary) and route it."""
+        try:
+            msg = protocol.decode_agent_message(
+                text_data if text_data is not None else bytes_data
             )
+        except protocol.DecodeError as e:
+            logger.warning("Dropping malformed agent message from %s: %s", self.node_id, e)
+            return
 
-            username = await self._register_node(self.node_id, gpu_info, user_id)
-            await self.send(json.dumps({
-                "type": "registered",
-                "status": "ok",
-                "owner": username
-            }, ensure_ascii=False))
-            await self._broadcast_dashboard_update()
-            await self.channel_layer.group_send(
-                f"user_{user_id}",
-                {
-                    "type": "dashboard_update",
-                    "data": {"type": "refresh_provider_stats"}
-                }
+        if isinstance(msg, protocol.Register):
+            await self._handle_register(msg)
+        elif isinstance(msg, protocol.JobAccepted):
+            self._handle_job_accepted(msg)
+        elif isinstance(msg, protocol.JobResult):
+            await self._handle_job_result(msg.result)
+        elif isinstance(msg, protocol.JobStream):
+            await self._handle_job_stream(msg.result)
+
+    async def _handle_register(self, msg):
+        """Authenticate the agent and register its node."""
+        auth_token = msg.auth_token
+
+        # Validate the agent token and get user
+        agent_token = await self._validate_token(auth_token)
+        if not agent_token:
+            await self._send_message(protocol.AuthError(
+                error="Invalid or expired token. Please re-login.",
+            ))
+            await self.close()
+            return
+        user_id = agent_token.user_id
+
+        # Heartbeats are written in bulk by the presence flusher; a
+        # re-registering agent gives up the slot of the node it replaces
+        if self.provider_user_id:
+            presence.disconnect(self.node_id)
+        self.node_id = msg.node_id
+        presence.connect(self.node_id, agent_token.id)
+        await self._subscribe_revocation(auth_token)
+        self.auth_token = auth_token
+        self.provider_user_id = user_id
+        logger.info(
+            "Registering Node: %s (user_id=%s)", self.node_id, user_id,
+        )
+
+        username = await self._register_node(self.node_id, msg.gpu_info, user_id)
+        self._inflight.models = _advertised_models(msg.gpu_info)
+        # The ack itself goes out as JSON; both sides switch encoding after it
+        encoding = protocol.negotiate(msg.encodings)
+        await self._send_message(protocol.Registered(
+            owner=username, encoding=encoding, stream_assembly=True,
+        ))
+        self.encoding = encoding
+        await self._broadcast_dashboard_update()
+        await self.channel_layer.group_send(
+            f"user_{user_id}",
+            {
+                "type": "dashboard_update",
+                "data": {"type": "refresh_provider_stats"}
+            }
+        )
+
+    def _handle_job_accepted(self, msg):
+        """Note when the agent started on a job; written out with the result."""
+        job = self._inflight.get(msg.task_id)
+        if job is not None and job.accepted_at is None:
+            job.accepted_at = timezone.now()
+
+    async def _handle_job_result(self, result):
+        """Settle a finished job and notify the owner and provider."""
+        task_id = result.task_id
+        logger.info(
+            "Job Result Received for Task %s: %s", task_id, result.status,
+        )
+        if not task_id:
+            return
+        # Only jobs dispatched over this connection may be settled by it
+        job = await self._inflight_job(task_id)
+        if job is None:
+            logger.warning(
+                "job_result rejected: task %s was not dispatched to node %s",
+                task_id, self.node_id,
             )
+            return
+        self._inflight.pop(task_id)
+        if not job.recovered:
+            JOB_LATENCY.labels(job.model).observe(self._inflight.elapsed(job))
+        lifecycle = {
+            "node_id": self.node_id,
+            "accepted_at": job.accepted_at,
+            "first_token_at": job.first_token_at,
+            "eval_count": result.eval_count,
+            "eval_duration": (
+                timedelta(microseconds=result.eval_duration / 1000)
+                if result.eval_duration else None
+            ),
+        }
 
-        elif msg_type == "job_result":
-            result = data.get("result", {})
-            task_id = result.get("task_id")
-            status = result.get("status", "failed")
-            response_text = result.get("response", "")
-            error = result.get("error", "")
+        # Deliver any buffered stream text before the final update
+        streamed = self._stream.text(task_id)
+        await self._stream.finish(task_id)
+        if streamed is not None:
+            await self.channel_layer.group_discard(
+                replay_group(task_id),
+                self.channel_name
+            )
+        output = result.response
+        if result.status == "success" and result.response_sha256:
+            # Streamed result: the text was assembled here, verify it
+            output = streamed or ""
+            expected = (result.response_length, result.response_sha256)
+            if protocol.stream_digest(output) != expected:
+                logger.warning(
+                    "Streamed result for task %s failed verification "
+                    "(%d bytes assembled, %s expected)",
+                    task_id, len(output.encode("utf-8")), result.response_length,
+                )
+                JOBS_FAILED.labels(job.model).inc()
+                await self._fail_job(
+                    task_id, {"error": "Streamed response failed verification"}, lifecycle,
+                )
+                await self._notify_job_completion(task_id, self.provider_user_id)
+                return
+        if result.status == "success":
+            JOBS_COMPLETED.labels(job.model).inc()
+            await self._complete_job(
+                task_id, {"output": output}, self.provider_user_id, lifecycle,
+            )
+            await self._broadcast_dashboard_update()
+            # Notify involved users (Owner & Provider)
+            await self._notify_job_completion(task_id, self.provider_user_id)
+        else:
+            JOBS_FAILED.labels(job.model).inc()
+            await self._fail_job(task_id, {"error": result.error}, lifecycle)
+            await self._notify_job_completion(task_id, self.provider_user_id)
+
+    async def _handle_job_stream(self, result):
+        """Forward a verified stream chunk to the job owner."""
+        task_id = result.task_id
+        owner_id = result.owner_id
+        if not (task_id and owner_id):
+            return
 
-            logger.info(
-                "Job Result Received for Task %s: %s", task_id, status,
+        # Validate against the jobs dispatched to this node, normally without a
+        # DB query, to prevent a compromised node from injecting into another
+        # user's stream
+        job = await self._inflight_job(task_id)
+        if job is None or job.owner_id != owner_id:
+            logger.warning(
+                "job_stream rejected: task %s does not belong to owner %s",
+                task_id, owner_id,
+            )
+            return
+        if job.first_token_at is None:
+            job.first_token_at = timezone.now()
+            if not job.recovered:
+                JOB_FIRST_TOKEN.labels(job.model).observe(self._inflight.elapsed(job))
+        if result.chunk and task_id not in self._stream:
+            # Answer resume requests from the owner's dashboards for this task
+            await self.channel_layer.group_add(
+                replay_group(task_id),
+                self.channel_name
             )
+        await self._stream.add(task_id, owner_id, result.chunk)
 
-            if task_id:
-                if status == "success":
-                    await self._complete_job(task_id, {"output": response_text}, self.provider_user_id)
-                    await self._broadcast_dashboard_update()
-                    # Notify involved users (Owner & Provider)
-                    await self._notify_job_completion(task_id, self.provider_user_id)
-                else:
-                    await self._fail_job(task_id, {"error": error})
-                    await self._notify_job_completion(task_id, self.provider_user_id)
-
-        elif msg_type == "job_stream":
-            result = data.get("result", {})
-            task_id = result.get("task_id")
-            chunk = result.get("chunk", "")
-            owner_id = result.get("owner_id")
-
-            if task_id and owner_id:
-                # Validate that the job actually belongs to the claimed owner
-                # to prevent a compromised node from injecting into another user's stream
-                verified_owner = await self._get_job_owner_id(task_id)
-                if verified_owner is None or str(verified_owner) != str(owner_id):
-                    logger.warning(
-                        "job_stream rejected: task %s does not belong to owner %s",
-                        task_id, owner_id,
-                    )
-                else:
-                    await self.channel_layer.group_send(
-                        f"user_{owner_id}",
-                        {
-                            "type": "dashboard_update",
-                            "data": {
-                                "type": "job_stream",
-                                "task_id": task_id,
-                                "chunk": chunk
-                            }
-                        }
-                    )
+    async def stream_replay_request(self, event):
+        """Send a resuming dashboard the stream frames it missed."""
+        task_id = event["task_id"]
+        job = self._inflight.get(task_id)
+        if job is None or job.owner_id != event["user_id"]:
+            return
+        frames = await self._stream.replay(task_id, event["last_seq"])
+        await self.channel_layer.send(
+            event["reply_channel"],
+            {
+                "type": "stream_replay",
+                "task_id": task_id,
+                "frames": frames,
+            }
+        )
 
-        elif msg_type == "pong":
-            pass
+    async def _send_message(self, msg):
+        """Send a protocol message using the encoding negotiated with the agent."""
+        data = protocol.encode(msg, self.encoding)
+        if isinstance(data, bytes):
+            await self.send(bytes_data=data)
+        else:
+            await self.send(text_data=data)
 
-    @database_sync_to_async
-    def _get_job_owner_id(self, task_id):
-        """Return the user_id of the job owner, or None if not found."""
-        from .models import Job  # pylint: disable=import-outside-toplevel
-        try:
-            return Job.objects.values_list('user_id', flat=True).get(id=task_id)
-        except Job.DoesNotExist:
-            return None
+    async def _send_stream_frame(self, owner_id, frame):
+        """Forward a batched job_stream frame to the job owner's dashboards."""
+        await self.channel_layer.group_send(
+            f"user_{owner_id}",
+            {
+                "type": "dashboard_update",
+                "data": frame
+            }
+        )
 
     async def _notify_job_completion(self, job_id, provider_id):
         """Send private updates to Job Owner and Provider."""
@@ -325,7 +481,9 @@ class GPUConsumer(AsyncWebsocketConsumer):
         from .models import Job  # pylint: disable=import-outside-toplevel
         from core.models import User  # pylint: disable=import-outside-toplevel
         try:
-            job = Job.objects.get(id=job_id)
+            job = Job.objects.select_related("user").defer("input_data").annotate(
+                prompt=Job.full_prompt(),
+            ).get(id=job_id)
             owner = job.user
 
             provider_bal = Decimal("0.00")
@@ -337,8 +495,6 @@ class GPUConsumer(AsyncWebsocketConsumer):
                 except Exception:  # pylint: disable=broad-except
                     pass
 
-            input_data = job.input_data or {}
-            is_dict = isinstance(input_data, dict)
             return {
                 "owner_id": owner.id,
                 "owner_balance": owner.wallet_balance,
@@ -348,16 +504,10 @@ class GPUConsumer(AsyncWebsocketConsumer):
                     "id": job.id,
                     "session_id": str(job.session_id) if job.session_id else None,
                     "status": job.status,
-                    "prompt": (
-                        input_data.get("prompt", "")
-                        if is_dict else str(input_data)
-                    ),
-                    "model": (
-                        input_data.get("model", "")
-                        if is_dict else "unknown"
-                    ),
+                    "prompt": job.prompt,
+                    "model": job.model or "unknown",
                     "cost": str(job.cost) if job.cost else None,
-                    "result": job.result,
+                    "result": load_result(job.result),
                     "created_at": str(job.created_at),
                     "completed_at": (
                         str(job.completed_at)
@@ -384,24 +534,71 @@ class GPUConsumer(AsyncWebsocketConsumer):
             )
             return
 
-        await self.send(json.dumps({
-            "type": "job_dispatch",
-            "job_data": job_data
-        }, ensure_ascii=False))
+        # Every node hears every dispatch; only those serving the model take it
+        model = job_data.get("model", "")
+        if not self._inflight.serves(model):
+            return
+
+        self._inflight.add(job_data["task_id"], job_data["owner_id"], model)
+        await self._send_message(protocol.JobDispatch(
+            job_data=protocol.JobData(**job_data),
+        ))
+
+    async def _inflight_job(self, task_id):
+        """Return the in-flight entry for ``task_id``, or None.
+
+        A job missing from the table may have been evicted or expired while
+        the node was still working on it, so the database is checked once;
+        a job that passes is put back in the table.
+        """
+        job = self._inflight.get(task_id)
+        if job is not None:
+            return job
+        owner = await self._dispatched_job_owner(task_id)
+        if owner is None:
+            return None
+        logger.info("Task %s recovered for node %s from the database", task_id, self.node_id)
+        return self._inflight.add(task_id, *owner, recovered=True)
+
+    async def _dispatched_job_owner(self, task_id):
+        """Return ``(owner_id, model)`` if the job could have been dispatched here.
+
+        That is an unfinished, dispatched job of another user, for a model
+        this node advertises.
+        """
+        from .models import Job, NodeModel  # pylint: disable=import-outside-toplevel
+        if not self.provider_user_id:
+            return None
+        return await Job.objects.filter(
+            id=task_id, status__in=("PENDING", "RUNNING"), dispatched_at__isnull=False,
+            model__in=NodeModel.objects.filter(node__node_id=self.node_id).values("model_name"),
+        ).exclude(user_id=self.provider_user_id).values_list("user_id", "model").afirst()
+
+    async def _subscribe_revocation(self, auth_token):
+        """Join the channel-layer group that announces this token's revocation.
+
+        Called before ``auth_token`` is replaced, so a re-registering agent
+        leaves the group of the token it used before.
+        """
+        group = _revocation_group(auth_token)
+        if self.auth_token:
+            previous = _revocation_group(self.auth_token)
+            if group == previous:
+                return
+            await self.channel_layer.group_discard(previous, self.channel_name)
+        await self.channel_layer.group_add(group, self.channel_name)
 
     # --- DB Operations ---
 
     @database_sync_to_async
     def _validate_token(self, token):
-        """Validate an agent token (gpc_...) and return user_id, or None."""
+        """Validate an agent token (gpc_...) and return the AgentToken, or None."""
         if not token:
             return None
         try:
             from core.models import AgentToken  # pylint: disable=import-outside-toplevel
-            agent_token = AgentToken.validate(token)
-            if agent_token:
-                return agent_token.user_id
-            return None
+            # last_used is written behind by the presence flusher
+            return AgentToken.validate(token, touch=False)
         except Exception as e:  # pylint: disable=broad-except
             logger.warning("Token validation failed: %s", e)
             return None
@@ -425,78 +622,39 @@ class GPUConsumer(AsyncWebsocketConsumer):
         logger.info("%s Node: %s (owner: %s)", action, node, owner.username)
         return owner.username
 
-    @database_sync_to_async
-    def _mark_node_inactive(self, node_id):
+    async def _mark_node_inactive(self, node_id):
         """Set a node to inactive when its WebSocket disconnects."""
         from .models import Node  # pylint: disable=import-outside-toplevel
-        Node.objects.filter(node_id=node_id).update(is_active=False)
+        await Node.objects.filter(node_id=node_id).aupdate(is_active=False)
         logger.info("Node %s marked inactive", node_id)
 
-    @database_sync_to_async
-    def _touch_node_heartbeat(self, node_id):
-        """Update node's last_heartbeat to keep it active."""
-        from .models import Node  # pylint: disable=import-outside-toplevel
-        try:
-            node = Node.objects.get(node_id=node_id)
-            node.save()  # Triggers auto_now on last_heartbeat
-        except Node.DoesNotExist:
-            logger.warning("Node %s not found for heartbeat touch", node_id)
+    async def _complete_job(self, task_id, result_data, provider_user_id, lifecycle=None):
+        """Mark a job as COMPLETED and credit its provider.
 
-    @database_sync_to_async
-    def _complete_job(self, task_id, result_data, provider_user_id):
-        """Mark a job as COMPLETED, credit provider, debit consumer."""
-        from .models import Job  # pylint: disable=import-outside-toplevel
-        from core.models import User  # pylint: disable=import-outside-toplevel
-        from payments.models import CreditLog  # pylint: disable=import-outside-toplevel
+        The completion is settled by the batched writer; this returns once
+        its batch has committed. Returns whether the job was settled.
+        """
         try:
-            job = Job.objects.get(id=task_id)
-            job.status = "COMPLETED"
-            job.result = result_data
-            job.completed_at = timezone.now()
-            job.cost = JOB_COST
-            job.save()
-
-            # Credit the provider
-            if provider_user_id:
-                try:
-                    provider = User.objects.get(id=provider_user_id)
-                    provider.wallet_balance += PROVIDER_SHARE
-                    provider.save()
-                    model_name = job.input_data.get(
-                        "model", "unknown",
-                    )
-                    CreditLog.objects.create(
-                        user=provider,
-                        amount=PROVIDER_SHARE,
-                        description=(
-                            f"Earned: Job #{task_id} completed"
-                            f" (model: {model_name})"
-                        ),
-                    )
-                    CreditLog.objects.get_or_create(
-                        user=job.user,
-                        amount=-JOB_COST,
-                        description=(
-                            f"Spent: Job #{task_id}"
-                            f" (model: {model_name})"
-                        ),
-                        defaults={"created_at": job.created_at},
-                    )
-                    logger.info(
-                        "Provider %s earned $%s for Job %s",
-                        provider.username, PROVIDER_SHARE, task_id,
-                    )
-                except User.DoesNotExist:
-                    logger.error(
-                        "Provider user %s not found", provider_user_id,
-                    )
+            return await settlement.settle(task_id, result_data, provider_user_id, lifecycle)
+        except Exception as e:  # pylint: disable=broad-except
+            logger.error("Settlement of job %s failed: %s", task_id, e)
+            return False
 
-            logger.info("Job %s completed successfully", task_id)
-        except Job.DoesNotExist:
-            logger.error("Job %s not found", task_id)
+    async def _save_partial_output(self, task_id, text):
+        """Store streamed text on a job that is still pending."""
+        from .models import Job  # pylint: disable=import-outside-toplevel
+        # update() skips Job.save, so a long partial output is offloaded here
+        result = await sync_to_async(offload_result)({"partial_output": text})
+        saved = await Job.objects.filter(id=task_id, status="PENDING").aupdate(
+            result=result,
+        )
+        if saved:
+            logger.info(
+                "Saved %d streamed chars for unfinished job %s", len(text), task_id,
+            )
 
     @database_sync_to_async
-    def _fail_job(self, task_id, error_data):
+    def _fail_job(self, task_id, error_data, lifecycle=None):
         """Mark a job as FAILED with error details."""
         from .models import Job  # pylint: disable=import-outside-toplevel
         try:
@@ -504,7 +662,9 @@ class GPUConsumer(AsyncWebsocketConsumer):
             job.status = "FAILED"
             job.result = error_data
             job.completed_at = timezone.now()
+            _apply_lifecycle(job, lifecycle)
             job.save()
+            mark_written(job.user_id)
             logger.error("Job %s failed: %s", task_id, error_data)
         except Job.DoesNotExist:
             logger.error("Job %s not found", task_id)
@@ -514,8 +674,12 @@ class DashboardConsumer(AsyncWebsocketConsumer):
 
     async def connect(self):
         """Join public + private groups, authenticate, and send initial state."""
+        DASHBOARD_CONSUMERS.inc()
+        loop_monitor.ensure_running()
         self.user_id = None
         self.group_name = "dashboard_updates"
+        self._outbound = OutboundQueue(self._deliver)
+        self._resuming = {}
 
         # 1. Join public group
         await self.channel_layer.group_add(
@@ -547,8 +711,7 @@ class DashboardConsumer(AsyncWebsocketConsumer):
         await self.accept()
 
         # 3. Send Initial Public Snapshot
-        stats = await self._get_stats()
-        models = await self._get_models()
+        stats, models = await _network_snapshot()
         await self.send(json.dumps({
             "type": "stats_update",
             "stats": stats
@@ -579,8 +742,19 @@ class DashboardConsumer(AsyncWebsocketConsumer):
                 "stats": provider_stats
             }))
 
+        # 6. Broadcasts from here on go through the bounded outbound queue
+        self._writer_task = asyncio.ensure_future(self._outbound.run())
+
     async def disconnect(self, close_code):  # pylint: disable=unused-argument
         """Leave groups on WebSocket disconnect."""
+        DASHBOARD_CONSUMERS.dec()
+        if hasattr(self, '_outbound'):
+            logger.debug("Dashboard WS outbound: high_water=%d", self._outbound.high_water)
+            self._outbound.close()
+        if hasattr(self, '_writer_task'):
+            self._writer_task.cancel()
+        for state in getattr(self, '_resuming', {}).values():
+            state["timer"].cancel()
         await self.channel_layer.group_discard(
             self.group_name,
             self.channel_name
@@ -607,72 +781,148 @@ class DashboardConsumer(AsyncWebsocketConsumer):
                         "type": "provider_stats_update",
                         "stats": stats
                     }))
+            elif msg_type == "resume":
+                await self._resume_stream(
+                    int(data["task_id"]), int(data.get("last_seq", 0)),
+                )
         except Exception as e:  # pylint: disable=broad-except
             logger.error("DashboardConsumer receive error: %s", e)
 
+    async def _resume_stream(self, task_id, last_seq):
+        """Ask the node streaming a task for the frames after ``last_seq``.
+
+        Live frames for the task are held until the replay arrives (or
+        ``STREAM_RESUME_TIMEOUT`` passes) so the client sees them in order.
+        """
+        if not self.user_id or task_id in self._resuming:
+            return
+        if len(self._resuming) >= STREAM_RESUME_LIMIT:
+            return
+        # A queued live frame is covered by the replay
+        self._outbound.discard_stream(task_id)
+        self._resuming[task_id] = {
+            "last_seq": last_seq,
+            "held": [],
+            "timer": asyncio.ensure_future(self._resume_timeout(task_id)),
+        }
+        await self.channel_layer.group_send(
+            replay_group(task_id),
+            {
+                "type": "stream_replay_request",
+                "task_id": task_id,
+                "user_id": self.user_id,
+                "last_seq": last_seq,
+                "reply_channel": self.channel_name,
+            }
+        )
+
+    async def _resume_timeout(self, task_id):
+        """Go live without a replay if no node answered in time."""
+        await asyncio.sleep(STREAM_RESUME_TIMEOUT)
+        await self._end_resume(task_id, [])
+
+    async def stream_replay(self, event):
+        """Handle a node's answer to a resume request."""
+        await self._end_resume(event["task_id"], event["frames"])
+
+    async def _end_resume(self, task_id, frames):
+        """Send the replayed text, then the live frames held meanwhile."""
+        state = self._resuming.pop(task_id, None)
+        if state is None:
+            return
+        if state["timer"] is not asyncio.current_task():
+            state["timer"].cancel()
+        seq = frames[-1]["seq"] if frames else state["last_seq"]
+        await self._enqueue({
+            "type": "job_stream_replay",
+            "task_id": task_id,
+            "chunk": "".join(frame["chunk"] for frame in frames),
+            "from_seq": frames[0]["seq"] if frames else None,
+            "seq": seq,
+            # The chunk is the whole text so far, not a continuation
+            "truncated": bool(frames) and frames[0].get("truncated", False),
+        })
+        for frame in state["held"]:
+            if frame["seq"] > seq:
+                await self._enqueue(frame)
+
     async def dashboard_update(self, event):
-        """Handle broadcast messages (public or private)."""
+        """Queue broadcast messages (public or private) for delivery."""
         msg = event["data"]
+        msg_type = msg.get("type")
+        if msg_type == "refresh_provider_stats" and not self.user_id:
+            return
+        if msg_type == "job_stream" and msg.get("task_id") in self._resuming:
+            self._resuming[msg["task_id"]]["held"].append(msg)
+            return
+        if msg_type == "job_update" and msg["job"].get("id") in self._resuming:
+            # The job is over, so there is nothing left to replay
+            await self._end_resume(msg["job"]["id"], [])
+        await self._enqueue(msg)
 
-        # If this is a trigger to refresh provider stats, calculate locally
-        if msg.get("type") == "refresh_provider_stats" and self.user_id:
+    async def _enqueue(self, msg):
+        """Put a message on the outbound queue, dropping the client on overflow."""
+        try:
+            self._outbound.put(msg)
+        except OutboundOverflow as e:
+            logger.warning(
+                "Disconnecting slow dashboard client (user %s): %s",
+                self.user_id, e,
+            )
+            self._outbound.close()
+            await self.close(code=OUTBOUND_OVERFLOW_CLOSE_CODE)
+
+    async def _deliver(self, msg):
+        """Write one queued message, computing provider stats on demand."""
+        # Refresh triggers are coalesced in the queue, so the stats query
+        # runs once per burst rather than once per trigger
+        if msg.get("type") == "refresh_provider_stats":
             stats = await self._get_provider_stats_async(
                 self.user_id, self.provider_days,
             )
-            await self.send(json.dumps({
-                "type": "provider_stats_update",
-                "stats": stats
-            }))
-            return
-
+            msg = {"type": "provider_stats_update", "stats": stats}
         await self.send(json.dumps(msg, default=str))
 
-    @database_sync_to_async
-    def _get_user_from_token(self, token):
+    async def _get_user_from_token(self, token):
         """Validate a JWT access token and return the user, or None."""
         from rest_framework_simplejwt.tokens import AccessToken  # pylint: disable=import-outside-toplevel
         from core.models import User  # pylint: disable=import-outside-toplevel
         try:
             access_token = AccessToken(token)
             user_id = access_token.payload.get("user_id")
-            return User.objects.get(id=user_id)
+            return await User.objects.aget(id=user_id)
         except Exception:
             return None
 
-    @database_sync_to_async
-    def _get_balance(self, user_id):
+    async def _get_balance(self, user_id):
         """Return the wallet balance for the given user."""
         from core.models import User  # pylint: disable=import-outside-toplevel
-        try:
-            return User.objects.get(id=user_id).wallet_balance
-        except Exception:  # pylint: disable=broad-except
-            return Decimal("0.00")
+        balance = await User.objects.filter(id=user_id).values_list(
+            "wallet_balance", flat=True,
+        ).afirst()
+        return Decimal("0.00") if balance is None else balance
 
-    @database_sync_to_async
-    def _get_recent_jobs(self, user_id):
+    async def _get_recent_jobs(self, user_id):
         """Return the 10 most recent jobs for the given user."""
         from .models import Job  # pylint: disable=import-outside-toplevel
         jobs = Job.objects.filter(
             user_id=user_id,
+        ).defer("input_data").annotate(
+            prompt=Job.full_prompt(),
         ).order_by('-created_at')[:10]
         result = []
-        for job in jobs:
-            input_data = job.input_data or {}
-            is_dict = isinstance(input_data, dict)
+        async for job in jobs:
             result.append({
                 "id": job.id,
                 "session_id": str(job.session_id) if job.session_id else None,
                 "status": job.status,
-                "prompt": (
-                    input_data.get("prompt", "")
-                    if is_dict else str(input_data)
-                ),
-                "model": (
-                    input_data.get("model", "")
-                    if is_dict else "unknown"
-                ),
+                "prompt": job.prompt,
+                "model": job.model or "unknown",
                 "cost": str(job.cost) if job.cost else None,
-                "result": job.result,
+                "result": (
+                    await sync_to_async(load_result)(job.result)
+                    if is_reference(job.result) else job.result
+                ),
                 "created_at": str(job.created_at),
                 "completed_at": (
                     str(job.completed_at)
@@ -681,56 +931,15 @@ class DashboardConsumer(AsyncWebsocketConsumer):
             })
         return result
 
-    @database_sync_to_async
-    def _get_stats(self):
-        """Return network stats for the dashboard."""
-        from .models import Node, Job  # pylint: disable=import-outside-toplevel
-        _cleanup_stale_nodes()
-        active_nodes = Node.objects.filter(is_active=True).count()
-        completed_jobs = Job.objects.filter(status="COMPLETED").count()
-        available = self._get_models_sync()
-        return {
-            "active_nodes": active_nodes,
-            "completed_jobs": completed_jobs,
-            "available_models": len(available)
-        }
-
-    @database_sync_to_async
-    def _get_models(self):
-        """Return available models aggregated from active nodes."""
-        _cleanup_stale_nodes()
-        return self._get_models_sync()
-
-    def _get_models_sync(self):
-        """Synchronous helper: aggregate model counts from active nodes."""
-        from .models import Node  # pylint: disable=import-outside-toplevel
-        nodes = Node.objects.filter(is_active=True)
-        model_counts = {}
-        for node in nodes:
-            info = node.gpu_info or {}
-            node_models = info.get("models", [])
-            for m in node_models:
-                if isinstance(m, dict):
-                    name = m.get("name")
-                else:
-                    name = m
-
-                if name:
-                    model_counts[name] = model_counts.get(name, 0) + 1
-
-        return [
-            {"name": k, "providers": v}
-            for k, v in model_counts.items()
-        ]
-
     @database_sync_to_async
     def _get_provider_stats_async(self, user_id, days):
         """Fetch provider statistics for the given user."""
         from core.models import User  # pylint: disable=import-outside-toplevel
         from .utils import get_provider_stats  # pylint: disable=import-outside-toplevel
         try:
-            user = User.objects.get(id=user_id)
-            return get_provider_stats(user, days)
+            with read_from_replica(user_id):
+                user = User.objects.get(id=user_id)
+                return get_provider_stats(user, days)
         except Exception as e:  # pylint: disable=broad-except
             logger.error("Error getting provider stats: %s", e)
             return None
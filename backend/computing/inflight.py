@@ -0,0 +1,101 @@
+"""Per-connection table of jobs dispatched to a GPU node."""
+import time
+from collections import OrderedDict
+
+# Entries older than this are dropped; the agent gives up on a job after 600s
+INFLIGHT_JOB_TTL = 660
+# Upper bound on tracked jobs per connection
+INFLIGHT_MAX_JOBS = 1000
+
+
+class InFlightJob:
+    """A job sent to the node and not yet answered.
+
+    ``accepted_at`` and ``first_token_at`` are wall-clock lifecycle stamps
+    kept here and written to the Job together with its final state.
+    ``recovered`` entries were re-added after a database check, so their
+    ``started_at`` is not the dispatch time.
+    """
+    __slots__ = (
+        "task_id", "owner_id", "model", "started_at", "accepted_at", "first_token_at",
+        "recovered",
+    )
+
+    def __init__(self, task_id, owner_id, model, started_at, recovered=False):
+        self.task_id = task_id
+        self.owner_id = owner_id
+        self.model = model
+        self.started_at = started_at
+        self.accepted_at = None
+        self.first_token_at = None
+        self.recovered = recovered
+
+
+class InFlightJobs:
+    """Jobs dispatched over one agent connection, keyed by task_id.
+
+    Filled by ``job_dispatch`` so that ``job_stream`` and ``job_result``
+    messages can be checked for ownership without a database round-trip;
+    task IDs that were never dispatched to this connection are unknown.
+    The table is bounded by age and size so a silent agent cannot make it
+    grow without limit.
+
+    ``models`` is the set of model names the node advertised; dispatches
+    of other models are not for this node. None, before registration,
+    accepts any model.
+    """
+
+    def __init__(self, ttl=INFLIGHT_JOB_TTL, max_jobs=INFLIGHT_MAX_JOBS,
+                 clock=time.monotonic):
+        self.ttl = ttl
+        self.max_jobs = max_jobs
+        self._clock = clock
+        self._jobs = OrderedDict()
+        self.models = None
+
+    def __contains__(self, task_id):
+        return task_id in self._jobs
+
+    def __len__(self):
+        return len(self._jobs)
+
+    def serves(self, model):
+        """Whether the node advertised ``model``."""
+        return self.models is None or model in self.models
+
+    def add(self, task_id, owner_id, model, recovered=False):
+        """Record a dispatched job, evicting expired or excess entries."""
+        now = self._clock()
+        self._expire(now)
+        self._jobs.pop(task_id, None)
+        while len(self._jobs) >= self.max_jobs:
+            self._jobs.popitem(last=False)
+        job = self._jobs[task_id] = InFlightJob(task_id, owner_id, model, now, recovered)
+        return job
+
+    def get(self, task_id):
+        """Return the in-flight job, or None if unknown or expired."""
+        job = self._jobs.get(task_id)
+        if job is not None and self._clock() - job.started_at > self.ttl:
+            del self._jobs[task_id]
+            return None
+        return job
+
+    def elapsed(self, job):
+        """Seconds since the job was dispatched."""
+        return self._clock() - job.started_at
+
+    def pop(self, task_id):
+        """Remove and return the in-flight job, or None if unknown or expired."""
+        job = self.get(task_id)
+        if job is not None:
+            del self._jobs[task_id]
+        return job
+
+    def _expire(self, now):
+        # Entries are in dispatch order, so expired ones are at the front
+        while self._jobs:
+            job = next(iter(self._jobs.values()))
+            if now - job.started_at <= self.ttl:
+                break
+            self._jobs.popitem(last=False)
@@ -0,0 +1,37 @@
+"""Archive finished jobs older than the retention window."""
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from computing.archive import archivable_jobs, archive_cutoff, archive_jobs
+
+
+class Command(BaseCommand):
+    """``manage.py archive_jobs [--days N] [--batch-size N] [--limit N] [--dry-run]``"""
+
+    help = "Move completed and failed jobs past the retention window into the archive."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days", type=int, default=None,
+            help=f"Retention in days (default JOB_RETENTION_DAYS={settings.JOB_RETENTION_DAYS}).",
+        )
+        parser.add_argument("--batch-size", type=int, default=None)
+        parser.add_argument("--limit", type=int, default=None, help="Stop after this many jobs.")
+        parser.add_argument(
+            "--dry-run", action="store_true", help="Only count the jobs that would move.",
+        )
+
+    def handle(self, *args, **options):
+        days = options["days"]
+        if days is not None and days <= 0:
+            raise CommandError("--days must be positive.")
+        cutoff = archive_cutoff(days)
+        if cutoff is None:
+            self.stdout.write("Archiving is disabled (JOB_RETENTION_DAYS=0).")
+            return
+        if options["dry_run"]:
+            count = archivable_jobs(cutoff).count()
+            self.stdout.write(f"{count} job(s) completed before {cutoff:%Y-%m-%d %H:%M} would be archived.")
+            return
+        moved = archive_jobs(days, options["batch_size"], options["limit"])
+        self.stdout.write(self.style.SUCCESS(f"Archived {moved} job(s)."))
@@ -0,0 +1,38 @@
+# Generated by Django 6.1.2 on 2026-10-19 05:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('computing', '0002_chatsession_job_session'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='accepted_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='dispatched_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='eval_count',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='eval_duration',
+            field=models.DurationField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='first_token_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 6.1.2 on 2026-10-19 06:27
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('computing', '0003_job_lifecycle'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['user', '-created_at', '-id'], name='job_user_created_idx'),
+        ),
+    ]
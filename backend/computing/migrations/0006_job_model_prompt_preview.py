@@ -0,0 +1,51 @@
+# Generated by Django 6.1.2 on 2026-10-19 06:43
+
+from django.conf import settings
+from django.db import migrations, models
+
+BATCH_SIZE = 1000
+PROMPT_PREVIEW_CHARS = 80
+
+
+def backfill_text_columns(apps, schema_editor):
+    """Copy model and the prompt preview out of input_data."""
+    Job = apps.get_model('computing', 'Job')
+    batch = []
+    for job in Job.objects.only('id', 'input_data').iterator(chunk_size=BATCH_SIZE):
+        data = job.input_data
+        if isinstance(data, dict):
+            job.model = str(data.get('model') or '')[:100]
+            job.prompt_preview = str(data.get('prompt') or '')[:PROMPT_PREVIEW_CHARS]
+        else:
+            job.prompt_preview = str(data)[:PROMPT_PREVIEW_CHARS]
+        batch.append(job)
+        if len(batch) == BATCH_SIZE:
+            Job.objects.bulk_update(batch, ['model', 'prompt_preview'])
+            batch = []
+    Job.objects.bulk_update(batch, ['model', 'prompt_preview'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('computing', '0005_job_session_created_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='model',
+            field=models.CharField(blank=True, default='', max_length=100),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='prompt_preview',
+            field=models.CharField(blank=True, default='', max_length=80),
+        ),
+        migrations.RunPython(backfill_text_columns, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['model', 'created_at'], name='job_model_created_idx'),
+        ),
+    ]
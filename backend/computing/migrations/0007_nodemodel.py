@@ -0,0 +1,58 @@
+# Generated by Django 6.1.2 on 2026-10-19 06:53
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_node_models(apps, schema_editor):
+    """Create NodeModel rows from each node's gpu_info models list."""
+    Node = apps.get_model('computing', 'Node')
+    NodeModel = apps.get_model('computing', 'NodeModel')
+    rows = []
+    for node in Node.objects.only('id', 'gpu_info').iterator():
+        seen = set()
+        for entry in (node.gpu_info or {}).get('models') or []:
+            if not isinstance(entry, dict):
+                entry = {'name': entry}
+            name = entry.get('name')
+            if not name or not isinstance(name, str) or name[:100] in seen:
+                continue
+            seen.add(name[:100])
+            size = entry.get('size')
+            quantization = entry.get('quantization')
+            if quantization is None and isinstance(entry.get('details'), dict):
+                quantization = entry['details'].get('quantization_level')
+            rows.append(NodeModel(
+                node_id=node.id,
+                model_name=name[:100],
+                size=size if isinstance(size, int) and size >= 0 else None,
+                quantization=str(quantization or '')[:20],
+                loaded=bool(entry.get('loaded')),
+            ))
+    NodeModel.objects.bulk_create(rows, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('computing', '0006_job_model_prompt_preview'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NodeModel',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model_name', models.CharField(max_length=100)),
+                ('size', models.PositiveBigIntegerField(blank=True, null=True)),
+                ('quantization', models.CharField(blank=True, default='', max_length=20)),
+                ('loaded', models.BooleanField(default=False)),
+                ('node', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='served_models', to='computing.node')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['model_name'], name='nodemodel_name_idx'), models.Index(fields=['model_name', 'node'], name='nodemodel_name_node_idx')],
+                'constraints': [models.UniqueConstraint(fields=('node', 'model_name'), name='nodemodel_node_model_uniq')],
+            },
+        ),
+        migrations.RunPython(backfill_node_models, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 6.1.2 on 2026-10-19 06:59
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('computing', '0007_nodemodel'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['status'], name='job_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['node', 'status', 'completed_at'], name='job_node_status_done_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['completed_at'], name='job_completed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='node',
+            index=models.Index(fields=['is_active', 'last_heartbeat'], name='node_active_heartbeat_idx'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 6.1.2 on 2026-10-19 08:10
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('computing', '0009_archivedjob'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='archivedjob',
+            index=models.Index(fields=['session', '-created_at', '-id'], name='archivedjob_session_idx'),
+        ),
+    ]
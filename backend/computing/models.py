@@ -1,6 +1,18 @@
 """Models for the computing module — GPU nodes and inference jobs."""
+import json
+
+import zstandard
 from django.conf import settings
-from django.db import models
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models, transaction
+from django.db.models.fields.json import KT
+from django.db.models.functions import Coalesce
+from django.utils.dateparse import parse_datetime, parse_duration
+
+from .blobs import offload_result
+
+# Length of Job.prompt_preview, the prompt as shown in lists
+PROMPT_PREVIEW_CHARS = 80
 
 
 class Node(models.Model):
@@ -12,9 +24,99 @@ class Node(models.Model):
     is_active = models.BooleanField(default=False)
     last_heartbeat = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # Active-node counts and the stale-heartbeat sweep
+            models.Index(
+                fields=["is_active", "last_heartbeat"], name="node_active_heartbeat_idx",
+            ),
+        ]
+
     def __str__(self):
         return f"{self.name} ({self.node_id})"
 
+    def save(self, *args, **kwargs):
+        """Save and mirror ``gpu_info["models"]`` into :class:`NodeModel`."""
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "gpu_info" not in update_fields:
+            super().save(*args, **kwargs)
+            return
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            NodeModel.sync(self, (self.gpu_info or {}).get("models") or [])
+
+
+class NodeModel(models.Model):
+    """A model a node advertises, one row per (node, model).
+
+    Mirrors the ``models`` list of ``Node.gpu_info`` so catalog and routing
+    questions are indexed queries instead of scans of every node's JSON.
+    """
+    node = models.ForeignKey(Node, related_name='served_models', on_delete=models.CASCADE)
+    model_name = models.CharField(max_length=100)
+    # Bytes on disk, as reported by the agent
+    size = models.PositiveBigIntegerField(null=True, blank=True)
+    quantization = models.CharField(max_length=20, blank=True, default='')
+    # Resident in GPU memory, so served without a load delay
+    loaded = models.BooleanField(default=False)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["node", "model_name"], name="nodemodel_node_model_uniq",
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["model_name"], name="nodemodel_name_idx"),
+            # Which nodes serve a model; joined to Node to keep active ones
+            models.Index(fields=["model_name", "node"], name="nodemodel_name_node_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.model_name} on {self.node_id}"
+
+    @staticmethod
+    def parse(entry):
+        """Return the field values of one ``gpu_info["models"]`` entry, or None.
+
+        Entries are model names, or dicts with ``name`` and optionally
+        ``size``, ``quantization`` (or Ollama's ``details.quantization_level``)
+        and ``loaded``.
+        """
+        if not isinstance(entry, dict):
+            entry = {"name": entry}
+        name = entry.get("name")
+        if not name or not isinstance(name, str):
+            return None
+        size = entry.get("size")
+        quantization = entry.get("quantization")
+        if quantization is None and isinstance(entry.get("details"), dict):
+            quantization = entry["details"].get("quantization_level")
+        return {
+            "model_name": name[:100],
+            "size": size if isinstance(size, int) and size >= 0 else None,
+            "quantization": str(quantization or "")[:20],
+            "loaded": bool(entry.get("loaded")),
+        }
+
+    @classmethod
+    def sync(cls, node, entries):
+        """Make ``node``'s rows match the advertised ``entries``."""
+        rows = {}
+        for entry in entries:
+            fields = cls.parse(entry)
+            if fields:
+                rows[fields["model_name"]] = fields
+        cls.objects.filter(node=node).exclude(model_name__in=list(rows)).delete()
+        if rows:
+            cls.objects.bulk_create(
+                [cls(node=node, **fields) for fields in rows.values()],
+                update_conflicts=True,
+                unique_fields=["node", "model_name"],
+                update_fields=["size", "quantization", "loaded"],
+            )
+
+
 class ChatSession(models.Model):
     """A chat session containing a chronological list of jobs."""
     user = models.ForeignKey(
@@ -50,13 +152,179 @@ class Job(models.Model):
     )
     task_type = models.CharField(max_length=50)
     input_data = models.JSONField()
+    # Copied from input_data on create so lists and analytics skip the JSON
+    model = models.CharField(max_length=100, blank=True, default='')
+    prompt_preview = models.CharField(
+        max_length=PROMPT_PREVIEW_CHARS, blank=True, default='',
+    )
     status = models.CharField(
         max_length=20, choices=STATUS_CHOICES, default='PENDING',
     )
     created_at = models.DateTimeField(auto_now_add=True)
+    # Lifecycle: sent to the nodes, picked up by one, first streamed token
+    dispatched_at = models.DateTimeField(null=True, blank=True)
+    accepted_at = models.DateTimeField(null=True, blank=True)
+    first_token_at = models.DateTimeField(null=True, blank=True)
     completed_at = models.DateTimeField(null=True, blank=True)
     result = models.JSONField(null=True, blank=True)
     cost = models.DecimalField(max_digits=10, decimal_places=2, null=True)
+    # Generation stats reported by Ollama (eval_count / eval_duration)
+    eval_count = models.PositiveIntegerField(null=True, blank=True)
+    eval_duration = models.DurationField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # Keyset pagination of a user's job list on (created_at, id)
+            models.Index(
+                fields=["user", "-created_at", "-id"], name="job_user_created_idx",
+            ),
+            # Keyset pagination of a session's messages
+            models.Index(
+                fields=["session", "-created_at", "-id"], name="job_session_created_idx",
+            ),
+            # Per-model analytics over a time window
+            models.Index(fields=["model", "created_at"], name="job_model_created_idx"),
+            # Network-wide counts by status
+            models.Index(fields=["status"], name="job_status_idx"),
+            # Jobs a provider's nodes served in a period
+            models.Index(
+                fields=["node", "status", "completed_at"], name="job_node_status_done_idx",
+            ),
+            # Jobs finished in a period, whatever their node
+            models.Index(fields=["completed_at"], name="job_completed_idx"),
+        ]
 
     def __str__(self):
         return f"Job {self.id} - {self.status}"
+
+    @staticmethod
+    def text_columns(input_data):
+        """Return ``(model, prompt_preview)`` derived from ``input_data``."""
+        if not isinstance(input_data, dict):
+            return "", str(input_data)[:PROMPT_PREVIEW_CHARS]
+        model = str(input_data.get("model") or "")[:100]
+        prompt = str(input_data.get("prompt") or "")[:PROMPT_PREVIEW_CHARS]
+        return model, prompt
+
+    @staticmethod
+    def full_prompt():
+        """Expression for the whole prompt, read out of ``input_data`` in SQL
+        so the JSON blob is never loaded; falls back to the preview."""
+        return Coalesce(
+            KT("input_data__prompt"), models.F("prompt_preview"),
+            output_field=models.TextField(),
+        )
+
+    def save(self, *args, **kwargs):
+        """Fill the text columns on create and offload a large ``result``."""
+        if self._state.adding:
+            self.model, self.prompt_preview = self.text_columns(self.input_data)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is None or "result" in update_fields:
+            self.result = offload_result(self.result)
+        super().save(*args, **kwargs)
+
+    @property
+    def queue_wait(self):
+        """Seconds from submission until a node accepted the job."""
+        if self.accepted_at is None:
+            return None
+        return (self.accepted_at - self.created_at).total_seconds()
+
+    @property
+    def time_to_first_token(self):
+        """Seconds from submission until the first streamed token."""
+        if self.first_token_at is None:
+            return None
+        return (self.first_token_at - self.created_at).total_seconds()
+
+    @property
+    def tokens_per_second(self):
+        """Generation throughput as measured by the node."""
+        if not self.eval_count or not self.eval_duration:
+            return None
+        return self.eval_count / self.eval_duration.total_seconds()
+
+
+class ArchivedJob(models.Model):
+    """A finished job moved out of :class:`Job` after the retention window.
+
+    The columns that lists and counters filter on stay queryable; the rest
+    of the row, prompts and results included, is one zstd-compressed JSON
+    document restored by :meth:`to_job`.
+    """
+    # Columns copied as-is; the primary key is the original job id
+    COLUMNS = (
+        "id", "session_id", "user_id", "node_id", "model", "prompt_preview",
+        "status", "cost", "created_at", "completed_at",
+    )
+    PAYLOAD_FIELDS = (
+        "task_type", "input_data", "result", "dispatched_at", "accepted_at",
+        "first_token_at", "eval_count", "eval_duration",
+    )
+    _DATETIME_FIELDS = ("dispatched_at", "accepted_at", "first_token_at")
+
+    id = models.BigIntegerField(primary_key=True)
+    session = models.ForeignKey(
+        ChatSession, related_name='archived_jobs',
+        on_delete=models.CASCADE, null=True, blank=True,
+    )
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, related_name='archived_jobs',
+        on_delete=models.CASCADE,
+    )
+    node = models.ForeignKey(
+        Node, related_name='archived_jobs',
+        on_delete=models.SET_NULL, null=True, blank=True,
+    )
+    model = models.CharField(max_length=100, blank=True, default='')
+    prompt_preview = models.CharField(
+        max_length=PROMPT_PREVIEW_CHARS, blank=True, default='',
+    )
+    status = models.CharField(max_length=20, choices=Job.STATUS_CHOICES)
+    cost = models.DecimalField(max_digits=10, decimal_places=2, null=True)
+    created_at = models.DateTimeField()
+    completed_at = models.DateTimeField(null=True, blank=True)
+    archived_at = models.DateTimeField(auto_now_add=True)
+    payload = models.BinaryField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status"], name="archivedjob_status_idx"),
+            # Keyset pagination of a session's archived messages
+            models.Index(
+                fields=["session", "-created_at", "-id"],
+                name="archivedjob_session_idx",
+            ),
+            models.Index(
+                fields=["node", "status", "completed_at"],
+                name="archivedjob_node_done_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"ArchivedJob {self.id} - {self.status}"
+
+    @classmethod
+    def from_job(cls, job):
+        """Return an unsaved archive row for ``job``."""
+        payload = {name: getattr(job, name) for name in cls.PAYLOAD_FIELDS}
+        for name in cls._DATETIME_FIELDS:
+            # DjangoJSONEncoder would round these to milliseconds
+            if payload[name] is not None:
+                payload[name] = payload[name].isoformat()
+        raw = json.dumps(payload, cls=DjangoJSONEncoder, separators=(",", ":"))
+        return cls(
+            payload=zstandard.ZstdCompressor().compress(raw.encode()),
+            **{name: getattr(job, name) for name in cls.COLUMNS},
+        )
+
+    def to_job(self):
+        """Return an unsaved :class:`Job` rebuilt from this archive row."""
+        payload = json.loads(zstandard.ZstdDecompressor().decompress(bytes(self.payload)))
+        for name in self._DATETIME_FIELDS:
+            if payload[name] is not None:
+                payload[name] = parse_datetime(payload[name])
+        if payload["eval_duration"] is not None:
+            payload["eval_duration"] = parse_duration(payload["eval_duration"])
+        return Job(**{name: getattr(self, name) for name in self.COLUMNS}, **payload)
@@ -0,0 +1,139 @@
+"""Bounded per-connection outbound queues for dashboard WebSockets."""
+import asyncio
+import itertools
+import logging
+from collections import deque
+
+from core.metrics import (
+    OUTBOUND_COALESCED, OUTBOUND_OVERFLOWS, OUTBOUND_QUEUE_DEPTH, OUTBOUND_QUEUED, OUTBOUND_SENT,
+)
+
+logger = logging.getLogger(__name__)
+
+# Pending (distinct) messages allowed per connection before it is dropped
+OUTBOUND_MAX_QUEUE = 500
+# Log a warning when a connection's queue grows past this depth
+OUTBOUND_WARN_DEPTH = 100
+# WebSocket close code sent to clients that cannot keep up
+OUTBOUND_OVERFLOW_CLOSE_CODE = 4008
+
+# Latest value wins: a queued message of the same type is replaced in place
+COALESCE_TYPES = frozenset({
+    "stats_update",
+    "models_update",
+    "provider_stats_update",
+    "refresh_provider_stats",
+})
+# Chunks for the same task are concatenated into the queued frame
+MERGE_TYPES = frozenset({"job_stream"})
+
+# Keys for messages that are queued as-is; unique across all queues
+_message_ids = itertools.count()
+
+
+class OutboundOverflow(Exception):
+    """Raised when a connection's outbound queue exceeds its limit."""
+
+
+class OutboundQueue:
+    """Decouple producing dashboard messages from writing them to a socket.
+
+    Messages are keyed by class: state snapshots (``COALESCE_TYPES``) keep
+    only the newest value, ``job_stream`` frames for the same task are
+    merged, and everything else (job and balance updates) is queued as-is
+    and never dropped. Only distinct entries count towards ``max_size``;
+    going over it raises ``OutboundOverflow`` so the owner can close the
+    connection.
+
+    ``send`` is an async callable receiving one message dict at a time.
+    Depth, coalescing, writes and overflows are recorded in
+    ``core.metrics``.
+    """
+    warn_depth = OUTBOUND_WARN_DEPTH
+
+    def __init__(self, send, max_size=OUTBOUND_MAX_QUEUE):
+        self._send = send
+        self.max_size = max_size
+        self._order = deque()
+        self._slots = {}
+        self._ready = asyncio.Event()
+        self._closed = False
+        # Deepest the queue has been, for the disconnect log
+        self.high_water = 0
+
+    @property
+    def depth(self):
+        """Number of distinct messages waiting to be written."""
+        return len(self._order)
+
+    def _key(self, msg):
+        msg_type = msg.get("type")
+        if msg_type in COALESCE_TYPES:
+            return msg_type
+        if msg_type in MERGE_TYPES:
+            return (msg_type, msg.get("task_id"))
+        return next(_message_ids)
+
+    def put(self, msg):
+        """Queue a message, coalescing or merging it where its class allows."""
+        if self._closed:
+            return
+        key = self._key(msg)
+        queued = self._slots.get(key)
+        if queued is not None:
+            if msg.get("type") in MERGE_TYPES:
+                msg = {
+                    **msg,
+                    "chunk": queued.get("chunk", "") + msg.get("chunk", ""),
+                    "chunks": queued.get("chunks", 1) + msg.get("chunks", 1),
+                }
+            self._slots[key] = msg
+            OUTBOUND_COALESCED.inc()
+            return
+
+        if len(self._order) >= self.max_size:
+            OUTBOUND_OVERFLOWS.inc()
+            raise OutboundOverflow(
+                f"outbound queue full ({self.max_size} messages)"
+            )
+        self._slots[key] = msg
+        self._order.append(key)
+        depth = len(self._order)
+        OUTBOUND_QUEUED.inc()
+        OUTBOUND_QUEUE_DEPTH.observe(depth)
+        if depth > self.high_water:
+            self.high_water = depth
+            if depth == self.warn_depth:
+                logger.warning("Outbound queue depth reached %d", depth)
+        self._ready.set()
+
+    def discard_stream(self, task_id):
+        """Drop the queued job_stream frame for a task, if there is one."""
+        key = ("job_stream", task_id)
+        if self._slots.pop(key, None) is not None:
+            self._order.remove(key)
+            OUTBOUND_QUEUED.dec()
+
+    async def run(self):
+        """Write queued messages until ``close`` is called."""
+        while not self._closed:
+            if not self._order:
+                self._ready.clear()
+                await self._ready.wait()
+                continue
+            key = self._order.popleft()
+            msg = self._slots.pop(key)
+            OUTBOUND_QUEUED.dec()
+            try:
+                await self._send(msg)
+                OUTBOUND_SENT.inc()
+            except Exception as e:  # pylint: disable=broad-except
+                logger.error("Outbound send failed: %s", e)
+
+    def close(self):
+        """Stop the writer and discard anything still queued."""
+        self._closed = True
+        OUTBOUND_QUEUED.dec(len(self._order))
+        self._order.clear()
+        self._slots.clear()
+        self._ready.set()
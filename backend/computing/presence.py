@@ -0,0 +1,100 @@
+"""In-memory presence for connected GPU nodes with batched heartbeat writes."""
+import asyncio
+import logging
+
+from django.utils import timezone
+
+from core.executor import database_sync_to_async
+from core.models import AgentToken
+
+logger = logging.getLogger(__name__)
+
+# How often connected nodes get their last_heartbeat bumped in the DB
+HEARTBEAT_FLUSH_INTERVAL = 15
+
+
+def _flush_heartbeats(node_ids):
+    """Bump last_heartbeat for every given node in a single UPDATE."""
+    from .models import Node  # pylint: disable=import-outside-toplevel
+    return Node.objects.filter(node_id__in=node_ids).update(
+        last_heartbeat=timezone.now(),
+    )
+
+
+class NodePresence:
+    """Process-wide registry of nodes with an open WebSocket.
+
+    Consumers call ``connect``/``disconnect`` instead of touching the
+    database on every keep-alive. One timer task per event loop flushes
+    the heartbeat of all connected nodes with one bulk UPDATE per
+    interval, so DB writes stay flat as the fleet grows. Deferred agent
+    token ``last_used`` updates are written on the same tick, and the
+    tokens of connected nodes are touched on every tick while they stay
+    connected.
+    """
+
+    def __init__(self, interval=HEARTBEAT_FLUSH_INTERVAL):
+        self.interval = interval
+        self._connections = {}
+        self._tokens = {}
+        self._task = None
+
+    def __contains__(self, node_id):
+        return node_id in self._connections
+
+    def __len__(self):
+        return len(self._connections)
+
+    @property
+    def node_ids(self):
+        """Node IDs currently connected to this process."""
+        return list(self._connections)
+
+    def connect(self, node_id, token_id=None):
+        """Record an open connection for the node and start the flusher.
+
+        ``token_id`` is the agent token the node authenticated with.
+        """
+        self._connections[node_id] = self._connections.get(node_id, 0) + 1
+        if token_id is not None:
+            self._tokens[node_id] = token_id
+        self._ensure_running()
+
+    def disconnect(self, node_id):
+        """Forget one connection for the node."""
+        remaining = self._connections.get(node_id, 0) - 1
+        if remaining > 0:
+            self._connections[node_id] = remaining
+        else:
+            self._connections.pop(node_id, None)
+            self._tokens.pop(node_id, None)
+
+    def _ensure_running(self):
+        loop = asyncio.get_running_loop()
+        task = self._task
+        if task is not None and not task.done() and task.get_loop() is loop:
+            return
+        self._task = loop.create_task(self._run())
+
+    async def _run(self):
+        while self._connections:
+            await asyncio.sleep(self.interval)
+            await self.flush()
+        self._task = None
+
+    async def flush(self):
+        """Write heartbeats for all connected nodes; return rows updated."""
+        node_ids = self.node_ids
+        try:
+            # Deferred AgentToken.last_used writes ride on the same timer
+            AgentToken.defer_last_used(self._tokens.values())
+            await database_sync_to_async(AgentToken.flush_last_used)()
+            if not node_ids:
+                return 0
+            return await database_sync_to_async(_flush_heartbeats)(node_ids)
+        except Exception as e:  # pylint: disable=broad-except
+            logger.error("Heartbeat flush failed for %d node(s): %s", len(node_ids), e)
+            return 0
+
+
+presence = NodePresence()
@@ -0,0 +1,171 @@
+"""Typed message schema and codec for the agent <-> server WebSocket protocol.
+
+Text frames always carry JSON. If both sides list ``msgpack`` in the
+``register`` handshake, the server answers with ``encoding="msgpack"`` in
+``registered`` and both switch to MessagePack binary frames; JSON text
+frames remain accepted at any time.
+
+A server that sets ``stream_assembly`` in ``registered`` keeps the text of
+every ``job_stream`` chunk it accepts; for streamed jobs the agent then
+sends a ``job_result`` carrying only ``response_length`` and
+``response_sha256`` (see ``stream_digest``) instead of the full response.
+
+This module is shared verbatim with the provider agent (``agent/protocol.py``)
+and must not import Django or anything else outside the standard library and
+msgspec.
+"""
+import hashlib
+from typing import Union
+
+import msgspec
+
+JSON = "json"
+MSGPACK = "msgpack"
+# Wire encodings this build supports, most preferred first
+ENCODINGS = (MSGPACK, JSON)
+
+
+class Message(msgspec.Struct, tag_field="type"):
+    """Base class for every protocol message; ``type`` is the tag."""
+
+
+# --- Agent -> server ---
+
+class Register(Message, tag="register"):
+    """Agent handshake announcing the node and its models."""
+    node_id: str
+    auth_token: str = ""
+    gpu_info: dict = msgspec.field(default_factory=dict)
+    encodings: list[str] = msgspec.field(default_factory=list)
+
+
+class JobAccepted(Message, tag="job_accepted"):
+    """The agent has started working on a dispatched job."""
+    task_id: int
+
+
+class StreamChunk(msgspec.Struct):
+    """Payload of a job_stream message."""
+    task_id: int
+    owner_id: int
+    chunk: str = ""
+
+
+class JobStream(Message, tag="job_stream"):
+    """A partial response for a streaming job."""
+    result: StreamChunk
+
+
+class JobOutcome(msgspec.Struct):
+    """Payload of a job_result message.
+
+    Streamed results may omit ``response`` and send its digest instead.
+    ``eval_count`` and ``eval_duration`` (nanoseconds) are passed through
+    from Ollama when it reports them.
+    """
+    task_id: int
+    status: str = "failed"
+    response: str = ""
+    error: str = ""
+    response_length: Union[int, None] = None
+    response_sha256: str = ""
+    eval_count: Union[int, None] = None
+    eval_duration: Union[int, None] = None
+
+
+class JobResult(Message, tag="job_result"):
+    """The final outcome of a job."""
+    result: JobOutcome
+
+
+class Pong(Message, tag="pong"):
+    """Reply to a server ping."""
+
+
+# --- Server -> agent ---
+
+class Registered(Message, tag="registered"):
+    """Successful handshake acknowledgement."""
+    status: str = "ok"
+    owner: str = ""
+    encoding: str = JSON
+    stream_assembly: bool = False
+
+
+class AuthError(Message, tag="auth_error"):
+    """Authentication failure; the server closes the socket after this."""
+    error: str = ""
+
+
+class JobData(msgspec.Struct):
+    """Payload of a job_dispatch message."""
+    task_id: int
+    owner_id: int
+    model: str
+    prompt: str
+    stream: bool = False
+
+
+class JobDispatch(Message, tag="job_dispatch"):
+    """A job offered to the agent."""
+    job_data: JobData
+
+
+class Ping(Message, tag="ping"):
+    """Keep-alive probe."""
+
+
+AgentMessage = Union[Register, JobAccepted, JobStream, JobResult, Pong]
+ServerMessage = Union[Registered, AuthError, JobDispatch, Ping]
+
+# Raised for malformed frames and schema violations alike
+DecodeError = msgspec.DecodeError
+
+_json_encoder = msgspec.json.Encoder()
+_msgpack_encoder = msgspec.msgpack.Encoder()
+# strict=False lets older agents send numeric IDs as strings
+_agent_json_decoder = msgspec.json.Decoder(AgentMessage, strict=False)
+_agent_msgpack_decoder = msgspec.msgpack.Decoder(AgentMessage, strict=False)
+_server_json_decoder = msgspec.json.Decoder(ServerMessage, strict=False)
+_server_msgpack_decoder = msgspec.msgpack.Decoder(ServerMessage, strict=False)
+
+
+def negotiate(offered) -> str:
+    """Pick the preferred encoding both sides support, falling back to JSON."""
+    for encoding in ENCODINGS:
+        if encoding in offered:
+            return encoding
+    return JSON
+
+
+def stream_digest(text: str) -> tuple[int, str]:
+    """Return the UTF-8 byte length and SHA-256 hex digest of a response."""
+    data = text.encode("utf-8")
+    return len(data), hashlib.sha256(data).hexdigest()
+
+
+def encode(msg: Message, encoding: str = JSON) -> Union[str, bytes]:
+    """Encode a message: JSON as ``str`` for text frames, MessagePack as ``bytes``."""
+    if encoding == MSGPACK:
+        return _msgpack_encoder.encode(msg)
+    return _json_encoder.encode(msg).decode("utf-8")
+
+
+def decode_agent_message(data: Union[str, bytes]) -> AgentMessage:
+    """Decode an agent frame (``str`` = JSON, ``bytes`` = MessagePack).
+
+    Raises ``DecodeError``.
+    """
+    if isinstance(data, bytes):
+        return _agent_msgpack_decoder.decode(data)
+    return _agent_json_decoder.decode(data)
+
+
+def decode_server_message(data: Union[str, bytes]) -> ServerMessage:
+    """Decode a server frame (``str`` = JSON, ``bytes`` = MessagePack).
+
+    Raises ``DecodeError``.
+    """
+    if isinstance(data, bytes):
+        return _server_msgpack_decoder.decode(data)
+    return _server_json_decoder.decode(data)
@@ -0,0 +1,200 @@
+"""Batched settlement of completed jobs.
+
+Settling a completion marks the job COMPLETED, credits the provider and
+appends the provider's ledger entry. Done one job at a time that is a
+handful of queries and a transaction per result. Here completions are
+queued instead, and a single writer per event loop settles everything
+queued so far in one transaction: one upsert of the jobs, one
+grouped ``UPDATE`` of the provider balances and one ``bulk_create`` of
+the ledger entries.
+
+The writer starts a batch as soon as it is idle, so a lone completion is
+not delayed; under load, completions that arrive while a batch is being
+written form the next one. A batch that fails is split in half and
+retried, so a bad completion fails only its own caller.
+"""
+import asyncio
+import logging
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Case, DecimalField, F, Value, When
+from django.utils import timezone
+
+from core.db_router import mark_written
+from core.executor import database_sync_to_async
+
+from .blobs import offload_result
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on completions settled in one transaction
+SETTLEMENT_BATCH_SIZE = 500
+
+# Job fields a settlement writes
+_JOB_FIELDS = (
+    "status", "result", "completed_at", "cost", "node",
+    "accepted_at", "first_token_at", "eval_count", "eval_duration",
+)
+
+
+class Completion:
+    """A successful job result waiting to be settled."""
+    __slots__ = ("task_id", "result", "provider_user_id", "lifecycle", "completed_at")
+
+    def __init__(self, task_id, result, provider_user_id, lifecycle=None):
+        self.task_id = task_id
+        self.result = result
+        self.provider_user_id = provider_user_id
+        self.lifecycle = lifecycle or {}
+        self.completed_at = timezone.now()
+
+
+def settle_batch(completions, cost, provider_share):
+    """Settle ``completions`` in one transaction; return the settled task IDs.
+
+    Each job is charged ``cost`` and its provider earns ``provider_share``.
+    Completions for jobs that no longer exist or are already finished are
+    skipped, so a replayed result is never credited twice.
+    """
+    # Blob writes happen before the transaction so no row lock waits on storage
+    results = {c.task_id: offload_result(c.result) for c in completions}
+    with transaction.atomic():
+        settled, earnings = _complete_jobs(completions, results, cost)
+        if earnings:
+            _credit_providers(earnings, provider_share)
+
+    mark_written(*{job.user_id for job in settled}, *earnings)
+    if settled:
+        logger.info("Settled %d job(s) for %d provider(s)", len(settled), len(earnings))
+    return {job.id for job in settled}
+
+
+def _complete_jobs(completions, results, cost):
+    """Mark the unfinished jobs COMPLETED; return them and each provider's jobs."""
+    from .models import Job, Node  # pylint: disable=import-outside-toplevel
+
+    jobs = Job.objects.select_for_update().filter(
+        status__in=("PENDING", "RUNNING"),
+    ).in_bulk([c.task_id for c in completions])
+    node_ids = dict(Node.objects.filter(node_id__in={
+        c.lifecycle["node_id"] for c in completions if c.lifecycle.get("node_id")
+    }).values_list("node_id", "id"))
+
+    settled, earnings = [], defaultdict(list)
+    for completion in completions:
+        # Popped, so a task completed twice in one batch is settled once
+        job = jobs.pop(completion.task_id, None)
+        if job is None:
+            logger.warning("Job %s not found or already finished", completion.task_id)
+            continue
+        job.status = "COMPLETED"
+        job.result = results[completion.task_id]
+        job.completed_at = completion.completed_at
+        job.cost = cost
+        for field, value in completion.lifecycle.items():
+            if value is None:
+                continue
+            if field == "node_id":
+                job.node_id = node_ids.get(value)
+            else:
+                setattr(job, field, value)
+        settled.append(job)
+        if completion.provider_user_id:
+            earnings[completion.provider_user_id].append(job)
+    if settled:
+        # An upsert on the primary key writes every row in one plain statement;
+        # bulk_update's per-field CASE expressions cost more than the queries saved
+        Job.objects.bulk_create(
+            settled, update_conflicts=True, unique_fields=["id"], update_fields=_JOB_FIELDS,
+        )
+    return settled, earnings
+
+
+def _credit_providers(earnings, provider_share):
+    """Credit each provider for its jobs and append one ledger entry per job."""
+    # pylint: disable=import-outside-toplevel
+    from core.models import User
+    from payments.models import CreditLog
+
+    User.objects.filter(id__in=earnings).update(wallet_balance=F("wallet_balance") + Case(
+        *(When(id=uid, then=Value(provider_share * len(jobs)))
+          for uid, jobs in earnings.items()),
+        output_field=DecimalField(max_digits=12, decimal_places=2),
+    ))
+    balances = dict(User.objects.filter(id__in=earnings).values_list("id", "wallet_balance"))
+    logs = []
+    for uid, jobs in earnings.items():
+        if uid not in balances:
+            logger.error("Provider user %s not found", uid)
+            continue
+        # Work back from the new balance to each entry's balance_after
+        balance = balances[uid] - provider_share * len(jobs)
+        for job in jobs:
+            balance += provider_share
+            logs.append(CreditLog(
+                user_id=uid, amount=provider_share, balance_after=balance,
+                description=f"Earned: Job #{job.id} completed (model: {job.model or 'unknown'})",
+            ))
+    CreditLog.objects.bulk_create(logs)
+
+
+class SettlementQueue:
+    """Process-wide queue of completions drained by one batch writer.
+
+    ``settle`` returns once the completion's batch has committed, so
+    callers can notify users knowing the job and balances are written.
+    """
+
+    def __init__(self, cost, provider_share, batch_size=SETTLEMENT_BATCH_SIZE):
+        self.cost = cost
+        self.provider_share = provider_share
+        self.batch_size = batch_size
+        self._pending = []
+        self._task = None
+
+    def __len__(self):
+        return len(self._pending)
+
+    async def settle(self, task_id, result, provider_user_id, lifecycle=None):
+        """Queue a completion; return whether the job was settled."""
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((Completion(task_id, result, provider_user_id, lifecycle), future))
+        self._ensure_running()
+        return await future
+
+    def _ensure_running(self):
+        loop = asyncio.get_running_loop()
+        task = self._task
+        if task is not None and not task.done() and task.get_loop() is loop:
+            return
+        self._task = loop.create_task(self._run())
+
+    async def _run(self):
+        while self._pending:
+            batch = self._pending[:self.batch_size]
+            del self._pending[:self.batch_size]
+            await self._write(batch)
+        self._task = None
+
+    async def _write(self, batch):
+        try:
+            settled = await database_sync_to_async(settle_batch)(
+                [completion for completion, _ in batch], self.cost, self.provider_share,
+            )
+        except Exception as e:  # pylint: disable=broad-except
+            if len(batch) > 1:
+                # Retry each half, so only the bad completion fails its caller
+                logger.warning("Settlement of %d job(s) failed, splitting: %s", len(batch), e)
+                middle = len(batch) // 2
+                await self._write(batch[:middle])
+                await self._write(batch[middle:])
+                return
+            completion, future = batch[0]
+            logger.error("Settlement of job %s failed: %s", completion.task_id, e)
+            if not future.done() and not future.get_loop().is_closed():
+                future.set_exception(e)
+            return
+        for completion, future in batch:
+            if not future.done() and not future.get_loop().is_closed():
+                future.set_result(completion.task_id in settled)
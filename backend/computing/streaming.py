@@ -0,0 +1,176 @@
+"""Server-side batching of job_stream chunks into dashboard frames."""
+import asyncio
+import logging
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+# A buffered chunk is held for at most this long before it is flushed
+STREAM_FLUSH_INTERVAL = 0.04
+# Flush immediately once this many characters are buffered for a task
+STREAM_FLUSH_CHARS = 2048
+# Sent frames kept per running task for dashboard resume, in characters
+STREAM_REPLAY_CHARS = 256 * 1024
+# How long a resuming dashboard waits for the replay before going live
+STREAM_RESUME_TIMEOUT = 2.0
+# Outstanding resume requests allowed per dashboard connection
+STREAM_RESUME_LIMIT = 50
+
+
+def replay_group(task_id):
+    """Channel-layer group of the GPU consumer(s) streaming this task."""
+    return f"job_stream_{task_id}"
+
+
+class _TaskBuffer:
+    """Pending chunks, sent history and full text for a task."""
+    __slots__ = (
+        "owner_id", "chunks", "size", "timer", "history", "history_size", "text",
+    )
+
+    def __init__(self, owner_id):
+        self.owner_id = owner_id
+        self.chunks = []
+        self.size = 0
+        self.timer = None
+        self.history = deque()
+        self.history_size = 0
+        self.text = []
+
+    @property
+    def seq(self):
+        """Sequence number of the last frame sent; the history always keeps it."""
+        return self.history[-1]["seq"] if self.history else 0
+
+
+class StreamAggregator:
+    """Buffer job_stream chunks per task and flush them as batched frames.
+
+    Chunks for a task are merged into one frame when the flush window
+    elapses or the buffered text reaches ``max_chars``, whichever comes
+    first. Every frame carries a per-task ``seq`` starting at 1 so clients
+    can detect gaps and duplicates.
+
+    Sent frames are also kept, up to ``replay_chars`` of text per task, so
+    a reconnecting dashboard can ask for everything after its last ``seq``;
+    older frames are dropped first. The complete text of each task is
+    assembled as well, so the agent's final result can skip resending it.
+
+    ``send`` is an async callable ``send(owner_id, frame)``.
+    """
+
+    def __init__(self, send, interval=STREAM_FLUSH_INTERVAL,
+                 max_chars=STREAM_FLUSH_CHARS, replay_chars=STREAM_REPLAY_CHARS):
+        self._send = send
+        self.interval = interval
+        self.max_chars = max_chars
+        self.replay_chars = replay_chars
+        self._buffers = {}
+        self._pending = set()
+        self._lock = asyncio.Lock()
+
+    def __contains__(self, task_id):
+        return task_id in self._buffers
+
+    def __iter__(self):
+        """Iterate over a snapshot of the tasks with open buffers."""
+        return iter(list(self._buffers))
+
+    async def add(self, task_id, owner_id, chunk):
+        """Buffer a chunk, flushing right away if the size threshold is hit."""
+        if not chunk:
+            return
+        buf = self._buffers.get(task_id)
+        if buf is None:
+            buf = self._buffers[task_id] = _TaskBuffer(owner_id)
+        buf.chunks.append(chunk)
+        buf.size += len(chunk)
+        buf.text.append(chunk)
+
+        if buf.size >= self.max_chars:
+            await self.flush(task_id)
+        elif buf.timer is None:
+            buf.timer = asyncio.get_running_loop().call_later(
+                self.interval, self._on_timer, task_id,
+            )
+
+    def _on_timer(self, task_id):
+        """Timer callback: schedule an async flush for the task."""
+        buf = self._buffers.get(task_id)
+        if buf is None:
+            return
+        buf.timer = None
+        task = asyncio.ensure_future(self.flush(task_id))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def flush(self, task_id):
+        """Send any buffered text for the task as a single frame."""
+        buf = self._buffers.get(task_id)
+        if buf is None or not buf.chunks:
+            return
+        if buf.timer is not None:
+            buf.timer.cancel()
+            buf.timer = None
+
+        text = "".join(buf.chunks)
+        count = len(buf.chunks)
+        buf.chunks = []
+        buf.size = 0
+        frame = {
+            "type": "job_stream",
+            "task_id": task_id,
+            "chunk": text,
+            "seq": buf.seq + 1,
+            "chunks": count,
+        }
+        buf.history.append(frame)
+        buf.history_size += len(text)
+        while buf.history_size > self.replay_chars and len(buf.history) > 1:
+            buf.history_size -= len(buf.history.popleft()["chunk"])
+        # Serialize sends so frames leave in sequence order
+        async with self._lock:
+            try:
+                await self._send(buf.owner_id, frame)
+            except Exception as e:  # pylint: disable=broad-except
+                logger.warning("Stream flush failed for task %s: %s", task_id, e)
+
+    def text(self, task_id):
+        """Return every chunk received for the task joined, or None if unknown."""
+        buf = self._buffers.get(task_id)
+        if buf is None:
+            return None
+        return "".join(buf.text)
+
+    async def replay(self, task_id, after_seq):
+        """Flush pending text and return the kept frames with ``seq > after_seq``.
+
+        If frames after ``after_seq`` were already dropped from the history,
+        one frame marked ``truncated`` carrying the task's whole text is
+        returned instead, for the caller to replace what it holds.
+        """
+        await self.flush(task_id)
+        buf = self._buffers.get(task_id)
+        if buf is None:
+            return []
+        frames = [frame for frame in buf.history if frame["seq"] > after_seq]
+        if frames and frames[0]["seq"] > after_seq + 1:
+            return [{
+                "type": "job_stream",
+                "task_id": task_id,
+                "chunk": "".join(buf.text),
+                "seq": buf.seq,
+                "chunks": len(buf.text),
+                "truncated": True,
+            }]
+        return frames
+
+    async def finish(self, task_id):
+        """Flush the remaining text for a task and forget it."""
+        await self.flush(task_id)
+        self._buffers.pop(task_id, None)
+
+    async def close(self):
+        """Flush and drop every open task buffer."""
+        for task_id in list(self._buffers):
+            await self.finish(task_id)
@@ -47,3 +47,10 @@ def find_node_for_job(job_id):
 
     except Job.DoesNotExist:
         return "Job not found"
+
+
+@shared_task
+def archive_old_jobs():
+    """Move finished jobs past ``JOB_RETENTION_DAYS`` into the archive."""
+    from .archive import archive_jobs  # pylint: disable=import-outside-toplevel
+    return archive_jobs()
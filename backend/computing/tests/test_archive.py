@@ -0,0 +1,226 @@
+"""Tests for archiving finished jobs past the retention window."""
+import datetime
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import IntegrityError
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from ..archive import archive_jobs
+from ..models import ArchivedJob, ChatSession, Job, Node
+from ..tasks import archive_old_jobs
+from ..utils import get_provider_stats
+
+User = get_user_model()
+
+
+class ArchiveTestCase(TestCase):
+    """A consumer with one old and one recent job on a provider's node."""
+
+    def setUp(self):
+        """Set up test data."""
+        self.user = User.objects.create_user(username="archiver", password="p")
+        self.provider = User.objects.create_user(username="archive_provider", password="p")
+        self.node = Node.objects.create(
+            owner=self.provider, node_id="archive-node", name="Archive Node",
+            gpu_info={"models": ["llama2"]}, is_active=True,
+        )
+        self.session = ChatSession.objects.create(user=self.user, name="Old chat")
+        long_ago = timezone.now() - datetime.timedelta(days=200)
+        self.old = self._job(
+            long_ago, prompt="an old question", result={"text": "an old answer"},
+            eval_count=42, eval_duration=datetime.timedelta(seconds=2),
+            first_token_at=long_ago - datetime.timedelta(seconds=3),
+        )
+        self.recent = self._job(timezone.now(), prompt="a new question")
+
+    def _job(self, completed_at, status="COMPLETED", **kwargs):
+        prompt = kwargs.pop("prompt", "hi")
+        return Job.objects.create(
+            user=self.user, session=self.session, node=self.node,
+            task_type="inference", input_data={"prompt": prompt, "model": "llama2"},
+            status=status, completed_at=completed_at, cost=Decimal("1.50"), **kwargs,
+        )
+
+
+class ArchiveJobsTests(ArchiveTestCase):
+    """archive_jobs moves old finished jobs and nothing else."""
+
+    def test_moves_only_old_finished_jobs(self):
+        """Recent and unfinished jobs stay in the Job table."""
+        long_ago = timezone.now() - datetime.timedelta(days=200)
+        failed = self._job(long_ago, status="FAILED")
+        running = self._job(None, status="RUNNING")
+
+        self.assertEqual(archive_jobs(days=90), 2)
+
+        self.assertEqual(
+            set(ArchivedJob.objects.values_list("id", flat=True)), {self.old.id, failed.id},
+        )
+        self.assertEqual(
+            set(Job.objects.values_list("id", flat=True)), {self.recent.id, running.id},
+        )
+
+    def test_round_trip(self):
+        """to_job restores the fields that only live in the payload."""
+        archive_jobs(days=90)
+        job = ArchivedJob.objects.get(id=self.old.id).to_job()
+
+        self.assertEqual(job.id, self.old.id)
+        self.assertEqual(job.session_id, self.session.id)
+        self.assertEqual(job.input_data, self.old.input_data)
+        self.assertEqual(job.result, {"text": "an old answer"})
+        self.assertEqual(job.model, "llama2")
+        self.assertEqual(job.cost, Decimal("1.50"))
+        self.assertEqual(job.eval_count, 42)
+        self.assertEqual(job.eval_duration, datetime.timedelta(seconds=2))
+        self.assertEqual(job.first_token_at, self.old.first_token_at)
+        self.assertIsNone(job.dispatched_at)
+
+    def test_conflict_keeps_live_job(self):
+        """A job already in the archive is not deleted from the Job table."""
+        stale = ArchivedJob.from_job(self.old)
+        stale.status = "FAILED"
+        stale.save()
+
+        with self.assertRaises(IntegrityError):
+            archive_jobs(days=90)
+
+        self.assertTrue(Job.objects.filter(id=self.old.id).exists())
+        self.assertEqual(ArchivedJob.objects.get(id=self.old.id).status, "FAILED")
+
+    def test_limit_and_batches(self):
+        """Batches repeat until the limit is reached."""
+        long_ago = timezone.now() - datetime.timedelta(days=200)
+        for _ in range(4):
+            self._job(long_ago)
+        self.assertEqual(archive_jobs(days=90, batch_size=2, limit=3), 3)
+        self.assertEqual(archive_jobs(days=90, batch_size=2), 2)
+        self.assertEqual(ArchivedJob.objects.count(), 5)
+
+    @override_settings(JOB_RETENTION_DAYS=0)
+    def test_disabled(self):
+        """A retention of zero days archives nothing."""
+        self.assertEqual(archive_jobs(), 0)
+        self.assertEqual(archive_old_jobs(), 0)
+        self.assertFalse(ArchivedJob.objects.exists())
+
+    @override_settings(JOB_RETENTION_DAYS=90)
+    def test_task(self):
+        """The periodic task uses JOB_RETENTION_DAYS."""
+        self.assertEqual(archive_old_jobs(), 1)
+        self.assertFalse(Job.objects.filter(id=self.old.id).exists())
+
+
+class ArchiveCommandTests(ArchiveTestCase):
+    """manage.py archive_jobs"""
+
+    def test_dry_run_moves_nothing(self):
+        """--dry-run only reports the count."""
+        out = StringIO()
+        call_command("archive_jobs", "--days", "90", "--dry-run", stdout=out)
+        self.assertIn("1 job(s)", out.getvalue())
+        self.assertFalse(ArchivedJob.objects.exists())
+
+    def test_archives(self):
+        """Without --dry-run the old job moves."""
+        out = StringIO()
+        call_command("archive_jobs", "--days", "90", stdout=out)
+        self.assertIn("Archived 1 job(s)", out.getvalue())
+        self.assertTrue(ArchivedJob.objects.filter(id=self.old.id).exists())
+
+    def test_rejects_non_positive_days(self):
+        """--days 0 is an error rather than archiving everything."""
+        with self.assertRaises(CommandError):
+            call_command("archive_jobs", "--days", "0", stdout=StringIO())
+
+
+class ArchivedJobReadTests(ArchiveTestCase):
+    """Archived jobs stay visible to the detail view and the counters."""
+
+    def setUp(self):
+        """Snapshot the counters, then archive the old job."""
+        super().setUp()
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.stats_before = self.client.get("/api/computing/stats/").data
+        self.sessions_before = self.client.get("/api/computing/sessions/").data["results"]
+        self.provider_before = get_provider_stats(self.provider)
+        archive_jobs(days=90)
+
+    def test_detail_view_restores_archived_job(self):
+        """The detail view falls back to the archive."""
+        response = self.client.get(f"/api/computing/jobs/{self.old.id}/")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.data["archived"])
+        self.assertEqual(response.data["prompt"], "an old question")
+        self.assertEqual(response.data["result"], {"text": "an old answer"})
+        self.assertEqual(response.data["node_id"], "archive-node")
+
+        live = self.client.get(f"/api/computing/jobs/{self.recent.id}/")
+        self.assertFalse(live.data["archived"])
+
+    def test_detail_view_checks_owner(self):
+        """Another user cannot read an archived job."""
+        other = User.objects.create_user(username="snoop", password="p")
+        self.client.force_authenticate(user=other)
+        response = self.client.get(f"/api/computing/jobs/{self.old.id}/")
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(self.client.get("/api/computing/jobs/999999/").status_code, 404)
+
+    def test_counters_unchanged(self):
+        """All-time totals add the archive back in."""
+        stats = self.client.get("/api/computing/stats/").data
+        self.assertEqual(stats["total_jobs"], self.stats_before["total_jobs"])
+        self.assertEqual(stats["completed_jobs"], self.stats_before["completed_jobs"])
+
+        provider = get_provider_stats(self.provider)["provider"]
+        before = self.provider_before["provider"]
+        self.assertEqual(provider["total_jobs_served"], before["total_jobs_served"])
+        self.assertEqual(provider["model_breakdown"], before["model_breakdown"])
+        consumer = get_provider_stats(self.user)["consumer"]
+        self.assertEqual(consumer["total_jobs"], 2)
+
+    def test_session_summary_unchanged(self):
+        """Session summaries count archived messages and their cost."""
+        sessions = self.client.get("/api/computing/sessions/").data["results"]
+        for key in ("message_count", "completed_count", "total_cost", "models"):
+            self.assertEqual(sessions[0][key], self.sessions_before[0][key])
+
+
+class ArchivedMessagesTests(ArchiveTestCase):
+    """A session's history pages through live and archived messages alike."""
+
+    def test_pages_through_archived_messages(self):
+        """Archived and live messages interleave in one cursor order."""
+        long_ago = timezone.now() - datetime.timedelta(days=200)
+        for i in range(2):
+            self._job(long_ago, prompt=f"old {i}", result={"text": f"answer {i}"})
+        self._job(None, status="RUNNING", prompt="still running")
+        self.assertEqual(archive_jobs(days=90), 3)
+
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+        url = f"/api/computing/sessions/{self.session.id}/messages/"
+        pages, params = [], {"limit": 2}
+        while True:
+            data = client.get(url, params).data
+            pages.append([m["prompt"] for m in data["results"]])
+            if data["next"] is None:
+                break
+            params["cursor"] = data["next"]
+
+        self.assertEqual(pages, [
+            ["old 1", "still running"],
+            ["a new question", "old 0"],
+            ["an old question"],
+        ])
+        oldest = client.get(url, {"limit": 5}).data["results"][0]
+        self.assertEqual(oldest["result"], {"text": "an old answer"})
+        self.assertEqual(oldest["session_id"], str(self.session.id))
+        self.assertEqual(oldest["cost"], "1.50")
@@ -0,0 +1,150 @@
+"""Tests for offloading large job results to the blob store."""
+import json
+import os
+import shutil
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from ..blobs import blob_name, is_reference, load_result, offload_result
+from ..models import ChatSession, Job
+from ..utils import get_provider_stats
+
+User = get_user_model()
+
+BIG_OUTPUT = "All work and no play makes Jack a dull boy. " * 200
+
+
+class BlobStoreTestCase(TestCase):
+    """Points the job_results storage at a temporary directory."""
+
+    def setUp(self):
+        """Set up a private blob root and a consumer."""
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root, ignore_errors=True)
+        storages = override_settings(
+            STORAGES={"job_results": {
+                "BACKEND": "django.core.files.storage.FileSystemStorage",
+                "OPTIONS": {"location": self.root, "allow_overwrite": True},
+            }},
+            JOB_RESULT_BLOB_THRESHOLD=1024,
+        )
+        storages.enable()
+        self.addCleanup(storages.disable)
+        self.user = User.objects.create_user(username="blobber", password="p")
+
+    def _job(self, result, **kwargs):
+        return Job.objects.create(
+            user=self.user, task_type="inference", status="COMPLETED",
+            input_data={"prompt": "tell me a story", "model": "llama2"},
+            result=result, **kwargs,
+        )
+
+    def _path(self, digest):
+        return os.path.join(self.root, blob_name(digest))
+
+
+class OffloadTests(BlobStoreTestCase):
+    """Job.save moves results over the threshold into the store."""
+
+    def test_small_result_stays_inline(self):
+        """Results under the threshold are stored as-is."""
+        job = self._job({"output": "short"})
+        job.refresh_from_db()
+        self.assertEqual(job.result, {"output": "short"})
+        self.assertFalse(os.listdir(self.root))
+
+    def test_large_result_is_offloaded(self):
+        """The row keeps a reference and the blob is compressed."""
+        job = self._job({"output": BIG_OUTPUT})
+        job.refresh_from_db()
+        self.assertTrue(is_reference(job.result))
+        raw_size = len(json.dumps({"output": BIG_OUTPUT}, separators=(",", ":")))
+        self.assertEqual(job.result["blob"]["size"], raw_size)
+        self.assertLess(os.path.getsize(self._path(job.result["blob"]["sha256"])), raw_size)
+        self.assertEqual(load_result(job.result), {"output": BIG_OUTPUT})
+
+    def test_identical_results_dedupe(self):
+        """Equal results share one blob."""
+        first = self._job({"output": BIG_OUTPUT})
+        second = self._job({"output": BIG_OUTPUT})
+        self.assertEqual(first.result, second.result)
+        self.assertEqual(len(os.listdir(os.path.dirname(self._path(first.result["blob"]["sha256"])))), 1)
+
+    def test_offload_is_idempotent(self):
+        """Saving a job again keeps its reference."""
+        job = self._job({"output": BIG_OUTPUT})
+        reference = job.result
+        job.save()
+        self.assertEqual(job.result, reference)
+        self.assertEqual(offload_result(reference), reference)
+
+    def test_update_fields_without_result(self):
+        """A save that does not write result leaves it alone."""
+        job = self._job(None)
+        job.result = {"output": BIG_OUTPUT}
+        job.save(update_fields=["status"])
+        self.assertEqual(job.result, {"output": BIG_OUTPUT})
+        self.assertFalse(os.listdir(self.root))
+
+    @override_settings(JOB_RESULT_BLOB_THRESHOLD=0)
+    def test_threshold_zero_disables(self):
+        """A threshold of 0 keeps every result inline."""
+        job = self._job({"output": BIG_OUTPUT})
+        job.refresh_from_db()
+        self.assertEqual(job.result, {"output": BIG_OUTPUT})
+
+
+class BlobReadTests(BlobStoreTestCase):
+    """Detail endpoints read blobs back; lists return the reference."""
+
+    def setUp(self):
+        """Create one offloaded job in a session."""
+        super().setUp()
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.session = ChatSession.objects.create(user=self.user)
+        self.job = self._job({"output": BIG_OUTPUT}, session=self.session)
+
+    def test_detail_view_resolves_result(self):
+        """The detail view returns the full result."""
+        response = self.client.get(f"/api/computing/jobs/{self.job.id}/")
+        self.assertEqual(response.data["result"], {"output": BIG_OUTPUT})
+
+    def test_result_view_streams_blob(self):
+        """jobs/<id>/result/ streams the decompressed document."""
+        response = self.client.get(f"/api/computing/jobs/{self.job.id}/result/")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response["Content-Type"], "application/json")
+        self.assertEqual(json.loads(b"".join(response.streaming_content)), {"output": BIG_OUTPUT})
+
+    def test_result_view_inline_result(self):
+        """An inline result is returned as JSON too."""
+        job = self._job({"output": "short"})
+        response = self.client.get(f"/api/computing/jobs/{job.id}/result/")
+        self.assertEqual(json.loads(b"".join(response.streaming_content)), {"output": "short"})
+
+    def test_result_view_checks_owner(self):
+        """Another user cannot read the result."""
+        other = User.objects.create_user(username="peeker", password="p")
+        self.client.force_authenticate(user=other)
+        response = self.client.get(f"/api/computing/jobs/{self.job.id}/result/")
+        self.assertEqual(response.status_code, 403)
+
+    def test_provider_stats_resolve_result(self):
+        """The consumer's jobs in the provider stats carry the full result."""
+        jobs = get_provider_stats(self.user)["consumer"]["jobs"]
+        self.assertEqual(jobs[0]["result"], {"output": BIG_OUTPUT})
+
+    def test_lists_never_read_blobs(self):
+        """Lists return the reference even when the blob is unreadable."""
+        shutil.rmtree(self.root)
+        jobs = self.client.get("/api/computing/jobs/", {"fields": "id,result"}).data["results"]
+        self.assertEqual(jobs[0]["result"], self.job.result)
+        messages = self.client.get(
+            f"/api/computing/sessions/{self.session.id}/messages/",
+        ).data["results"]
+        self.assertEqual(messages[0]["result"], self.job.result)
@@ -2,22 +2,31 @@
 # pylint: disable=protected-access, unused-import
 
 from decimal import Decimal
+from unittest.mock import patch
 
 import pytest
 from channels.testing import WebsocketCommunicator
 from django.contrib.auth import get_user_model
 
+from asgiref.sync import async_to_sync, sync_to_async
+
 from computing.consumers import (
     GPUConsumer,
     DashboardConsumer,
     JOB_COST,
     PROVIDER_SHARE,
+    _network_snapshot,
+    settlement,
 )
 from computing.models import Job, Node
 
 User = get_user_model()
 
 
+def _snapshot_models():
+    return async_to_sync(_network_snapshot)()[1]
+
+
 # ---------------------------------------------------------------------------
 # GPUConsumer – sync helper tests
 # ---------------------------------------------------------------------------
@@ -43,39 +52,36 @@ class TestGPUConsumerSyncHelpers:
             is_active=True,
         )
 
-    # _get_models_sync_shared
-    def test_get_models_sync_shared_aggregates(self):
-        """_get_models_sync_shared aggregates models from active nodes."""
-        consumer = GPUConsumer()
-        models = consumer._get_models_sync_shared()
+    # _network_snapshot models
+    def test_snapshot_models_aggregates(self):
+        """The snapshot aggregates models from active nodes."""
+        models = _snapshot_models()
         names = [m["name"] for m in models]
         assert "llama2" in names
         assert "mistral" in names
 
-    def test_get_models_sync_shared_inactive_excluded(self):
+    def test_snapshot_models_inactive_excluded(self):
         """Inactive nodes are excluded from models."""
         self.node.is_active = False
         self.node.save()
-        consumer = GPUConsumer()
-        models = consumer._get_models_sync_shared()
+        models = _snapshot_models()
         assert models == []
 
-    def test_get_models_sync_shared_provider_count(self):
+    def test_snapshot_models_provider_count(self):
         """Provider count is incremented for each node with the model."""
         Node.objects.create(
             owner=self.provider, node_id="node-sync-2", name="Sync Node 2",
             gpu_info={"models": ["llama2"]}, is_active=True,
         )
-        consumer = GPUConsumer()
-        models = consumer._get_models_sync_shared()
+        models = _snapshot_models()
         llama_entry = next(m for m in models if m["name"] == "llama2")
         assert llama_entry["providers"] == 2
 
-    def test_get_models_sync_shared_empty_gpu_info(self):
-        """Nodes with empty gpu_info return no models."""
-        Node.objects.all().update(gpu_info={})
-        consumer = GPUConsumer()
-        models = consumer._get_models_sync_shared()
+    def test_snapshot_models_empty_gpu_info(self):
+        """Nodes re-saved with empty gpu_info return no models."""
+        self.node.gpu_info = {}
+        self.node.save()
+        models = _snapshot_models()
         assert models == []
 
 
@@ -106,30 +112,27 @@ class TestGPUConsumerDBHelpers:
 
     def test_validate_token_returns_none_for_empty(self):
         """_validate_token returns None for empty token."""
-        from asgiref.sync import async_to_sync
         consumer = GPUConsumer()
         result = async_to_sync(consumer._validate_token)("")
         assert result is None
 
     def test_validate_token_returns_none_for_invalid(self):
         """_validate_token returns None for invalid token."""
-        from asgiref.sync import async_to_sync
         consumer = GPUConsumer()
         result = async_to_sync(consumer._validate_token)("gpc_invalidtoken")
         assert result is None
 
-    def test_validate_token_returns_user_id_for_valid(self):
-        """_validate_token returns user_id for valid AgentToken."""
-        from asgiref.sync import async_to_sync
+    def test_validate_token_returns_token_for_valid(self):
+        """_validate_token returns the AgentToken for a valid token."""
         from core.models import AgentToken
-        _, raw = AgentToken.generate(self.provider, label="test-agent")
+        token, raw = AgentToken.generate(self.provider, label="test-agent")
         consumer = GPUConsumer()
         result = async_to_sync(consumer._validate_token)(raw)
-        assert result == self.provider.id
+        assert result == token
+        assert result.user_id == self.provider.id
 
     def test_register_node_creates_new(self):
         """_register_node creates a new Node record."""
-        from asgiref.sync import async_to_sync
         consumer = GPUConsumer()
         username = async_to_sync(consumer._register_node)(
             "new-node-id", {"models": ["test"]}, self.provider.id,
@@ -139,17 +142,16 @@ class TestGPUConsumerDBHelpers:
 
     def test_register_node_updates_existing(self):
         """_register_node updates an existing Node."""
-        from asgiref.sync import async_to_sync
         consumer = GPUConsumer()
         async_to_sync(consumer._register_node)(
             "node-db-1", {"models": ["updated"]}, self.provider.id,
         )
         node = Node.objects.get(node_id="node-db-1")
         assert node.gpu_info == {"models": ["updated"]}
+        assert list(node.served_models.values_list("model_name", flat=True)) == ["updated"]
 
     def test_mark_node_inactive(self):
         """_mark_node_inactive sets is_active=False."""
-        from asgiref.sync import async_to_sync
         consumer = GPUConsumer()
         async_to_sync(consumer._mark_node_inactive)("node-db-1")
         self.node.refresh_from_db()
@@ -157,7 +159,6 @@ class TestGPUConsumerDBHelpers:
 
     def test_complete_job_marks_completed(self):
         """_complete_job marks job as COMPLETED and sets cost."""
-        from asgiref.sync import async_to_sync
         job = Job.objects.create(
             user=self.consumer_user, node=self.node,
             task_type="inference", input_data={"model": "llama2", "prompt": "hi"},
@@ -175,7 +176,6 @@ class TestGPUConsumerDBHelpers:
 
     def test_complete_job_credits_provider(self):
         """_complete_job credits the provider's wallet."""
-        from asgiref.sync import async_to_sync
         job = Job.objects.create(
             user=self.consumer_user, node=self.node,
             task_type="inference", input_data={"model": "llama2", "prompt": "hi"},
@@ -190,14 +190,21 @@ class TestGPUConsumerDBHelpers:
 
     def test_complete_job_nonexistent(self):
         """_complete_job handles nonexistent job gracefully."""
-        from asgiref.sync import async_to_sync
         consumer = GPUConsumer()
         # Should not raise
         async_to_sync(consumer._complete_job)(99999, {}, self.provider.id)
 
+    def test_complete_job_settlement_error_logged(self):
+        """A failed settlement is logged instead of escaping the consumer."""
+        async def settle(*args):
+            raise RuntimeError("db down")
+
+        consumer = GPUConsumer()
+        with patch.object(settlement, "settle", settle):
+            assert async_to_sync(consumer._complete_job)(1, {}, self.provider.id) is False
+
     def test_fail_job(self):
         """_fail_job marks job as FAILED."""
-        from asgiref.sync import async_to_sync
         job = Job.objects.create(
             user=self.consumer_user, node=self.node,
             task_type="inference", input_data={"prompt": "test"},
@@ -212,13 +219,11 @@ class TestGPUConsumerDBHelpers:
 
     def test_fail_job_nonexistent(self):
         """_fail_job handles nonexistent job gracefully."""
-        from asgiref.sync import async_to_sync
         consumer = GPUConsumer()
         async_to_sync(consumer._fail_job)(99999, {"error": "nope"})
 
     def test_get_job_completion_data(self):
         """_get_job_completion_data returns correct structure."""
-        from asgiref.sync import async_to_sync
         job = Job.objects.create(
             user=self.consumer_user, node=self.node,
             task_type="inference",
@@ -236,7 +241,6 @@ class TestGPUConsumerDBHelpers:
 
     def test_get_job_completion_data_nonexistent(self):
         """_get_job_completion_data returns None for missing job."""
-        from asgiref.sync import async_to_sync
         consumer = GPUConsumer()
         data = async_to_sync(consumer._get_job_completion_data)(
             99999, self.provider.id,
@@ -245,7 +249,6 @@ class TestGPUConsumerDBHelpers:
 
     def test_get_job_completion_data_non_dict_input(self):
         """_get_job_completion_data handles non-dict input_data."""
-        from asgiref.sync import async_to_sync
         job = Job.objects.create(
             user=self.consumer_user, node=self.node,
             task_type="inference",
@@ -294,6 +297,108 @@ class TestGPUConsumerJobDispatch:
             "job_data": {"task_id": 1, "owner_id": 42},
         })
 
+    @staticmethod
+    def _registered_consumer(provider_id):
+        """A consumer that has dispatched job 5 (owner 7) to its node."""
+        from unittest.mock import AsyncMock
+        from computing import protocol
+        from computing.inflight import InFlightJobs
+        consumer = GPUConsumer()
+        consumer.node_id = "inflight-node"
+        consumer.provider_user_id = provider_id
+        consumer.encoding = protocol.JSON
+        consumer._inflight = InFlightJobs()
+        consumer._stream = AsyncMock()
+        consumer._replay_tasks = set()
+        consumer.channel_layer = AsyncMock()
+        consumer.channel_name = "inflight-channel"
+        consumer.send = AsyncMock()
+        return consumer
+
+    @pytest.mark.asyncio
+    async def test_stream_checked_against_dispatched_jobs(self):
+        """job_stream ownership is verified from the in-flight table."""
+        from computing import protocol
+        consumer = self._registered_consumer(self.provider.id)
+        await consumer.job_dispatch({"job_data": {
+            "task_id": 5, "owner_id": 7, "model": "llama3", "prompt": "hi",
+        }})
+        assert 5 in consumer._inflight
+
+        await consumer._handle_job_stream(protocol.StreamChunk(task_id=5, owner_id=7, chunk="a"))
+        consumer._stream.add.assert_awaited_once_with(5, 7, "a")
+
+        # Wrong owner and never-dispatched tasks are dropped
+        await consumer._handle_job_stream(protocol.StreamChunk(task_id=5, owner_id=8, chunk="b"))
+        await consumer._handle_job_stream(protocol.StreamChunk(task_id=6, owner_id=7, chunk="c"))
+        assert consumer._stream.add.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_result_for_unknown_task_is_rejected(self):
+        """job_result for a task not dispatched here leaves the job untouched."""
+        from computing import protocol
+        consumer = self._registered_consumer(self.provider.id)
+        owner = await sync_to_async(User.objects.create_user)(
+            username="inflight_owner", password="p",
+        )
+        job = await sync_to_async(Job.objects.create)(
+            user=owner, task_type="inference",
+            input_data={"prompt": "hi", "model": "llama3"}, status="PENDING",
+        )
+        await consumer._handle_job_result(protocol.JobOutcome(
+            task_id=job.id, status="success", response="forged",
+        ))
+        await sync_to_async(job.refresh_from_db)()
+        assert job.status == "PENDING"
+        consumer._stream.finish.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_dispatch_of_unserved_model_is_skipped(self):
+        """Jobs for models the node did not advertise are neither sent nor tracked."""
+        consumer = self._registered_consumer(self.provider.id)
+        consumer._inflight.models = {"mistral"}
+        await consumer.job_dispatch({"job_data": {
+            "task_id": 5, "owner_id": 7, "model": "llama3", "prompt": "hi",
+        }})
+        assert 5 not in consumer._inflight
+        consumer.send.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_result_for_evicted_task_is_settled(self):
+        """A result whose entry was evicted is checked against the database."""
+        from django.utils import timezone
+        from computing import protocol
+        from computing.inflight import InFlightJobs
+        await sync_to_async(Node.objects.create)(
+            owner=self.provider, node_id="inflight-node", name="In-flight Node",
+            gpu_info={"models": ["llama3"]}, is_active=True,
+        )
+        owner = await sync_to_async(User.objects.create_user)(
+            username="evicted_owner", password="p",
+        )
+        jobs = [
+            await sync_to_async(Job.objects.create)(
+                user=owner, task_type="inference", status="PENDING",
+                input_data={"prompt": "hi", "model": "llama3"}, dispatched_at=timezone.now(),
+            )
+            for _ in range(2)
+        ]
+        consumer = self._registered_consumer(self.provider.id)
+        consumer._inflight = InFlightJobs(max_jobs=1)
+        consumer._stream.text = lambda task_id: None
+        for job in jobs:
+            await consumer.job_dispatch({"job_data": {
+                "task_id": job.id, "owner_id": owner.id, "model": "llama3", "prompt": "hi",
+            }})
+        assert jobs[0].id not in consumer._inflight
+
+        await consumer._handle_job_result(protocol.JobOutcome(
+            task_id=jobs[0].id, status="success", response="done",
+        ))
+        await sync_to_async(jobs[0].refresh_from_db)()
+        assert jobs[0].status == "COMPLETED"
+        assert jobs[0].result == {"output": "done"}
+
 
 # ---------------------------------------------------------------------------
 # DashboardConsumer – sync helper tests
@@ -314,19 +419,17 @@ class TestDashboardConsumerSyncHelpers:
             is_active=True,
         )
 
-    def test_get_models_sync(self):
-        """_get_models_sync aggregates models from active nodes."""
-        consumer = DashboardConsumer()
-        models = consumer._get_models_sync()
+    def test_snapshot_models(self):
+        """The snapshot aggregates dict and plain-string model entries."""
+        models = _snapshot_models()
         names = [m["name"] for m in models]
         assert "phi-3" in names
         assert "gemma" in names
 
-    def test_get_models_sync_empty(self):
-        """_get_models_sync returns empty list when no active nodes."""
+    def test_snapshot_models_empty(self):
+        """The snapshot has no models when no nodes are active."""
         Node.objects.all().update(is_active=False)
-        consumer = DashboardConsumer()
-        assert consumer._get_models_sync() == []
+        assert _snapshot_models() == []
 
 
 # ---------------------------------------------------------------------------
@@ -349,47 +452,60 @@ class TestDashboardConsumerDBHelpers:
 
     def test_get_balance(self):
         """_get_balance returns the user's wallet balance."""
-        from asgiref.sync import async_to_sync
         consumer = DashboardConsumer()
         bal = async_to_sync(consumer._get_balance)(self.user.id)
         assert bal == Decimal("200.00")
 
     def test_get_balance_nonexistent_user(self):
         """_get_balance returns 0 for nonexistent user."""
-        from asgiref.sync import async_to_sync
         consumer = DashboardConsumer()
         bal = async_to_sync(consumer._get_balance)(99999)
         assert bal == Decimal("0.00")
 
-    def test_get_stats(self):
-        """_get_stats returns correct structure."""
-        from asgiref.sync import async_to_sync
-        consumer = DashboardConsumer()
-        stats = async_to_sync(consumer._get_stats)()
+    def test_network_snapshot_stats(self):
+        """_network_snapshot returns the stats structure."""
+        stats, _ = async_to_sync(_network_snapshot)()
         assert "active_nodes" in stats
         assert "completed_jobs" in stats
         assert "available_models" in stats
         assert stats["active_nodes"] == 1
 
-    def test_get_models(self):
-        """_get_models returns model list."""
-        from asgiref.sync import async_to_sync
-        consumer = DashboardConsumer()
-        models = async_to_sync(consumer._get_models)()
+    def test_network_snapshot_marks_stale_nodes_inactive(self):
+        """Nodes without a recent heartbeat are deactivated and not counted."""
+        from datetime import timedelta
+        from django.utils import timezone
+        Node.objects.all().update(last_heartbeat=timezone.now() - timedelta(minutes=5))
+        stats, models = async_to_sync(_network_snapshot)()
+        assert stats["active_nodes"] == 0
+        assert models == []
+        self.node.refresh_from_db()
+        assert self.node.is_active is False
+
+    def test_network_snapshot_models(self):
+        """_network_snapshot returns the model list."""
+        models = _snapshot_models()
         assert isinstance(models, list)
         names = [m["name"] for m in models]
         assert "llama2" in names
 
     def test_get_recent_jobs_empty(self):
         """_get_recent_jobs returns empty list for user with no jobs."""
-        from asgiref.sync import async_to_sync
         consumer = DashboardConsumer()
         jobs = async_to_sync(consumer._get_recent_jobs)(self.user.id)
         assert jobs == []
 
+    def test_get_recent_jobs_resolves_offloaded_result(self, settings, tmp_path):
+        """An offloaded result is read back from the blob store."""
+        settings.STORAGES = {**settings.STORAGES, "job_results": {
+            "BACKEND": "django.core.files.storage.FileSystemStorage", "OPTIONS": {"location": tmp_path},
+        }}
+        settings.JOB_RESULT_BLOB_THRESHOLD = 16
+        Job.objects.create(user=self.user, task_type="inference", input_data={}, result={"output": "x" * 64})
+        jobs = async_to_sync(DashboardConsumer()._get_recent_jobs)(self.user.id)
+        assert jobs[0]["result"] == {"output": "x" * 64}
+
     def test_get_recent_jobs_with_data(self):
         """_get_recent_jobs returns job data."""
-        from asgiref.sync import async_to_sync
         Job.objects.create(
             user=self.user, node=self.node,
             task_type="inference",
@@ -404,7 +520,6 @@ class TestDashboardConsumerDBHelpers:
 
     def test_get_recent_jobs_non_dict_input(self):
         """_get_recent_jobs handles non-dict input_data."""
-        from asgiref.sync import async_to_sync
         Job.objects.create(
             user=self.user, node=self.node,
             task_type="inference",
@@ -419,7 +534,6 @@ class TestDashboardConsumerDBHelpers:
 
     def test_get_provider_stats_async(self):
         """_get_provider_stats_async returns stats dict."""
-        from asgiref.sync import async_to_sync
         consumer = DashboardConsumer()
         stats = async_to_sync(consumer._get_provider_stats_async)(
             self.user.id, 30,
@@ -430,7 +544,6 @@ class TestDashboardConsumerDBHelpers:
 
     def test_get_provider_stats_async_invalid_user(self):
         """_get_provider_stats_async returns None for invalid user."""
-        from asgiref.sync import async_to_sync
         consumer = DashboardConsumer()
         stats = async_to_sync(consumer._get_provider_stats_async)(
             99999, 30,
@@ -439,14 +552,12 @@ class TestDashboardConsumerDBHelpers:
 
     def test_get_user_from_token_invalid(self):
         """_get_user_from_token returns None for invalid token."""
-        from asgiref.sync import async_to_sync
         consumer = DashboardConsumer()
         result = async_to_sync(consumer._get_user_from_token)("invalid")
         assert result is None
 
     def test_get_user_from_token_valid(self):
         """_get_user_from_token returns user for valid JWT."""
-        from asgiref.sync import async_to_sync
         from rest_framework_simplejwt.tokens import RefreshToken
         refresh = RefreshToken.for_user(self.user)
         access = str(refresh.access_token)
@@ -494,6 +605,183 @@ class TestGPUConsumerWebSocket:
         assert response["type"] == "auth_error"
         await communicator.disconnect()
 
+    async def test_revocation_push_disconnects_agent(self):
+        """A token_revoked event closes a registered agent immediately."""
+        from channels.layers import get_channel_layer
+        from core.models import AgentToken
+        provider = await sync_to_async(User.objects.create_user)(
+            username="revoked_prov", password="p",
+        )
+        token, raw = await sync_to_async(AgentToken.generate)(provider)
+
+        communicator = WebsocketCommunicator(
+            GPUConsumer.as_asgi(), "/ws/computing/",
+        )
+        connected, _ = await communicator.connect()
+        assert connected
+        await communicator.send_json_to({
+            "type": "register",
+            "node_id": "revoke-node",
+            "gpu_info": {"models": []},
+            "auth_token": raw,
+        })
+        response = await communicator.receive_json_from(timeout=5)
+        assert response["type"] == "registered"
+
+        await get_channel_layer().group_send(
+            AgentToken.revocation_group(token.token_hash),
+            {"type": "token_revoked"},
+        )
+        response = await communicator.receive_json_from(timeout=5)
+        assert response["type"] == "auth_error"
+        output = await communicator.receive_output(timeout=5)
+        assert output["type"] == "websocket.close"
+        await communicator.disconnect()
+
+    async def test_msgpack_negotiated_at_register(self):
+        """Agents offering msgpack get binary frames after the JSON ack."""
+        from channels.layers import get_channel_layer
+        from computing import protocol
+        from core.models import AgentToken
+        provider = await sync_to_async(User.objects.create_user)(
+            username="msgpack_prov", password="p",
+        )
+        token, raw = await sync_to_async(AgentToken.generate)(provider)
+
+        communicator = WebsocketCommunicator(
+            GPUConsumer.as_asgi(), "/ws/computing/",
+        )
+        connected, _ = await communicator.connect()
+        assert connected
+        await communicator.send_json_to({
+            "type": "register",
+            "node_id": "msgpack-node",
+            "gpu_info": {"models": []},
+            "auth_token": raw,
+            "encodings": ["msgpack", "json"],
+        })
+        response = await communicator.receive_json_from(timeout=5)
+        assert response["type"] == "registered"
+        assert response["encoding"] == "msgpack"
+
+        # Binary frames from the agent are accepted
+        await communicator.send_to(bytes_data=protocol.encode(protocol.Pong(), protocol.MSGPACK))
+
+        await get_channel_layer().group_send(
+            AgentToken.revocation_group(token.token_hash),
+            {"type": "token_revoked"},
+        )
+        frame = await communicator.receive_from(timeout=5)
+        assert isinstance(frame, bytes)
+        assert isinstance(protocol.decode_server_message(frame), protocol.AuthError)
+        await communicator.disconnect()
+
+    @staticmethod
+    async def _streaming_job(prefix):
+        """Register an agent and dispatch it a streaming job; return both."""
+        from channels.layers import get_channel_layer
+        from core.models import AgentToken
+        provider = await sync_to_async(User.objects.create_user)(
+            username=f"{prefix}_prov", password="p",
+        )
+        owner = await sync_to_async(User.objects.create_user)(
+            username=f"{prefix}_owner", password="p",
+        )
+        _, raw = await sync_to_async(AgentToken.generate)(provider)
+        job = await sync_to_async(Job.objects.create)(
+            user=owner, task_type="inference", status="PENDING",
+            input_data={"prompt": "hi", "model": "llama3", "stream": True},
+        )
+        agent = WebsocketCommunicator(GPUConsumer.as_asgi(), "/ws/computing/")
+        await agent.connect()
+        await agent.send_json_to({
+            "type": "register", "node_id": f"{prefix}-node", "auth_token": raw,
+            "gpu_info": {"models": ["llama3"]},
+        })
+        registered = await agent.receive_json_from(timeout=5)
+        assert registered["stream_assembly"] is True
+        await get_channel_layer().group_send("gpu_nodes", {
+            "type": "job_dispatch",
+            "job_data": {
+                "task_id": job.id, "owner_id": owner.id, "model": "llama3",
+                "prompt": "hi", "stream": True,
+            },
+        })
+        assert (await agent.receive_json_from(timeout=5))["type"] == "job_dispatch"
+        await agent.send_json_to({"type": "job_accepted", "task_id": job.id})
+        for piece in ("Hel", "lo"):
+            await agent.send_json_to({
+                "type": "job_stream",
+                "result": {"task_id": job.id, "owner_id": owner.id, "chunk": piece},
+            })
+        return agent, job
+
+    async def _settled(self, job):
+        """Wait for the consumer to finish writing the job and reload it."""
+        import asyncio
+        for _ in range(50):
+            await sync_to_async(job.refresh_from_db)()
+            if job.status != "PENDING":
+                break
+            await asyncio.sleep(0.05)
+        return job
+
+    async def test_streamed_result_is_assembled_server_side(self):
+        """A digest-only job_result completes the job with the streamed text."""
+        from computing import protocol
+        agent, job = await self._streaming_job("assemble")
+        length, sha256 = protocol.stream_digest("Hello")
+        await agent.send_json_to({"type": "job_result", "result": {
+            "task_id": job.id, "status": "success",
+            "response_length": length, "response_sha256": sha256,
+        }})
+        job = await self._settled(job)
+        assert job.status == "COMPLETED"
+        assert job.result == {"output": "Hello"}
+        await agent.disconnect()
+
+    async def test_job_lifecycle_is_recorded(self):
+        """Acceptance, first token, token counts and node are stored on the job."""
+        from computing import protocol
+        from core.metrics import JOBS_COMPLETED
+        completed = JOBS_COMPLETED.labels("llama3").value
+        agent, job = await self._streaming_job("timing")
+        length, sha256 = protocol.stream_digest("Hello")
+        await agent.send_json_to({"type": "job_result", "result": {
+            "task_id": job.id, "status": "success",
+            "response_length": length, "response_sha256": sha256,
+            "eval_count": 40, "eval_duration": 2_000_000_000,
+        }})
+        job = await self._settled(job)
+        assert job.accepted_at <= job.first_token_at
+        assert job.tokens_per_second == 20
+        assert JOBS_COMPLETED.labels("llama3").value == completed + 1
+        assert job.node_id is not None
+        await agent.disconnect()
+
+    async def test_streamed_result_digest_mismatch_fails_job(self):
+        """A digest that does not match the assembled text fails the job."""
+        from computing import protocol
+        agent, job = await self._streaming_job("mismatch")
+        length, sha256 = protocol.stream_digest("Hello!")
+        await agent.send_json_to({"type": "job_result", "result": {
+            "task_id": job.id, "status": "success",
+            "response_length": length, "response_sha256": sha256,
+        }})
+        job = await self._settled(job)
+        assert job.status == "FAILED"
+        await agent.disconnect()
+
+    async def test_streamed_text_kept_when_result_is_lost(self):
+        """Disconnecting before job_result stores the partial output."""
+        import asyncio
+        agent, job = await self._streaming_job("lost")
+        await asyncio.sleep(0.1)
+        await agent.disconnect()
+        await sync_to_async(job.refresh_from_db)()
+        assert job.status == "PENDING"
+        assert job.result == {"partial_output": "Hello"}
+
     async def test_pong_message_handled(self):
         """GPUConsumer handles pong messages without error."""
         communicator = WebsocketCommunicator(
@@ -598,3 +886,108 @@ class TestDashboardConsumerWebSocket:
         consumer.provider_days = 30
 
         await communicator.disconnect()
+
+    async def test_broadcast_delivered_through_outbound_queue(self):
+        """Group broadcasts reach the client via the outbound queue."""
+        from channels.layers import get_channel_layer
+        communicator = WebsocketCommunicator(
+            DashboardConsumer.as_asgi(), "/ws/dashboard/",
+        )
+        connected, _ = await communicator.connect()
+        assert connected
+        await communicator.receive_json_from(timeout=5)
+        await communicator.receive_json_from(timeout=5)
+
+        await get_channel_layer().group_send("dashboard_updates", {
+            "type": "dashboard_update",
+            "data": {"type": "job_update", "job": {"id": 1}},
+        })
+        msg = await communicator.receive_json_from(timeout=5)
+        assert msg == {"type": "job_update", "job": {"id": 1}}
+        await communicator.disconnect()
+
+    async def test_resume_replays_missed_stream_frames(self):
+        """A reconnecting dashboard gets the chunks it missed, then live ones."""
+        import asyncio
+        from channels.layers import get_channel_layer
+        from rest_framework_simplejwt.tokens import AccessToken
+        from core.models import AgentToken
+        provider = await sync_to_async(User.objects.create_user)(
+            username="resume_prov", password="p",
+        )
+        owner = await sync_to_async(User.objects.create_user)(
+            username="resume_owner", password="p",
+        )
+        _, raw = await sync_to_async(AgentToken.generate)(provider)
+
+        agent = WebsocketCommunicator(GPUConsumer.as_asgi(), "/ws/computing/")
+        await agent.connect()
+        await agent.send_json_to({
+            "type": "register", "node_id": "resume-node", "auth_token": raw,
+            "gpu_info": {"models": ["llama3"]},
+        })
+        assert (await agent.receive_json_from(timeout=5))["type"] == "registered"
+        await get_channel_layer().group_send("gpu_nodes", {
+            "type": "job_dispatch",
+            "job_data": {
+                "task_id": 77, "owner_id": owner.id, "model": "llama3",
+                "prompt": "hi", "stream": True,
+            },
+        })
+        assert (await agent.receive_json_from(timeout=5))["type"] == "job_dispatch"
+
+        # Streamed while no dashboard is connected
+        for piece in ("Hel", "lo"):
+            await agent.send_json_to({
+                "type": "job_stream",
+                "result": {"task_id": 77, "owner_id": owner.id, "chunk": piece},
+            })
+        await asyncio.sleep(0.1)
+
+        dashboard = WebsocketCommunicator(
+            DashboardConsumer.as_asgi(),
+            f"/ws/dashboard/?token={AccessToken.for_user(owner)}",
+        )
+        await dashboard.connect()
+        for _ in range(5):
+            await dashboard.receive_json_from(timeout=5)
+
+        await dashboard.send_json_to({"type": "resume", "task_id": 77, "last_seq": 0})
+        msg = await dashboard.receive_json_from(timeout=5)
+        assert msg == {
+            "type": "job_stream_replay", "task_id": 77,
+            "chunk": "Hello", "from_seq": 1, "seq": 1, "truncated": False,
+        }
+
+        await agent.send_json_to({
+            "type": "job_stream",
+            "result": {"task_id": 77, "owner_id": owner.id, "chunk": " world"},
+        })
+        msg = await dashboard.receive_json_from(timeout=5)
+        assert (msg["type"], msg["chunk"], msg["seq"]) == ("job_stream", " world", 2)
+
+        await dashboard.disconnect()
+        await agent.disconnect()
+
+    async def test_resume_without_streaming_node_times_out(self):
+        """With no node holding the stream, an empty replay is sent."""
+        from rest_framework_simplejwt.tokens import AccessToken
+        owner = await sync_to_async(User.objects.create_user)(
+            username="resume_alone", password="p",
+        )
+        dashboard = WebsocketCommunicator(
+            DashboardConsumer.as_asgi(),
+            f"/ws/dashboard/?token={AccessToken.for_user(owner)}",
+        )
+        await dashboard.connect()
+        for _ in range(5):
+            await dashboard.receive_json_from(timeout=5)
+
+        with patch("computing.consumers.STREAM_RESUME_TIMEOUT", 0.05):
+            await dashboard.send_json_to({"type": "resume", "task_id": 78, "last_seq": 4})
+            msg = await dashboard.receive_json_from(timeout=5)
+        assert msg == {
+            "type": "job_stream_replay", "task_id": 78,
+            "chunk": "", "from_seq": None, "seq": 4, "truncated": False,
+        }
+        await dashboard.disconnect()
@@ -58,6 +58,11 @@ class TestJobSubmissionAPI:
         assert job.input_data['model'] == 'gemma3:270m'
         assert job.status == 'PENDING'
 
+    def test_dispatched_at_recorded(self):  # pylint: disable=missing-function-docstring
+        self.client.post(reverse('submit-job'), {"prompt": "X"}, format='json')
+        job = Job.objects.first()
+        assert job.dispatched_at >= job.created_at
+
     def test_cost_saved_on_job(self):  # pylint: disable=missing-function-docstring
         self.client.post(reverse('submit-job'), {"prompt": "X"}, format='json')
         job = Job.objects.first()
@@ -68,6 +73,15 @@ class TestJobSubmissionAPI:
         self.consumer.refresh_from_db()
         assert self.consumer.wallet_balance == Decimal('9.00')
 
+    def test_debit_recorded_in_ledger(self):
+        """The submit debit is logged with the balance it leaves."""
+        from payments.models import CreditLog
+        self.client.post(reverse('submit-job'), {"prompt": "X"}, format='json')
+        log = CreditLog.objects.get(user=self.consumer)
+        assert log.amount == Decimal('-1.00')
+        assert log.balance_after == Decimal('9.00')
+        assert log.description.startswith(f"Spent: Job #{Job.objects.first().id}")
+
     def test_multiple_jobs_deduct_correctly(self):  # pylint: disable=missing-function-docstring
         for i in range(3):
             self.client.post(reverse('submit-job'), {"prompt": f"Job {i}"}, format='json')
@@ -125,7 +139,7 @@ class TestJobSubmissionAPI:
         self.client.post(reverse('submit-job'), {"prompt": "B"}, format='json')
         resp = self.client.get(reverse('job-list'))
         assert resp.status_code == 200
-        assert len(resp.data) == 2
+        assert len(resp.data['results']) == 2
 
     def test_job_list_excludes_other_users(self):  # pylint: disable=missing-function-docstring
         self.client.post(reverse('submit-job'), {"prompt": "Mine"}, format='json')
@@ -138,8 +152,8 @@ class TestJobSubmissionAPI:
         self.client.post(reverse('submit-job'), {"prompt": "Theirs"}, format='json')
         # Check other user sees only their job
         resp = self.client.get(reverse('job-list'))
-        assert len(resp.data) == 1
-        assert resp.data[0]['prompt'] == 'Theirs'
+        assert len(resp.data['results']) == 1
+        assert resp.data['results'][0]['prompt'] == 'Theirs'
 
 
 @pytest.mark.django_db
@@ -250,15 +264,93 @@ class TestSessionAPI:
         ChatSession.objects.create(user=self.other, name='Theirs')
         resp = self.client.get(reverse('session-list'))
         assert resp.status_code == 200
-        assert len(resp.data) == 1
-        assert resp.data[0]['name'] == 'Mine'
+        assert len(resp.data['results']) == 1
+        assert resp.data['results'][0]['name'] == 'Mine'
 
     def test_list_returns_string_ids(self):
         """Session list serializes id as a string."""
         from computing.models import ChatSession
         ChatSession.objects.create(user=self.user, name='Test')
         resp = self.client.get(reverse('session-list'))
-        assert isinstance(resp.data[0]['id'], str)
+        assert isinstance(resp.data['results'][0]['id'], str)
+
+    def _session_with_jobs(self, name, count, model='llama2'):
+        from computing.models import ChatSession
+        session = ChatSession.objects.create(user=self.user, name=name)
+        for i in range(count):
+            Job.objects.create(
+                user=self.user, session=session, task_type='inference',
+                status='COMPLETED' if i % 2 == 0 else 'FAILED', cost=Decimal('1.00'),
+                input_data={'prompt': f'{name} message {i}', 'model': model},
+                result={'output': 'x' * 100},
+            )
+        return session
+
+    def test_list_returns_summaries_without_messages(self):
+        """Each session carries counts, cost, models and a last-message preview."""
+        self._session_with_jobs('Chat', 3)
+        item = self.client.get(reverse('session-list')).data['results'][0]
+        assert 'jobs' not in item
+        assert item['message_count'] == 3
+        assert item['completed_count'] == 2
+        assert item['total_cost'] == '3.00'
+        assert item['models'] == ['llama2']
+        assert item['last_message']['prompt'] == 'Chat message 2'
+        assert 'result' not in item['last_message']
+
+    def test_empty_session_summary(self):
+        """A session without messages has zero counts and no preview."""
+        from computing.models import ChatSession
+        ChatSession.objects.create(user=self.user, name='Empty')
+        item = self.client.get(reverse('session-list')).data['results'][0]
+        assert item['message_count'] == 0
+        assert item['last_message'] is None
+        assert item['models'] == []
+
+    def test_list_query_count_is_constant(self, django_assert_max_num_queries):
+        """Listing many sessions does not issue a query per session."""
+        for i in range(15):
+            self._session_with_jobs(f'Chat {i}', 2, model=f'model-{i % 3}')
+        # Session auth lookups are bypassed by force_authenticate
+        with django_assert_max_num_queries(4):
+            resp = self.client.get(reverse('session-list'))
+        assert len(resp.data['results']) == 15
+
+    def test_list_paginates(self):
+        """limit and cursor page through sessions newest first."""
+        from computing.models import ChatSession
+        for i in range(5):
+            ChatSession.objects.create(user=self.user, name=f'S{i}')
+        first = self.client.get(reverse('session-list'), {'limit': 3}).data
+        second = self.client.get(
+            reverse('session-list'), {'limit': 3, 'cursor': first['next']},
+        ).data
+        names = [s['name'] for s in first['results'] + second['results']]
+        assert names == ['S4', 'S3', 'S2', 'S1', 'S0']
+        assert second['next'] is None
+
+    # --- Messages ---
+    def test_messages_paginate_back_in_time(self):
+        """Pages go newest to oldest; each page is in chronological order."""
+        session = self._session_with_jobs('Chat', 5)
+        url = reverse('session-messages', kwargs={'session_id': session.id})
+        first = self.client.get(url, {'limit': 2}).data
+        assert [m['prompt'] for m in first['results']] == ['Chat message 3', 'Chat message 4']
+        assert first['results'][0]['result'] == {'output': 'x' * 100}
+        older = self.client.get(url, {'limit': 2, 'cursor': first['next']}).data
+        assert [m['prompt'] for m in older['results']] == ['Chat message 1', 'Chat message 2']
+        oldest = self.client.get(url, {'limit': 2, 'cursor': older['next']}).data
+        assert [m['prompt'] for m in oldest['results']] == ['Chat message 0']
+        assert oldest['next'] is None
+
+    def test_messages_of_other_users_session_returns_404(self):
+        """Another user's history is not readable."""
+        from computing.models import ChatSession
+        other_session = ChatSession.objects.create(user=self.other, name='Theirs')
+        resp = self.client.get(
+            reverse('session-messages', kwargs={'session_id': other_session.id}),
+        )
+        assert resp.status_code == 404
 
     # --- Create ---
     def test_create_session(self):
@@ -0,0 +1,60 @@
+"""Tests for the per-connection in-flight job table."""
+from computing.inflight import InFlightJobs
+
+
+class _Clock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestInFlightJobs:
+    """Recording, lookup and eviction of dispatched jobs."""
+
+    def test_add_and_pop(self):
+        table = InFlightJobs()
+        table.add(1, 7, "llama3")
+        job = table.get(1)
+        assert (job.owner_id, job.model) == (7, "llama3")
+        assert table.pop(1) is job
+        assert 1 not in table
+        assert table.pop(1) is None
+
+    def test_unknown_task_is_none(self):
+        assert InFlightJobs().get(99) is None
+
+    def test_expired_jobs_are_forgotten(self):
+        clock = _Clock()
+        table = InFlightJobs(ttl=10, clock=clock)
+        table.add(1, 7, "m")
+        clock.now = 11
+        assert table.get(1) is None
+        assert len(table) == 0
+
+    def test_add_sweeps_expired_entries(self):
+        clock = _Clock()
+        table = InFlightJobs(ttl=10, clock=clock)
+        table.add(1, 7, "m")
+        table.add(2, 7, "m")
+        clock.now = 11
+        table.add(3, 7, "m")
+        assert len(table) == 1
+        assert 3 in table
+
+    def test_size_bound_evicts_oldest(self):
+        table = InFlightJobs(max_jobs=2)
+        for task_id in (1, 2, 3):
+            table.add(task_id, 7, "m")
+        assert 1 not in table
+        assert len(table) == 2
+
+    def test_serves_advertised_models(self):
+        table = InFlightJobs()
+        assert table.serves("anything")
+        table.models = {"llama3"}
+        assert table.serves("llama3")
+        assert not table.serves("mistral")
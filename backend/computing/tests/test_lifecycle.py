@@ -55,6 +55,21 @@ class TestJobLifecycle:
     def test_created_at_is_set(self):  # pylint: disable=missing-function-docstring
         assert self.job.created_at is not None
 
+    def test_timing_metrics_derived_from_timestamps(self):  # pylint: disable=missing-function-docstring
+        from datetime import timedelta
+        self.job.accepted_at = self.job.created_at + timedelta(seconds=2)
+        self.job.first_token_at = self.job.created_at + timedelta(seconds=3.5)
+        self.job.eval_count = 100
+        self.job.eval_duration = timedelta(seconds=4)
+        assert self.job.queue_wait == 2
+        assert self.job.time_to_first_token == 3.5
+        assert self.job.tokens_per_second == 25
+
+    def test_timing_metrics_none_until_recorded(self):  # pylint: disable=missing-function-docstring
+        assert self.job.queue_wait is None
+        assert self.job.time_to_first_token is None
+        assert self.job.tokens_per_second is None
+
 
 @pytest.mark.django_db
 class TestJobDetailAPI:
@@ -110,3 +125,17 @@ class TestJobDetailAPI:
         assert 'prompt' in resp.data
         assert 'cost' in resp.data
         assert 'created_at' in resp.data
+
+    def test_job_detail_includes_timing_metrics(self):  # pylint: disable=missing-function-docstring
+        from datetime import timedelta
+        Job.objects.filter(pk=self.job.pk).update(
+            accepted_at=self.job.created_at + timedelta(seconds=1),
+            eval_count=50, eval_duration=timedelta(seconds=2),
+        )
+        self.client.force_authenticate(user=self.owner)
+        url = reverse('job-detail', kwargs={'job_id': self.job.id})
+        resp = self.client.get(url)
+        assert resp.data['queue_wait'] == 1
+        assert resp.data['tokens_per_second'] == 25
+        assert resp.data['time_to_first_token'] is None
+        assert resp.data['node_id'] is None
@@ -6,7 +6,7 @@ from decimal import Decimal
 
 import pytest
 
-from computing.models import Job, Node
+from computing.models import Job, Node, NodeModel
 from core.models import User
 from payments.models import CreditLog, Transaction
 
@@ -58,6 +58,48 @@ class TestNodeModel:
             Node.objects.create(node_id='unique1', owner=user, name='B', gpu_info={})
 
 
+@pytest.mark.django_db
+class TestNodeModelSync:
+    """NodeModel rows mirror the models a node advertises."""
+
+    def setup_method(self):
+        self.user = User.objects.create_user(username='nm', password='p')
+
+    def test_rows_created_from_gpu_info(self):  # pylint: disable=missing-function-docstring
+        node = Node.objects.create(
+            node_id='nm1', owner=self.user, name='N',
+            gpu_info={'models': [
+                'llama2',
+                {'name': 'mistral', 'size': 4_000_000_000,
+                 'details': {'quantization_level': 'Q4_0'}, 'loaded': True},
+                {'size': 1},
+            ]},
+        )
+        rows = {m.model_name: m for m in NodeModel.objects.filter(node=node)}
+        assert set(rows) == {'llama2', 'mistral'}
+        assert rows['mistral'].size == 4_000_000_000
+        assert rows['mistral'].quantization == 'Q4_0'
+        assert rows['mistral'].loaded is True
+        assert rows['llama2'].size is None
+
+    def test_resave_replaces_rows(self):  # pylint: disable=missing-function-docstring
+        node = Node.objects.create(
+            node_id='nm2', owner=self.user, name='N', gpu_info={'models': ['a', 'b']},
+        )
+        node.gpu_info = {'models': [{'name': 'b', 'loaded': True}, 'c']}
+        node.save()
+        rows = dict(NodeModel.objects.filter(node=node).values_list('model_name', 'loaded'))
+        assert rows == {'b': True, 'c': False}
+
+    def test_save_without_gpu_info_skips_sync(self, django_assert_num_queries):  # pylint: disable=missing-function-docstring
+        node = Node.objects.create(
+            node_id='nm3', owner=self.user, name='N', gpu_info={'models': ['a']},
+        )
+        node.is_active = True
+        with django_assert_num_queries(1):
+            node.save(update_fields=['is_active'])
+
+
 @pytest.mark.django_db
 class TestJobModel:
     """Tests for the Job model."""
@@ -85,6 +127,30 @@ class TestJobModel:
         job = Job.objects.create(user=user, task_type='inference', input_data={})
         assert job.node is None
 
+    def test_text_columns_filled_on_create(self):  # pylint: disable=missing-function-docstring
+        user = User.objects.create_user(username='u5', password='p')
+        job = Job.objects.create(
+            user=user, task_type='inference',
+            input_data={"prompt": "x" * 200, "model": "llama2"},
+        )
+        job.refresh_from_db()
+        assert job.model == 'llama2'
+        assert job.prompt_preview == 'x' * 80
+
+    def test_text_columns_non_dict_input(self):  # pylint: disable=missing-function-docstring
+        user = User.objects.create_user(username='u6', password='p')
+        job = Job.objects.create(user=user, task_type='inference', input_data='raw')
+        assert (job.model, job.prompt_preview) == ('', 'raw')
+
+    def test_full_prompt_reads_json_in_sql(self):  # pylint: disable=missing-function-docstring
+        user = User.objects.create_user(username='u7', password='p')
+        Job.objects.create(
+            user=user, task_type='inference', input_data={"prompt": "y" * 200},
+        )
+        job = Job.objects.defer('input_data').annotate(prompt=Job.full_prompt()).get()
+        assert job.prompt == 'y' * 200
+        assert 'input_data' in job.get_deferred_fields()
+
 
 @pytest.mark.django_db
 class TestTransactionModel:
@@ -0,0 +1,128 @@
+"""Tests for per-connection outbound queues."""
+import asyncio
+
+import pytest
+
+from core import metrics
+from computing.outbound import OutboundOverflow, OutboundQueue
+
+
+class _Recorder:
+    """Collects messages written by the queue."""
+
+    def __init__(self):
+        self.messages = []
+
+    async def __call__(self, msg):
+        self.messages.append(msg)
+
+
+async def _drain(queue):
+    """Run the writer until the queue is empty, then stop it."""
+    writer = asyncio.ensure_future(queue.run())
+    while queue.depth:
+        await asyncio.sleep(0)
+    await asyncio.sleep(0)
+    queue.close()
+    await writer
+
+
+@pytest.mark.asyncio
+class TestOutboundQueue:
+    """Coalescing, merging and overflow behaviour."""
+
+    async def test_stats_updates_are_coalesced(self):
+        sent = _Recorder()
+        queue = OutboundQueue(sent)
+        coalesced = metrics.OUTBOUND_COALESCED.labels().value
+        queue.put({"type": "stats_update", "stats": {"active_nodes": 1}})
+        queue.put({"type": "stats_update", "stats": {"active_nodes": 2}})
+        queue.put({"type": "models_update", "models": []})
+        assert queue.depth == 2
+        assert metrics.OUTBOUND_COALESCED.labels().value == coalesced + 1
+
+        await _drain(queue)
+        assert sent.messages[0] == {"type": "stats_update", "stats": {"active_nodes": 2}}
+        assert sent.messages[1]["type"] == "models_update"
+
+    async def test_stream_frames_are_merged_per_task(self):
+        sent = _Recorder()
+        queue = OutboundQueue(sent)
+        queue.put({"type": "job_stream", "task_id": 1, "chunk": "ab", "seq": 1, "chunks": 2})
+        queue.put({"type": "job_stream", "task_id": 2, "chunk": "zz", "seq": 1, "chunks": 1})
+        queue.put({"type": "job_stream", "task_id": 1, "chunk": "cd", "seq": 2, "chunks": 1})
+        await _drain(queue)
+        assert sent.messages[0] == {
+            "type": "job_stream", "task_id": 1, "chunk": "abcd", "seq": 2, "chunks": 3,
+        }
+        assert sent.messages[1]["task_id"] == 2
+
+    async def test_critical_updates_are_never_coalesced(self):
+        sent = _Recorder()
+        queue = OutboundQueue(sent)
+        queue.put({"type": "balance_update", "balance": "9.00"})
+        queue.put({"type": "balance_update", "balance": "8.00"})
+        queue.put({"type": "job_update", "job": {"id": 1}})
+        assert queue.depth == 3
+        await _drain(queue)
+        assert [m["type"] for m in sent.messages] == [
+            "balance_update", "balance_update", "job_update",
+        ]
+
+    async def test_overflow_raises(self):
+        overflows = metrics.OUTBOUND_OVERFLOWS.labels().value
+        queue = OutboundQueue(_Recorder(), max_size=2)
+        queue.put({"type": "job_update", "job": {"id": 1}})
+        queue.put({"type": "job_update", "job": {"id": 2}})
+        with pytest.raises(OutboundOverflow):
+            queue.put({"type": "job_update", "job": {"id": 3}})
+        assert metrics.OUTBOUND_OVERFLOWS.labels().value == overflows + 1
+
+    async def test_coalesced_message_does_not_count_towards_limit(self):
+        queue = OutboundQueue(_Recorder(), max_size=1)
+        queue.put({"type": "stats_update", "stats": {"n": 1}})
+        queue.put({"type": "stats_update", "stats": {"n": 2}})
+        assert queue.depth == 1
+
+    async def test_high_water_tracks_peak_depth(self):
+        sent = _Recorder()
+        queue = OutboundQueue(sent)
+        written = metrics.OUTBOUND_SENT.labels().value
+        for i in range(5):
+            queue.put({"type": "job_update", "job": {"id": i}})
+        await _drain(queue)
+        assert queue.high_water == 5
+        assert metrics.OUTBOUND_SENT.labels().value == written + 5
+        assert queue.depth == 0
+
+    async def test_discard_stream_drops_queued_frame(self):
+        sent = _Recorder()
+        queue = OutboundQueue(sent)
+        queue.put({"type": "job_stream", "task_id": 1, "chunk": "ab", "seq": 1, "chunks": 1})
+        queue.put({"type": "job_update", "job": {"id": 2}})
+        queue.discard_stream(1)
+        queue.discard_stream(3)
+        assert queue.depth == 1
+        await _drain(queue)
+        assert [m["type"] for m in sent.messages] == ["job_update"]
+
+    async def test_queued_gauge_follows_enqueue_drain_and_close(self):
+        gauge = metrics.OUTBOUND_QUEUED.labels()
+        depths = metrics.OUTBOUND_QUEUE_DEPTH.labels()
+        before, observed = gauge.value, sum(depths.counts)
+        queue = OutboundQueue(_Recorder())
+        for i in range(3):
+            queue.put({"type": "job_update", "job": {"id": i}})
+        queue.put({"type": "job_stream", "task_id": 9, "chunk": "a", "seq": 1, "chunks": 1})
+        assert gauge.value == before + 4
+        assert sum(depths.counts) == observed + 4
+
+        queue.discard_stream(9)
+        assert gauge.value == before + 3
+        await _drain(queue)
+        assert gauge.value == before
+
+        other = OutboundQueue(_Recorder())
+        other.put({"type": "job_update", "job": {"id": 1}})
+        other.close()
+        assert gauge.value == before
@@ -0,0 +1,115 @@
+"""Tests for in-memory node presence and batched heartbeat flushing."""
+from datetime import timedelta
+
+import pytest
+from channels.testing import WebsocketCommunicator
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from computing.consumers import GPUConsumer
+from computing.models import Node
+from computing.presence import NodePresence, _flush_heartbeats
+from computing.presence import presence as live_presence
+from core.models import AgentToken
+
+User = get_user_model()
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.asyncio
+class TestNodePresence:
+    """Connection tracking and bulk heartbeat writes."""
+
+    def setup_method(self):
+        self.owner = User.objects.create_user(username="presence_owner", password="p")
+        stale = timezone.now() - timedelta(minutes=5)
+        for i in range(3):
+            Node.objects.create(
+                owner=self.owner, node_id=f"p-node-{i}", name=f"P{i}",
+                is_active=True,
+            )
+        Node.objects.all().update(last_heartbeat=stale)
+        self.stale = stale
+
+    async def test_connect_and_disconnect_are_reference_counted(self):
+        presence = NodePresence(interval=3600)
+        presence.connect("p-node-0")
+        presence.connect("p-node-0")
+        presence.disconnect("p-node-0")
+        assert "p-node-0" in presence
+        presence.disconnect("p-node-0")
+        assert "p-node-0" not in presence
+        assert len(presence) == 0
+
+    async def test_flush_updates_connected_nodes(self):
+        from asgiref.sync import sync_to_async
+        presence = NodePresence(interval=3600)
+        presence.connect("p-node-0")
+        presence.connect("p-node-1")
+
+        assert await presence.flush() == 2
+        beats = await sync_to_async(dict)(
+            Node.objects.values_list("node_id", "last_heartbeat")
+        )
+        assert beats["p-node-0"] > self.stale
+        assert beats["p-node-1"] > self.stale
+        assert beats["p-node-2"] == self.stale
+        presence.disconnect("p-node-0")
+        presence.disconnect("p-node-1")
+
+    async def test_connected_agent_token_touched_on_every_flush(self):
+        from asgiref.sync import sync_to_async
+        token, _ = await sync_to_async(AgentToken.generate)(self.owner)
+        presence = NodePresence(interval=3600)
+        presence.connect("p-node-0", token.id)
+
+        await presence.flush()
+        await token.arefresh_from_db()
+        first = token.last_used
+        assert first is not None
+        await presence.flush()
+        await token.arefresh_from_db()
+        assert token.last_used > first
+
+        presence.disconnect("p-node-0")
+        await presence.flush()
+        last = token.last_used
+        await token.arefresh_from_db()
+        assert token.last_used == last
+
+    async def test_flush_with_no_connections_is_noop(self):
+        presence = NodePresence(interval=3600)
+        assert await presence.flush() == 0
+
+    async def test_rejected_agent_leaves_claimed_node_alone(self):
+        """An agent with a bad token neither holds the node's presence nor marks it inactive."""
+        communicator = WebsocketCommunicator(GPUConsumer.as_asgi(), "/ws/computing/")
+        await communicator.connect()
+        await communicator.send_json_to({
+            "type": "register",
+            "node_id": "p-node-0",
+            "gpu_info": {"models": ["llama2"]},
+            "auth_token": "gpc_invalidtoken",
+        })
+        response = await communicator.receive_json_from(timeout=5)
+        assert response["type"] == "auth_error"
+        assert "p-node-0" not in live_presence
+        await communicator.disconnect()
+
+        node = await Node.objects.aget(node_id="p-node-0")
+        assert node.is_active
+
+
+@pytest.mark.django_db
+def test_flush_heartbeats_is_a_single_update():
+    """The bulk flush issues one UPDATE regardless of fleet size."""
+    owner = User.objects.create_user(username="bulk_owner", password="p")
+    Node.objects.bulk_create([
+        Node(owner=owner, node_id=f"bulk-{i}", name=f"B{i}") for i in range(50)
+    ])
+    with CaptureQueriesContext(connection) as ctx:
+        updated = _flush_heartbeats([f"bulk-{i}" for i in range(50)])
+    assert updated == 50
+    assert len(ctx.captured_queries) == 1
@@ -0,0 +1,149 @@
+"""Tests for the typed agent <-> server message codec."""
+import json
+from pathlib import Path
+
+import pytest
+
+from computing import protocol
+
+AGENT_COPY = Path(__file__).resolve().parents[3] / "agent" / "protocol.py"
+
+
+class TestAgentMessages:
+    """Decoding frames sent by provider agents."""
+
+    def test_decode_register(self):
+        msg = protocol.decode_agent_message(json.dumps({
+            "type": "register",
+            "node_id": "n1",
+            "auth_token": "gpc_x",
+            "gpu_info": {"models": ["llama3"]},
+        }))
+        assert isinstance(msg, protocol.Register)
+        assert msg.node_id == "n1"
+        assert msg.gpu_info == {"models": ["llama3"]}
+
+    def test_decode_job_stream(self):
+        msg = protocol.decode_agent_message(
+            '{"type":"job_stream","result":{"task_id":5,"owner_id":2,"chunk":"hé"}}'
+        )
+        assert isinstance(msg, protocol.JobStream)
+        assert (msg.result.task_id, msg.result.owner_id, msg.result.chunk) == (5, 2, "hé")
+
+    def test_decode_job_result_defaults_to_failed(self):
+        msg = protocol.decode_agent_message('{"type":"job_result","result":{"task_id":5}}')
+        assert isinstance(msg, protocol.JobResult)
+        assert msg.result.status == "failed"
+        assert msg.result.response == ""
+
+    def test_numeric_strings_are_accepted(self):
+        msg = protocol.decode_agent_message(
+            '{"type":"job_stream","result":{"task_id":"5","owner_id":"2","chunk":"x"}}'
+        )
+        assert msg.result.task_id == 5
+        assert msg.result.owner_id == 2
+
+    def test_decode_digest_only_job_result(self):
+        msg = protocol.decode_agent_message(json.dumps({
+            "type": "job_result",
+            "result": {
+                "task_id": 5, "status": "success",
+                "response_length": 5, "response_sha256": "ab" * 32,
+            },
+        }))
+        assert msg.result.response == ""
+        assert msg.result.response_length == 5
+
+    def test_stream_digest_counts_utf8_bytes(self):
+        length, sha256 = protocol.stream_digest("hé")
+        assert length == 3
+        assert len(sha256) == 64
+
+    def test_decode_job_accepted(self):
+        msg = protocol.decode_agent_message('{"type":"job_accepted","task_id":5}')
+        assert isinstance(msg, protocol.JobAccepted)
+        assert msg.task_id == 5
+
+    def test_pong(self):
+        assert isinstance(protocol.decode_agent_message('{"type":"pong"}'), protocol.Pong)
+
+    @pytest.mark.parametrize("frame", [
+        "not json",
+        '{"type":"unknown"}',
+        '{"type":"job_stream","result":{"chunk":"missing ids"}}',
+        '{"type":"job_dispatch","job_data":{}}',
+        "[]",
+    ])
+    def test_invalid_frames_raise_decode_error(self, frame):
+        with pytest.raises(protocol.DecodeError):
+            protocol.decode_agent_message(frame)
+
+
+class TestServerMessages:
+    """Encoding frames sent to agents and decoding them on the agent side."""
+
+    def test_job_dispatch_round_trip(self):
+        frame = protocol.encode(protocol.JobDispatch(job_data=protocol.JobData(
+            task_id=1, owner_id=2, model="llama3", prompt="hi", stream=True,
+        )))
+        assert json.loads(frame) == {
+            "type": "job_dispatch",
+            "job_data": {
+                "task_id": 1, "owner_id": 2, "model": "llama3",
+                "prompt": "hi", "stream": True,
+            },
+        }
+        msg = protocol.decode_server_message(frame)
+        assert isinstance(msg, protocol.JobDispatch)
+        assert msg.job_data.prompt == "hi"
+
+    def test_ping_and_registered(self):
+        assert json.loads(protocol.encode(protocol.Ping())) == {"type": "ping"}
+        assert json.loads(protocol.encode(protocol.Registered(owner="bob"))) == {
+            "type": "registered", "status": "ok", "owner": "bob", "encoding": "json",
+            "stream_assembly": False,
+        }
+
+    def test_non_ascii_is_not_escaped(self):
+        frame = protocol.encode(protocol.AuthError(error="résumé"))
+        assert "résumé" in frame
+
+
+class TestMsgpackTransport:
+    """Encoding negotiation and binary frames."""
+
+    def test_negotiate_prefers_msgpack(self):
+        assert protocol.negotiate(["json", "msgpack"]) == protocol.MSGPACK
+
+    def test_negotiate_falls_back_to_json(self):
+        assert protocol.negotiate([]) == protocol.JSON
+        assert protocol.negotiate(["cbor"]) == protocol.JSON
+
+    def test_register_without_encodings_is_json_only(self):
+        msg = protocol.decode_agent_message('{"type":"register","node_id":"n1"}')
+        assert msg.encodings == []
+
+    def test_msgpack_frames_are_bytes_and_round_trip(self):
+        frame = protocol.encode(protocol.JobStream(
+            result=protocol.StreamChunk(task_id=5, owner_id=2, chunk="hé"),
+        ), protocol.MSGPACK)
+        assert isinstance(frame, bytes)
+        msg = protocol.decode_agent_message(frame)
+        assert isinstance(msg, protocol.JobStream)
+        assert msg.result.chunk == "hé"
+
+    def test_msgpack_is_smaller_than_json(self):
+        msg = protocol.JobDispatch(job_data=protocol.JobData(
+            task_id=123456, owner_id=42, model="llama3.2:latest", prompt="hi",
+        ))
+        assert len(protocol.encode(msg, protocol.MSGPACK)) < len(protocol.encode(msg).encode())
+
+    def test_garbage_bytes_raise_decode_error(self):
+        with pytest.raises(protocol.DecodeError):
+            protocol.decode_server_message(b"\xc1\x00")
+
+
+@pytest.mark.skipif(not AGENT_COPY.exists(), reason="agent sources not checked out")
+def test_agent_copy_matches():
+    """agent/protocol.py must stay byte-identical to this module."""
+    assert AGENT_COPY.read_bytes() == Path(protocol.__file__).read_bytes()
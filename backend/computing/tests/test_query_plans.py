@@ -0,0 +1,215 @@
+"""Query-plan regression tests for the hot read paths.
+
+Each test runs a real code path from ``views.py``, ``utils.py`` or
+``consumers.py``, captures the SQL it issues and EXPLAINs every SELECT.
+A test fails if any of them reads one of the app's tables with a full
+scan, which is what a dropped or unusable index turns into.
+
+On SQLite a full scan is a ``SCAN <table>`` step of ``EXPLAIN QUERY
+PLAN``; on Postgres it is a ``Seq Scan`` with sequential scans disabled,
+so the planner's preference for them on tiny test tables does not count.
+"""
+# pylint: disable=protected-access
+import re
+from decimal import Decimal
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from computing.consumers import DashboardConsumer, GPUConsumer, _network_snapshot
+from computing.models import ChatSession, Job, Node
+from core.models import AgentToken, User
+from payments.models import CreditLog
+
+APP_TABLE_PREFIXES = ("computing_", "payments_", "core_")
+_SQLITE_SCAN = re.compile(r"\bSCAN (\w+)")
+_POSTGRES_SCAN = re.compile(r"Seq Scan on (\w+)")
+
+
+def _explain(sql):
+    """Return the plan of ``sql`` as a list of lines."""
+    with connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            with transaction.atomic():
+                cursor.execute("SET LOCAL enable_seqscan = off")
+                cursor.execute(f"EXPLAIN {sql}")
+                return [row[0] for row in cursor.fetchall()]
+        cursor.execute(f"EXPLAIN QUERY PLAN {sql}")
+        return [row[-1] for row in cursor.fetchall()]
+
+
+def _full_scans(plan):
+    """Return the app tables that ``plan`` reads with a full scan."""
+    pattern = _POSTGRES_SCAN if connection.vendor == "postgresql" else _SQLITE_SCAN
+    return {
+        match.group(1)
+        for line in plan
+        for match in pattern.finditer(line)
+        if match.group(1).startswith(APP_TABLE_PREFIXES)
+    }
+
+
+class _PlanChecker:
+    """Captures the queries of a block and checks their plans afterwards."""
+
+    def __init__(self):
+        self._capture = CaptureQueriesContext(connection)
+
+    def __enter__(self):
+        self._capture.__enter__()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._capture.__exit__(*exc_info)
+
+    def assert_indexed(self, allow=()):
+        """Fail if a captured SELECT full-scans a table outside ``allow``."""
+        selects = [
+            q["sql"] for q in self._capture.captured_queries
+            if q["sql"].lstrip().upper().startswith("SELECT")
+        ]
+        assert selects, "the code path issued no SELECT"
+        offenders = []
+        for sql in selects:
+            plan = _explain(sql)
+            scanned = _full_scans(plan) - set(allow)
+            if scanned:
+                offenders.append(f"{sorted(scanned)}: {sql}\n    " + "\n    ".join(plan))
+        assert not offenders, "full table scans:\n" + "\n".join(offenders)
+
+
+@pytest.fixture
+def plans():
+    """Capture the queries of a ``with plans:`` block for plan checks."""
+    return _PlanChecker()
+
+
+@pytest.fixture
+def seeded(db):  # pylint: disable=unused-argument,invalid-name
+    """A consumer and a provider with a node, a session, jobs and a ledger."""
+    consumer = User.objects.create_user(username="plan_user", password="p")
+    provider = User.objects.create_user(username="plan_provider", password="p")
+    node = Node.objects.create(
+        owner=provider, node_id="plan-node", name="Plan Node",
+        gpu_info={"models": ["llama2", "mistral"]}, is_active=True,
+    )
+    session = ChatSession.objects.create(user=consumer, name="Plan")
+    now = timezone.now()
+    for i in range(5):
+        Job.objects.create(
+            user=consumer, session=session, node=node, task_type="inference",
+            input_data={"prompt": f"p{i}", "model": "llama2"},
+            status="COMPLETED", completed_at=now, cost=Decimal("1.00"),
+        )
+    for amount, text in ((Decimal("1.00"), "Earned: Job #1"), (Decimal("-1.00"), "Spent: Job #2")):
+        CreditLog.objects.create(user=provider, amount=amount, description=text)
+    return {"consumer": consumer, "provider": provider, "node": node, "session": session}
+
+
+def _client(user):
+    client = APIClient()
+    client.force_authenticate(user=user)
+    return client
+
+
+@pytest.mark.django_db
+class TestViewQueryPlans:
+    """REST endpoints read through indexes."""
+
+    def test_job_list_pages(self, seeded, plans):  # pylint: disable=redefined-outer-name
+        client = _client(seeded["consumer"])
+        with plans:
+            first = client.get("/api/computing/jobs/", {"limit": 2}).data
+            client.get("/api/computing/jobs/", {"limit": 2, "cursor": first["next"]})
+        plans.assert_indexed()
+
+    def test_session_list(self, seeded, plans):  # pylint: disable=redefined-outer-name
+        with plans:
+            _client(seeded["consumer"]).get("/api/computing/sessions/")
+        plans.assert_indexed()
+
+    def test_session_messages(self, seeded, plans):  # pylint: disable=redefined-outer-name
+        url = f"/api/computing/sessions/{seeded['session'].id}/messages/"
+        with plans:
+            _client(seeded["consumer"]).get(url)
+        plans.assert_indexed()
+
+    def test_available_models(self, seeded, plans):  # pylint: disable=redefined-outer-name,unused-argument
+        with plans:
+            APIClient().get("/api/computing/models/")
+        plans.assert_indexed()
+
+    def test_network_stats(self, seeded, plans):  # pylint: disable=redefined-outer-name,unused-argument
+        with plans:
+            APIClient().get("/api/computing/stats/")
+        # The all-time job totals are counts of the whole tables by definition
+        plans.assert_indexed(allow=("computing_job", "computing_archivedjob"))
+
+    def test_wallet_ledger(self, seeded, plans):  # pylint: disable=redefined-outer-name
+        with plans:
+            _client(seeded["provider"]).get("/api/payments/wallet/")
+        plans.assert_indexed()
+
+
+@pytest.mark.django_db
+class TestUtilsQueryPlans:
+    """Dashboard statistics read through indexes."""
+
+    def test_provider_stats(self, seeded, plans):  # pylint: disable=redefined-outer-name
+        with plans:
+            _client(seeded["provider"]).get("/api/computing/provider-stats/")
+        plans.assert_indexed()
+
+    def test_job_timing_histograms(self, seeded, plans):  # pylint: disable=redefined-outer-name
+        with plans:
+            _client(seeded["consumer"]).get("/api/computing/job-timings/")
+        plans.assert_indexed()
+
+
+@pytest.mark.django_db(transaction=True)
+class TestConsumerQueryPlans:
+    """WebSocket helpers read through indexes."""
+
+    def test_network_snapshot(self, seeded, plans):  # pylint: disable=redefined-outer-name,unused-argument
+        with plans:
+            async_to_sync(_network_snapshot)()
+        plans.assert_indexed()
+
+    def test_recent_jobs_and_balance(self, seeded, plans):  # pylint: disable=redefined-outer-name
+        consumer = DashboardConsumer()
+        user_id = seeded["consumer"].id
+        with plans:
+            async_to_sync(consumer._get_recent_jobs)(user_id)
+            async_to_sync(consumer._get_balance)(user_id)
+        plans.assert_indexed()
+
+    def test_job_completion_data(self, seeded, plans):  # pylint: disable=redefined-outer-name
+        job = Job.objects.filter(user=seeded["consumer"]).first()
+        with plans:
+            async_to_sync(GPUConsumer()._get_job_completion_data)(
+                job.id, seeded["provider"].id,
+            )
+        plans.assert_indexed()
+
+    def test_agent_token_lookup(self, seeded, plans):  # pylint: disable=redefined-outer-name
+        _, raw = AgentToken.generate(seeded["provider"])
+        with plans:
+            async_to_sync(GPUConsumer()._validate_token)(raw)
+        plans.assert_indexed()
+
+
+def test_full_scan_detection():
+    """The detector flags app-table scans and ignores index searches."""
+    if connection.vendor == "postgresql":
+        plan = ["Seq Scan on computing_job  (cost=0.00..1.05 rows=5 width=8)"]
+        indexed = ["Index Scan using job_status_idx on computing_job"]
+    else:
+        plan = ["SCAN computing_job"]
+        indexed = ["SEARCH computing_job USING INDEX job_status_idx (status=?)"]
+    assert _full_scans(plan) == {"computing_job"}
+    assert _full_scans(indexed) == set()
+    assert _full_scans(["SCAN CONSTANT ROW"]) == set()
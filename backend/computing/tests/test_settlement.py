@@ -0,0 +1,219 @@
+"""Tests for the batched settlement of completed jobs."""
+import asyncio
+import datetime
+from decimal import Decimal
+from unittest.mock import patch
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.db import connection
+
+from computing import settlement
+from computing.models import Job, Node
+from computing.settlement import Completion, SettlementQueue, settle_batch
+from core.models import User
+from payments.models import CreditLog
+
+COST = Decimal("1.00")
+SHARE = Decimal("0.80")
+
+
+@pytest.fixture
+def market(db):  # pylint: disable=unused-argument,invalid-name
+    """A consumer, two providers with a node each, and running jobs."""
+    consumer = User.objects.create_user(username="settle_consumer", password="p")
+    providers = [
+        User.objects.create_user(
+            username=f"settle_provider{i}", password="p", wallet_balance=Decimal("10.00"),
+        )
+        for i in range(2)
+    ]
+    nodes = [
+        Node.objects.create(owner=p, node_id=f"settle-node-{i}", name=f"N{i}", is_active=True)
+        for i, p in enumerate(providers)
+    ]
+    jobs = [
+        Job.objects.create(
+            user=consumer, task_type="inference", status="RUNNING",
+            input_data={"prompt": f"p{i}", "model": "llama2"},
+        )
+        for i in range(6)
+    ]
+    return {"consumer": consumer, "providers": providers, "nodes": nodes, "jobs": jobs}
+
+
+def _completions(market):  # pylint: disable=redefined-outer-name
+    """Jobs 0, 2, 4 ran on provider 0 and 1, 3, 5 on provider 1."""
+    return [
+        Completion(job.id, {"output": f"out {job.id}"}, market["providers"][i % 2].id, {
+            "node_id": f"settle-node-{i % 2}",
+            "eval_count": 10 + i,
+            "eval_duration": datetime.timedelta(seconds=1),
+            "accepted_at": None,
+        })
+        for i, job in enumerate(market["jobs"])
+    ]
+
+
+class TestSettleBatch:
+    """settle_batch writes a whole batch in one transaction."""
+
+    def test_jobs_completed(self, market):  # pylint: disable=redefined-outer-name
+        settled = settle_batch(_completions(market), COST, SHARE)
+        assert settled == {job.id for job in market["jobs"]}
+        for i, job in enumerate(market["jobs"]):
+            job.refresh_from_db()
+            assert job.status == "COMPLETED"
+            assert job.cost == COST
+            assert job.result == {"output": f"out {job.id}"}
+            assert job.completed_at is not None
+            assert job.node == market["nodes"][i % 2]
+            assert job.eval_count == 10 + i
+
+    def test_providers_credited_with_ledger(self, market):  # pylint: disable=redefined-outer-name
+        settle_batch(_completions(market), COST, SHARE)
+        for provider in market["providers"]:
+            provider.refresh_from_db()
+            assert provider.wallet_balance == Decimal("10.00") + 3 * SHARE
+            logs = list(CreditLog.objects.filter(user=provider).order_by("id"))
+            assert [log.balance_after for log in logs] == [
+                Decimal("10.00") + n * SHARE for n in (1, 2, 3)
+            ]
+            assert all("(model: llama2)" in log.description for log in logs)
+
+    def test_missing_job_and_provider_skipped(self, market):  # pylint: disable=redefined-outer-name
+        job = market["jobs"][0]
+        settled = settle_batch([
+            Completion(99999, {"output": "x"}, market["providers"][0].id),
+            Completion(job.id, {"output": "x"}, 88888),
+        ], COST, SHARE)
+        assert settled == {job.id}
+        assert not CreditLog.objects.exists()
+        market["providers"][0].refresh_from_db()
+        assert market["providers"][0].wallet_balance == Decimal("10.00")
+
+    def test_replayed_result_settled_once(self, market):  # pylint: disable=redefined-outer-name
+        job, provider = market["jobs"][0], market["providers"][0]
+        completion = Completion(job.id, {"output": "x"}, provider.id)
+        assert settle_batch([completion, completion], COST, SHARE) == {job.id}
+        assert settle_batch([completion], COST, SHARE) == set()
+        provider.refresh_from_db()
+        assert provider.wallet_balance == Decimal("10.00") + SHARE
+        assert CreditLog.objects.filter(user=provider).count() == 1
+
+    def test_failed_job_not_settled(self, market):  # pylint: disable=redefined-outer-name
+        job = market["jobs"][0]
+        Job.objects.filter(id=job.id).update(status="FAILED")
+        assert settle_batch([Completion(job.id, {"output": "x"}, market["providers"][0].id)],
+                            COST, SHARE) == set()
+        job.refresh_from_db()
+        assert job.status == "FAILED"
+        assert not CreditLog.objects.exists()
+
+    def test_queries_do_not_grow_with_batch(self, market, django_assert_max_num_queries):  # pylint: disable=redefined-outer-name
+        # Select jobs and nodes, update jobs, update and read balances,
+        # insert the ledger, plus the transaction itself
+        with django_assert_max_num_queries(8):
+            settle_batch(_completions(market), COST, SHARE)
+
+    def test_results_offloaded_outside_transaction(self, market):  # pylint: disable=redefined-outer-name
+        # The test itself runs in a transaction; settle_batch must not add one yet
+        outer = len(connection.atomic_blocks)
+        depths = []
+
+        def offload(result):
+            depths.append(len(connection.atomic_blocks))
+            return result
+
+        with patch.object(settlement, "offload_result", offload):
+            settle_batch(_completions(market), COST, SHARE)
+        assert depths == [outer] * len(market["jobs"])
+
+
+def _recording_writer(batches, error=None, poison=None):
+    """A stand-in for settle_batch that records each batch it is given.
+
+    It raises ``error`` for every batch, or only for batches holding the
+    ``poison`` task ID when that is given.
+    """
+    def writer(completions, cost, provider_share):
+        batches.append(completions)
+        if error and (poison is None or poison in {c.task_id for c in completions}):
+            raise error
+        return settle_batch(completions, cost, provider_share)
+    return writer
+
+
+@pytest.mark.django_db(transaction=True)
+class TestSettlementQueue:
+    """Completions queued together are settled together."""
+
+    def test_concurrent_completions_share_batches(self, market):  # pylint: disable=redefined-outer-name
+        queue = SettlementQueue(COST, SHARE)
+        completions = _completions(market)
+
+        async def settle_all():
+            return await asyncio.gather(*(
+                queue.settle(c.task_id, c.result, c.provider_user_id, c.lifecycle)
+                for c in completions
+            ))
+
+        batches = []
+        with patch.object(settlement, "settle_batch", _recording_writer(batches)):
+            results = async_to_sync(settle_all)()
+        assert results == [True] * len(completions)
+        assert len(batches) < len(completions)
+        assert not Job.objects.exclude(status="COMPLETED").exists()
+        assert CreditLog.objects.count() == len(completions)
+
+    def test_batch_size_caps_a_transaction(self, market):  # pylint: disable=redefined-outer-name
+        queue = SettlementQueue(COST, SHARE, batch_size=2)
+        completions = _completions(market)
+
+        async def settle_all():
+            await asyncio.gather(*(
+                queue.settle(c.task_id, c.result, c.provider_user_id) for c in completions
+            ))
+
+        batches = []
+        with patch.object(settlement, "settle_batch", _recording_writer(batches)):
+            async_to_sync(settle_all)()
+        assert [len(batch) for batch in batches] == [2, 2, 2]
+        assert len(queue) == 0
+
+    def test_unknown_job_reports_false(self, market):  # pylint: disable=redefined-outer-name,unused-argument
+        queue = SettlementQueue(COST, SHARE)
+        assert async_to_sync(queue.settle)(99999, {}, None) is False
+
+    def test_failure_reaches_every_caller(self, market):  # pylint: disable=redefined-outer-name
+        queue = SettlementQueue(COST, SHARE)
+        completions = _completions(market)[:2]
+
+        async def settle_all():
+            return await asyncio.gather(*(
+                queue.settle(c.task_id, c.result, c.provider_user_id) for c in completions
+            ), return_exceptions=True)
+
+        writer = _recording_writer([], error=RuntimeError("db down"))
+        with patch.object(settlement, "settle_batch", writer):
+            results = async_to_sync(settle_all)()
+        assert all(isinstance(r, RuntimeError) for r in results)
+
+    def test_bad_completion_fails_alone(self, market):  # pylint: disable=redefined-outer-name
+        queue = SettlementQueue(COST, SHARE)
+        completions = _completions(market)
+        bad = completions[3].task_id
+
+        async def settle_all():
+            return await asyncio.gather(*(
+                queue.settle(c.task_id, c.result, c.provider_user_id) for c in completions
+            ), return_exceptions=True)
+
+        batches = []
+        writer = _recording_writer(batches, error=ValueError("bad result"), poison=bad)
+        with patch.object(settlement, "settle_batch", writer):
+            results = async_to_sync(settle_all)()
+        assert isinstance(results[3], ValueError)
+        assert results[:3] + results[4:] == [True] * (len(completions) - 1)
+        assert set(Job.objects.exclude(status="COMPLETED").values_list("id", flat=True)) == {bad}
+        assert CreditLog.objects.count() == len(completions) - 1
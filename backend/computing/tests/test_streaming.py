@@ -0,0 +1,144 @@
+"""Tests for the job_stream frame aggregator."""
+import asyncio
+
+import pytest
+
+from computing.streaming import StreamAggregator
+
+
+class _Recorder:
+    """Collects frames passed to the aggregator's send callback."""
+
+    def __init__(self):
+        self.frames = []
+
+    async def __call__(self, owner_id, frame):
+        self.frames.append((owner_id, frame))
+
+
+@pytest.mark.asyncio
+class TestStreamAggregator:
+    """Batching, flushing and sequencing of stream chunks."""
+
+    async def test_chunks_within_window_are_merged(self):
+        sent = _Recorder()
+        agg = StreamAggregator(sent, interval=0.02, max_chars=1000)
+        for piece in ("Hel", "lo", " world"):
+            await agg.add(1, 7, piece)
+        assert not sent.frames
+
+        await asyncio.sleep(0.05)
+        assert len(sent.frames) == 1
+        owner_id, frame = sent.frames[0]
+        assert owner_id == 7
+        assert frame["type"] == "job_stream"
+        assert frame["task_id"] == 1
+        assert frame["chunk"] == "Hello world"
+        assert frame["seq"] == 1
+        assert frame["chunks"] == 3
+
+    async def test_size_threshold_flushes_immediately(self):
+        sent = _Recorder()
+        agg = StreamAggregator(sent, interval=10, max_chars=5)
+        await agg.add(1, 7, "abc")
+        assert not sent.frames
+        await agg.add(1, 7, "def")
+        assert [f["chunk"] for _, f in sent.frames] == ["abcdef"]
+
+    async def test_sequence_numbers_increase_per_task(self):
+        sent = _Recorder()
+        agg = StreamAggregator(sent, interval=10, max_chars=1)
+        await agg.add(1, 7, "a")
+        await agg.add(2, 8, "b")
+        await agg.add(1, 7, "c")
+        seqs = [(f["task_id"], f["seq"]) for _, f in sent.frames]
+        assert seqs == [(1, 1), (2, 1), (1, 2)]
+
+    async def test_finish_flushes_and_forgets_task(self):
+        sent = _Recorder()
+        agg = StreamAggregator(sent, interval=10, max_chars=1000)
+        await agg.add(1, 7, "tail")
+        await agg.finish(1)
+        assert [f["chunk"] for _, f in sent.frames] == ["tail"]
+        assert 1 not in agg
+
+    async def test_close_flushes_all_tasks(self):
+        sent = _Recorder()
+        agg = StreamAggregator(sent, interval=10, max_chars=1000)
+        await agg.add(1, 7, "x")
+        await agg.add(2, 8, "y")
+        await agg.close()
+        assert sorted(f["chunk"] for _, f in sent.frames) == ["x", "y"]
+
+    async def test_empty_chunk_ignored(self):
+        sent = _Recorder()
+        agg = StreamAggregator(sent, interval=10, max_chars=1000)
+        await agg.add(1, 7, "")
+        await agg.close()
+        assert not sent.frames
+
+
+@pytest.mark.asyncio
+class TestStreamReplay:
+    """Sent-frame history used to resume dashboards."""
+
+    async def test_replay_returns_frames_after_seq(self):
+        sent = _Recorder()
+        agg = StreamAggregator(sent, interval=10, max_chars=1000)
+        for piece in ("a", "b", "c"):
+            await agg.add(1, 7, piece)
+            await agg.flush(1)
+        frames = await agg.replay(1, 1)
+        assert [(f["seq"], f["chunk"]) for f in frames] == [(2, "b"), (3, "c")]
+
+    async def test_replay_flushes_pending_text(self):
+        sent = _Recorder()
+        agg = StreamAggregator(sent, interval=10, max_chars=1000)
+        await agg.add(1, 7, "pending")
+        frames = await agg.replay(1, 0)
+        assert [f["chunk"] for f in frames] == ["pending"]
+        assert len(sent.frames) == 1
+
+    async def test_history_is_bounded(self):
+        agg = StreamAggregator(_Recorder(), interval=10, max_chars=1000, replay_chars=5)
+        for piece in ("abc", "def", "ghi"):
+            await agg.add(1, 7, piece)
+            await agg.flush(1)
+        frames = await agg.replay(1, 0)
+        assert [f["seq"] for f in frames] == [3]
+
+    async def test_replay_past_truncated_history_sends_whole_text(self):
+        agg = StreamAggregator(_Recorder(), interval=10, max_chars=1000, replay_chars=5)
+        for piece in ("abc", "def", "ghi"):
+            await agg.add(1, 7, piece)
+            await agg.flush(1)
+        frames = await agg.replay(1, 1)
+        assert frames == [{
+            "type": "job_stream", "task_id": 1, "chunk": "abcdefghi",
+            "seq": 3, "chunks": 3, "truncated": True,
+        }]
+        # Nothing missing past seq 2, so the kept frames are enough
+        assert [f["seq"] for f in await agg.replay(1, 2)] == [3]
+
+    async def test_replay_of_unknown_task_is_empty(self):
+        agg = StreamAggregator(_Recorder())
+        assert await agg.replay(9, 0) == []
+
+    async def test_text_assembles_every_chunk(self):
+        agg = StreamAggregator(_Recorder(), interval=10, max_chars=4, replay_chars=4)
+        for piece in ("abc", "def", "ghi"):
+            await agg.add(1, 7, piece)
+        assert agg.text(1) == "abcdefghi"
+        assert agg.text(2) is None
+        await agg.finish(1)
+        assert agg.text(1) is None
+
+    async def test_iterates_open_tasks(self):
+        agg = StreamAggregator(_Recorder(), interval=10, max_chars=1000)
+        await agg.add(1, 7, "a")
+        await agg.add(2, 7, "b")
+        await agg.add(3, 7, "")
+        assert sorted(agg) == [1, 2]
+        await agg.finish(1)
+        assert list(agg) == [2]
+        await agg.close()
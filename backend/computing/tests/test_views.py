@@ -53,6 +53,19 @@ class AvailableModelsViewTests(TestCase):
         self.assertEqual(len(response.data['models']), 0)
         self.assertEqual(response.data['total_nodes'], 0)
 
+    def test_models_grouped_across_nodes(self):
+        """Each model lists the active nodes serving it, most served first."""
+        Node.objects.create(
+            owner=self.provider, node_id='test-node-2', name='Second',
+            gpu_info={'models': [{'name': 'gemma3:270m', 'size': 300}]},
+            is_active=True,
+        )
+        models = self.client.get('/api/computing/models/').data['models']
+        self.assertEqual(models[0]['name'], 'gemma3:270m')
+        self.assertEqual(models[0]['providers'], 2)
+        self.assertEqual(models[0]['nodes'], ['test-node-1', 'test-node-2'])
+        self.assertEqual(models[1]['providers'], 1)
+
 
 class NetworkStatsViewTests(TestCase):
     """Tests for GET /api/computing/stats/"""
@@ -137,8 +150,9 @@ class JobListViewTests(TestCase):
         self.client.force_authenticate(user=self.user)
         response = self.client.get('/api/computing/jobs/')
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertIsInstance(response.data, list)
-        self.assertEqual(len(response.data), 1)
+        self.assertIsInstance(response.data['results'], list)
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertIsNone(response.data['next'])
 
     def test_users_only_see_own_jobs(self):
         """Users only see their own jobs in the list."""
@@ -151,7 +165,77 @@ class JobListViewTests(TestCase):
         )
         self.client.force_authenticate(user=self.user)
         response = self.client.get('/api/computing/jobs/')
-        self.assertEqual(len(response.data), 1)
+        self.assertEqual(len(response.data['results']), 1)
+
+    def _make_jobs(self, count, created_at=None):
+        """Create ``count`` extra jobs, optionally sharing one timestamp."""
+        jobs = [
+            Job.objects.create(
+                user=self.user, task_type='inference',
+                input_data={'prompt': f'p{i}', 'model': 'llama2'},
+            )
+            for i in range(count)
+        ]
+        if created_at is not None:
+            Job.objects.filter(id__in=[j.id for j in jobs]).update(created_at=created_at)
+        return jobs
+
+    def test_pages_cover_every_job_once(self):
+        """Following next cursors visits every job once, newest first."""
+        self._make_jobs(4)
+        # Jobs sharing a timestamp are ordered by id across page boundaries
+        self._make_jobs(3, created_at=self.job.created_at)
+        self.client.force_authenticate(user=self.user)
+        seen, cursor = [], None
+        while True:
+            params = {'limit': 3}
+            if cursor:
+                params['cursor'] = cursor
+            response = self.client.get('/api/computing/jobs/', params)
+            self.assertLessEqual(len(response.data['results']), 3)
+            seen.extend(j['id'] for j in response.data['results'])
+            cursor = response.data['next']
+            if not cursor:
+                break
+        expected = list(
+            Job.objects.filter(user=self.user)
+            .order_by('-created_at', '-id').values_list('id', flat=True)
+        )
+        self.assertEqual(seen, expected)
+
+    def test_result_omitted_by_default(self):
+        """The result JSON is only returned when requested."""
+        Job.objects.filter(id=self.job.id).update(result={'output': 'x' * 1000})
+        self.client.force_authenticate(user=self.user)
+        item = self.client.get('/api/computing/jobs/').data['results'][0]
+        self.assertNotIn('result', item)
+        self.assertEqual(item['model'], 'llama2')
+
+    def test_fields_selector(self):
+        """fields= limits the returned keys."""
+        Job.objects.filter(id=self.job.id).update(result={'output': 'done'})
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get('/api/computing/jobs/', {'fields': 'id,result'})
+        self.assertEqual(
+            response.data['results'], [{'id': self.job.id, 'result': {'output': 'done'}}],
+        )
+
+    def test_prompt_truncated(self):
+        """List prompts are cut to a preview length."""
+        Job.objects.create(
+            user=self.user, task_type='inference',
+            input_data={'prompt': 'y' * 500, 'model': 'llama2'},
+        )
+        self.client.force_authenticate(user=self.user)
+        item = self.client.get('/api/computing/jobs/').data['results'][0]
+        self.assertEqual(item['prompt'], 'y' * 80)
+
+    def test_bad_parameters_rejected(self):
+        """Unknown fields, bad cursors and bad limits return 400."""
+        self.client.force_authenticate(user=self.user)
+        for params in ({'fields': 'id,secret'}, {'cursor': 'not-a-cursor'}, {'limit': 'x'}):
+            response = self.client.get('/api/computing/jobs/', params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, params)
 
 
 class ProviderStatsViewTests(TestCase):
@@ -193,3 +277,91 @@ class ProviderStatsViewTests(TestCase):
             '/api/computing/provider-stats/?days=7',
         )
         self.assertEqual(response.data['period_days'], 7)
+
+
+def _bucketed(jobs):
+    """Bucket counts per timing metric, computed from each job's properties."""
+    import bisect
+    from ..utils import TIMING_METRICS
+    counts = {name: [0] * (len(bounds) + 1) for name, bounds in TIMING_METRICS}
+    for job in jobs:
+        for name, bounds in TIMING_METRICS:
+            value = getattr(job, name)
+            if value is not None:
+                counts[name][bisect.bisect_left(bounds, value)] += 1
+    return counts
+
+
+class JobTimingStatsViewTests(TestCase):
+    """Tests for GET /api/computing/job-timings/"""
+
+    def setUp(self):
+        """Set up a finished job with lifecycle timings."""
+        from datetime import timedelta
+        from django.utils import timezone
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='timer', password='pass')
+        node = Node.objects.create(owner=self.user, node_id='timing-node', name='T')
+        job = Job.objects.create(
+            user=self.user, node=node, task_type='inference', status='COMPLETED',
+            input_data={'prompt': 'hi', 'model': 'llama3'},
+            eval_count=60, eval_duration=timedelta(seconds=2),
+        )
+        Job.objects.filter(pk=job.pk).update(
+            accepted_at=job.created_at + timedelta(seconds=0.3),
+            first_token_at=job.created_at + timedelta(seconds=1.5),
+            completed_at=timezone.now(),
+        )
+
+    def test_job_timings_requires_auth(self):
+        """Unauthenticated requests are rejected."""
+        response = self.client.get('/api/computing/job-timings/')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_job_timings_histograms_per_model_and_node(self):
+        """Each metric lands in its bucket for the job's model and node."""
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get('/api/computing/job-timings/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        buckets = response.data['buckets']
+        model = response.data['by_model']['llama3']
+        self.assertEqual(response.data['by_node']['timing-node'], model)
+
+        queue = model['queue_wait']
+        self.assertEqual(queue['count'], 1)
+        self.assertEqual(queue['counts'][buckets['queue_wait'].index(0.5)], 1)
+        tps = model['tokens_per_second']
+        self.assertAlmostEqual(tps['sum'], 30)
+        self.assertEqual(tps['counts'][buckets['tokens_per_second'].index(40)], 1)
+
+    def test_job_timings_match_per_job_bucketing(self):
+        """SQL buckets agree with bucketing each job's own metrics."""
+        from datetime import timedelta
+        from django.utils import timezone
+        node = Node.objects.get(node_id='timing-node')
+        waits = (0.1, 0.7, 5, 200, None)
+        for i, wait in enumerate(waits):
+            job = Job.objects.create(
+                user=self.user, node=node if i % 2 else None, task_type='inference',
+                status='COMPLETED', input_data={'prompt': 'hi', 'model': 'llama3'},
+                eval_count=i * 50, eval_duration=timedelta(seconds=i or 1),
+            )
+            Job.objects.filter(pk=job.pk).update(
+                accepted_at=job.created_at + timedelta(seconds=wait) if wait else None,
+                first_token_at=job.created_at + timedelta(seconds=(wait or 1) * 2),
+                completed_at=timezone.now(),
+            )
+        self.client.force_authenticate(user=self.user)
+        data = self.client.get('/api/computing/job-timings/').data
+        for name, counts in _bucketed(Job.objects.all()).items():
+            self.assertEqual(data['by_model']['llama3'][name]['counts'], counts, name)
+        self.assertEqual(data['by_node']['unknown']['queue_wait']['count'], 2)
+
+    def test_job_timings_days_validated(self):
+        """A malformed or non-positive days is a 400; a large one is clamped."""
+        self.client.force_authenticate(user=self.user)
+        for days in ('abc', '0', '-3'):
+            response = self.client.get('/api/computing/job-timings/', {'days': days})
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, days)
+        response = self.client.get('/api/computing/job-timings/', {'days': 365})
+        self.assertEqual(response.data['period_days'], 30)
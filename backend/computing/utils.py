@@ -1,13 +1,16 @@
 """Utility functions for computing module statistics and metrics."""
 import datetime
 from decimal import Decimal
+from itertools import chain
 
-from django.db.models import Count, Sum
-from django.db.models.functions import TruncDate
+from django.db import connections, router
+from django.db.models import Case, Count, F, FloatField, Q, Sum, When
+from django.db.models.functions import Cast, Extract, TruncDate
 from django.utils import timezone
 
 from payments.models import CreditLog
-from .models import Job, Node
+from .blobs import load_result
+from .models import ArchivedJob, Job, Node
 
 
 def get_provider_stats(user, days=30):  # pylint: disable=too-many-locals
@@ -27,6 +30,9 @@ def get_provider_stats(user, days=30):  # pylint: disable=too-many-locals
         status="COMPLETED"
     )
     jobs_served_period = jobs_served.filter(completed_at__gte=since)
+    # Archived jobs still count towards the totals
+    archived_served = ArchivedJob.objects.filter(node__owner=user, status="COMPLETED")
+    archived_served_period = archived_served.filter(completed_at__gte=since)
 
     # --- Earnings ---
     earnings_logs = CreditLog.objects.filter(
@@ -60,14 +66,15 @@ def get_provider_stats(user, days=30):  # pylint: disable=too-many-locals
 
     # --- Per-model breakdown ---
     model_stats = {}
-    for job in jobs_served_period:
-        model = "unknown"
-        if isinstance(job.input_data, dict):
-            model = (job.input_data or {}).get("model", "unknown")
+    for row in chain(
+        jobs_served_period.values("model").annotate(jobs=Count("id")).order_by(),
+        archived_served_period.values("model").annotate(jobs=Count("id")).order_by(),
+    ):
+        model = row["model"] or "unknown"
         if model not in model_stats:
             model_stats[model] = {"model": model, "jobs": 0, "earned": 0.0}
-        model_stats[model]["jobs"] += 1
-        model_stats[model]["earned"] += 0.80  # PROVIDER_SHARE
+        model_stats[model]["jobs"] += row["jobs"]
+        model_stats[model]["earned"] += 0.80 * row["jobs"]  # PROVIDER_SHARE
 
     # --- Recent transactions ---
     recent_logs = CreditLog.objects.filter(user=user).order_by("-created_at")[:50]
@@ -82,21 +89,14 @@ def get_provider_stats(user, days=30):  # pylint: disable=too-many-locals
     # --- Jobs I submitted (as consumer) ---
     my_jobs = Job.objects.filter(user=user).order_by('-created_at')
     consumer_jobs = []
-    for j in my_jobs[:50]:
-        prompt = ""
-        model = "unknown"
-        if isinstance(j.input_data, dict):
-            prompt = (j.input_data or {}).get("prompt", "")[:80]
-            model = (j.input_data or {}).get("model", "")
-        else:
-            prompt = str(j.input_data)[:80]
+    for j in my_jobs.defer("input_data")[:50]:
         consumer_jobs.append({
             "id": j.id,
             "status": j.status,
-            "prompt": prompt,
-            "model": model,
+            "prompt": j.prompt_preview,
+            "model": j.model or "unknown",
             "cost": str(j.cost) if j.cost else None,
-            "result": j.result,
+            "result": load_result(j.result),
             "created_at": j.created_at.isoformat(),
             "completed_at": (
                 j.completed_at.isoformat() if j.completed_at else None
@@ -107,8 +107,10 @@ def get_provider_stats(user, days=30):  # pylint: disable=too-many-locals
         "provider": {
             "total_earnings": float(total_earnings),
             "period_earnings": float(period_earnings),
-            "total_jobs_served": jobs_served.count(),
-            "period_jobs_served": jobs_served_period.count(),
+            "total_jobs_served": jobs_served.count() + archived_served.count(),
+            "period_jobs_served": (
+                jobs_served_period.count() + archived_served_period.count()
+            ),
             "active_nodes": active_nodes.count(),
             "total_nodes": my_nodes.count(),
             "earnings_by_day": earnings_by_day,
@@ -116,10 +118,120 @@ def get_provider_stats(user, days=30):  # pylint: disable=too-many-locals
         },
         "consumer": {
             "total_spent": float(total_spent),
-            "total_jobs": my_jobs.count(),
+            "total_jobs": my_jobs.count() + ArchivedJob.objects.filter(user=user).count(),
             "jobs": consumer_jobs,
         },
         "wallet_balance": float(user.wallet_balance),
         "transactions": transactions,
         "period_days": days,
     }
+
+
+# Upper bounds (seconds) of the queue-wait and time-to-first-token buckets
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+# Upper bounds (tokens/sec) of the generation throughput buckets
+THROUGHPUT_BUCKETS = (1, 5, 10, 20, 40, 80, 160)
+
+TIMING_METRICS = (
+    ("queue_wait", LATENCY_BUCKETS),
+    ("time_to_first_token", LATENCY_BUCKETS),
+    ("tokens_per_second", THROUGHPUT_BUCKETS),
+)
+
+
+# Longest window the timing histograms cover, in days
+MAX_TIMING_DAYS = 30
+
+
+def _seconds(duration, native_durations):
+    """``duration`` as a number of seconds in SQL.
+
+    Backends with an interval type extract its epoch; the others store
+    and subtract durations as integer microseconds.
+    """
+    if native_durations:
+        return Extract(duration, "epoch", output_field=FloatField())
+    return Cast(duration, FloatField()) / 1000000
+
+
+def _timing_values(native_durations):
+    """Annotations computing each timing metric in SQL, NULL when unknown."""
+    return {
+        "queue_wait": _seconds(F("accepted_at") - F("created_at"), native_durations),
+        "time_to_first_token": _seconds(
+            F("first_token_at") - F("created_at"), native_durations,
+        ),
+        "tokens_per_second": Case(
+            When(
+                eval_count__gt=0, eval_duration__gt=datetime.timedelta(0),
+                then=F("eval_count") / _seconds(F("eval_duration"), native_durations),
+            ),
+            output_field=FloatField(),
+        ),
+    }
+
+
+def _timing_aggregates():
+    """Per metric: the count and sum, and how many values are <= each bound."""
+    aggregates = {}
+    for name, bounds in TIMING_METRICS:
+        aggregates[f"{name}__count"] = Count(name)
+        aggregates[f"{name}__sum"] = Sum(name)
+        for i, bound in enumerate(bounds):
+            aggregates[f"{name}__le{i}"] = Count("pk", filter=Q(**{f"{name}__lte": bound}))
+    return aggregates
+
+
+def _add_histograms(histograms, row):
+    """Add one aggregate row to ``histograms``, bucketing like ``bisect_left``."""
+    for name, bounds in TIMING_METRICS:
+        histogram = histograms[name]
+        count = row[f"{name}__count"]
+        histogram["count"] += count
+        histogram["sum"] += float(row[f"{name}__sum"] or 0)
+        below = 0
+        for i in range(len(bounds)):
+            at_or_below = row[f"{name}__le{i}"]
+            histogram["counts"][i] += at_or_below - below
+            below = at_or_below
+        histogram["counts"][-1] += count - below
+
+
+def _new_histograms():
+    """Empty histograms for every timing metric; the last count is overflow."""
+    return {
+        name: {"count": 0, "sum": 0.0, "counts": [0] * (len(bounds) + 1)}
+        for name, bounds in TIMING_METRICS
+    }
+
+
+def get_job_timing_histograms(days=1):
+    """
+    Buckets queue wait, time-to-first-token and tokens/sec of jobs
+    finished in the last ``days`` days, per model and per node.
+
+    The buckets are counted in SQL, grouped by model and node, so only
+    one row per pair is read whatever the number of jobs.
+    """
+    since = timezone.now() - datetime.timedelta(days=days)
+    # Grouping by the joined node column first leaves the completed_at range,
+    # not the model index, to pick the rows
+    features = connections[router.db_for_read(Job)].features
+    rows = Job.objects.filter(completed_at__gte=since).annotate(
+        **_timing_values(features.has_native_duration_field),
+    ).values("node__node_id", "model").annotate(**_timing_aggregates()).order_by()
+
+    by_model = {}
+    by_node = {}
+    for row in rows:
+        model = row["model"] or "unknown"
+        node_id = row["node__node_id"] or "unknown"
+        _add_histograms(by_model.setdefault(model, _new_histograms()), row)
+        _add_histograms(by_node.setdefault(node_id, _new_histograms()), row)
+
+    return {
+        "buckets": {name: list(bounds) for name, bounds in TIMING_METRICS},
+        "by_model": by_model,
+        "by_node": by_node,
+        "period_days": days,
+    }
@@ -4,12 +4,71 @@ from decimal import Decimal
 from asgiref.sync import async_to_sync
 from channels.layers import get_channel_layer
 from django.db import transaction
+from django.db.models import Count, F, Max, OuterRef, Q, StringAgg, Subquery, Sum, Value
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
+from django.utils import timezone
 from rest_framework import views, status
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.response import Response
 
-from .models import Job, Node, ChatSession
+from core.db_router import ReplicaReadMixin
+from core.pagination import PaginationError, keyset_page, merge_pages, page_size
+from core.metrics import JOBS_SUBMITTED
+from payments.models import CreditLog
+from payments.services import CreditService
+
+from .blobs import load_result, stream_result
+from .models import ArchivedJob, Job, Node, NodeModel, ChatSession
+
+
+def _job_prompt(preview=False):
+    """Annotation for a job's ``prompt``: the stored preview column, or the
+    full text read out of ``input_data`` in SQL, so queries never load the
+    JSON blob. Lists show previews; the full text is on the detail view."""
+    return {"prompt": F("prompt_preview") if preview else Job.full_prompt()}
+
+
+def _find_job(job_id):
+    """Return ``(job, archived)`` for ``job_id`` or raise ``Http404``.
+
+    An archived job is rebuilt from its compressed archive row, the slow path.
+    """
+    job = Job.objects.filter(id=job_id).first()
+    if job is not None:
+        return job, False
+    return get_object_or_404(ArchivedJob, id=job_id).to_job(), True
+
+
+def _job_row(row, fields):
+    """Serialize the ``fields`` of a job ``values()`` row."""
+    item = {f: row[f] for f in fields}
+    if item.get("session_id") is not None:
+        item["session_id"] = str(item["session_id"])
+    if "cost" in item:
+        item["cost"] = str(item["cost"]) if item["cost"] else None
+    return item
+
+
+def _add_archived_totals(rows, session_ids):
+    """Fold the sessions' archived jobs into their message counts and cost."""
+    archived = {
+        row["session_id"]: row
+        for row in ArchivedJob.objects.filter(session_id__in=session_ids).values(
+            "session_id",
+        ).annotate(
+            message_count=Count("id"),
+            completed_count=Count("id", filter=Q(status="COMPLETED")),
+            total_cost=Sum("cost"),
+        ).order_by()
+    }
+    for r in rows:
+        old = archived.get(r["id"])
+        if old:
+            r["message_count"] += old["message_count"]
+            r["completed_count"] += old["completed_count"]
+            if old["total_cost"] is not None:
+                r["total_cost"] = (r["total_cost"] or 0) + old["total_cost"]
 
 
 class JobSubmissionView(views.APIView):
@@ -55,17 +114,16 @@ class JobSubmissionView(views.APIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        # Check Balance (1.00 base + 0.05 surcharge for streaming)
+        # 1.00 base + 0.05 surcharge for streaming
         job_cost = Decimal('1.05') if stream else Decimal('1.00')
-        if user.wallet_balance < job_cost:
-            return Response(
-                {"error": "Insufficient funds"},
-                status=status.HTTP_402_PAYMENT_REQUIRED,
-            )
 
         with transaction.atomic():
-            user.wallet_balance -= job_cost
-            user.save(update_fields=['wallet_balance'])
+            # The conditional debit is the balance check
+            if not CreditService.debit(user, job_cost):
+                return Response(
+                    {"error": "Insufficient funds"},
+                    status=status.HTTP_402_PAYMENT_REQUIRED,
+                )
 
             job = Job.objects.create(
                 user=user,
@@ -75,6 +133,11 @@ class JobSubmissionView(views.APIView):
                 status="PENDING",
                 cost=job_cost,
             )
+            CreditLog.record(
+                user,
+                amount=-job_cost,
+                description=f"Spent: Job #{job.id} (model: {model})",
+            )
 
         # If session name is default, we can optionally auto-update it here
         if session and session.name == 'New Chat':
@@ -96,55 +159,107 @@ class JobSubmissionView(views.APIView):
                 }
             }
         )
+        Job.objects.filter(pk=job.pk).update(dispatched_at=timezone.now())
+        JOBS_SUBMITTED.labels(model).inc()
 
         return Response({"status": "submitted", "job_id": job.id}, status=status.HTTP_201_CREATED)
 
 
 class JobDetailView(views.APIView):
-    """Retrieve details for a single job."""
+    """Retrieve details for a single job, live or archived."""
     permission_classes = [IsAuthenticated]
 
     def get(self, request, job_id):
         """Return job details if the requesting user owns the job."""
-        job = get_object_or_404(Job, id=job_id)
-        if job.user != request.user:
+        job, archived = _find_job(job_id)
+        if job.user_id != request.user.id:
             return Response({"error": "Unauthorized"}, status=status.HTTP_403_FORBIDDEN)
 
         return Response({
             "id": job.id,
+            "archived": archived,
             "session_id": str(job.session_id) if job.session_id is not None else None,
             "status": job.status,
-            "result": job.result,
+            "result": load_result(job.result),
             "prompt": job.input_data.get("prompt"),
-            "model": job.input_data.get("model"),
+            "model": job.model,
             "cost": str(job.cost) if job.cost else None,
             "created_at": job.created_at,
+            "dispatched_at": job.dispatched_at,
+            "accepted_at": job.accepted_at,
+            "first_token_at": job.first_token_at,
             "completed_at": job.completed_at,
+            "node_id": job.node.node_id if job.node else None,
+            "eval_count": job.eval_count,
+            "queue_wait": job.queue_wait,
+            "time_to_first_token": job.time_to_first_token,
+            "tokens_per_second": job.tokens_per_second,
         })
 
 
-class JobListView(views.APIView):
-    """List all jobs for the authenticated user."""
+class JobResultView(views.APIView):
+    """Stream a job's result as JSON, straight out of the blob store when
+    it was offloaded there."""
     permission_classes = [IsAuthenticated]
 
+    def get(self, request, job_id):
+        """Return the result of a job the requesting user owns."""
+        job, _ = _find_job(job_id)
+        if job.user_id != request.user.id:
+            return Response({"error": "Unauthorized"}, status=status.HTTP_403_FORBIDDEN)
+        # JsonResponse would serialize the whole document in memory
+        return StreamingHttpResponse(
+            stream_result(job.result), headers={"Content-Type": "application/json"},
+        )
+
+
+class JobListView(ReplicaReadMixin, views.APIView):
+    """List the authenticated user's jobs, newest first, one page at a time.
+
+    Query parameters: ``cursor`` (the ``next`` value of the previous page),
+    ``limit`` and ``fields``, a comma-separated subset of ``LIST_FIELDS``.
+    ``result`` can be large, so it is only returned when asked for, and a
+    result offloaded to the blob store is returned as its reference.
+    """
+    permission_classes = [IsAuthenticated]
+
+    LIST_FIELDS = (
+        "id", "session_id", "status", "prompt", "model", "cost",
+        "result", "created_at", "completed_at",
+    )
+    DEFAULT_FIELDS = tuple(f for f in LIST_FIELDS if f != "result")
+
+    def _fields(self, request):
+        requested = request.query_params.get("fields")
+        if not requested:
+            return self.DEFAULT_FIELDS
+        fields = tuple(dict.fromkeys(f.strip() for f in requested.split(",") if f.strip()))
+        unknown = set(fields) - set(self.LIST_FIELDS)
+        if unknown:
+            raise PaginationError(f"Unknown fields: {', '.join(sorted(unknown))}.")
+        return fields
+
     def get(self, request):
-        """Return all jobs belonging to the authenticated user."""
-        jobs = Job.objects.filter(user=request.user).order_by('-created_at')
-        data = [{
-            "id": j.id,
-            "session_id": str(j.session_id) if j.session_id is not None else None,
-            "status": j.status,
-            "prompt": j.input_data.get("prompt", "")[:80],
-            "model": j.input_data.get("model", ""),
-            "cost": str(j.cost) if j.cost else None,
-            "result": j.result,
-            "created_at": j.created_at,
-            "completed_at": j.completed_at,
-        } for j in jobs]
-        return Response(data)
-
-
-class AvailableModelsView(views.APIView):
+        """Return one page of the user's jobs and the cursor for the next."""
+        try:
+            fields = self._fields(request)
+            limit = page_size(request.query_params)
+            jobs = Job.objects.filter(user=request.user).annotate(
+                **_job_prompt(preview=True),
+            ).values(*dict.fromkeys(("id", "created_at") + fields))
+            rows, next_cursor = keyset_page(
+                jobs, request.query_params.get("cursor"), limit,
+            )
+        except PaginationError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response({
+            "results": [_job_row(row, fields) for row in rows],
+            "next": next_cursor,
+        })
+
+
+class AvailableModelsView(ReplicaReadMixin, views.APIView):
     """Returns models available across all active nodes.
     
     Public endpoint — consumers can browse what's available before signing up.
@@ -153,53 +268,46 @@ class AvailableModelsView(views.APIView):
 
     def get(self, _request):
         """Return models available across all active nodes."""
-        active_nodes = Node.objects.filter(is_active=True)
-        model_map = {}
-
-        for node in active_nodes:
-            models = node.gpu_info.get("models", [])
-            for m in models:
-                if m not in model_map:
-                    model_map[m] = {
-                        "name": m,
-                        "providers": 0,
-                        "nodes": [],
-                    }
-                model_map[m]["providers"] += 1
-                model_map[m]["nodes"].append(node.node_id)
-
-        models_list = sorted(model_map.values(), key=lambda x: -x["providers"])
+        rows = NodeModel.objects.filter(node__is_active=True).values("model_name").annotate(
+            providers=Count("node", distinct=True),
+            nodes=StringAgg("node__node_id", delimiter=Value("\n"), order_by="node__node_id"),
+        ).order_by("-providers", "model_name")
         return Response({
-            "models": models_list,
-            "total_nodes": active_nodes.count(),
+            "models": [{
+                "name": row["model_name"],
+                "providers": row["providers"],
+                "nodes": row["nodes"].split("\n"),
+            } for row in rows],
+            "total_nodes": Node.objects.filter(is_active=True).count(),
         })
 
 
-class NetworkStatsView(views.APIView):
+class NetworkStatsView(ReplicaReadMixin, views.APIView):
     """Public endpoint for network statistics."""
     permission_classes = [AllowAny]
 
     def get(self, _request):
         """Return public network-wide statistics."""
         active_nodes = Node.objects.filter(is_active=True).count()
-        total_jobs = Job.objects.count()
-        completed_jobs = Job.objects.filter(status="COMPLETED").count()
+        total_jobs = Job.objects.count() + ArchivedJob.objects.count()
+        completed_jobs = (
+            Job.objects.filter(status="COMPLETED").count()
+            + ArchivedJob.objects.filter(status="COMPLETED").count()
+        )
 
-        # Collect unique models
-        all_models = set()
-        for node in Node.objects.filter(is_active=True):
-            for m in node.gpu_info.get("models", []):
-                all_models.add(m)
+        available_models = NodeModel.objects.filter(
+            node__is_active=True,
+        ).values("model_name").distinct().count()
 
         return Response({
             "active_nodes": active_nodes,
             "total_jobs": total_jobs,
             "completed_jobs": completed_jobs,
-            "available_models": len(all_models),
+            "available_models": available_models,
         })
 
 
-class ProviderStatsView(views.APIView):
+class ProviderStatsView(ReplicaReadMixin, views.APIView):
     """Authenticated endpoint returning comprehensive provider metrics."""
     permission_classes = [IsAuthenticated]
 
@@ -211,38 +319,98 @@ class ProviderStatsView(views.APIView):
         return Response(stats)
 
 
-class SessionListView(views.APIView):
-    """List and create Chat Sessions."""
+class JobTimingStatsView(ReplicaReadMixin, views.APIView):
+    """Authenticated endpoint with job latency histograms per model and node."""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        """Return queue wait, TTFT and tokens/sec histograms for recent jobs.
+
+        ``days`` is clamped to ``MAX_TIMING_DAYS``.
+        """
+        # pylint: disable=import-outside-toplevel
+        from .utils import MAX_TIMING_DAYS, get_job_timing_histograms
+        try:
+            days = int(request.query_params.get("days", 1))
+        except ValueError:
+            return Response(
+                {"error": "days must be an integer."}, status=status.HTTP_400_BAD_REQUEST,
+            )
+        if days < 1:
+            return Response(
+                {"error": "days must be at least 1."}, status=status.HTTP_400_BAD_REQUEST,
+            )
+        return Response(get_job_timing_histograms(min(days, MAX_TIMING_DAYS)))
+
+
+class SessionListView(ReplicaReadMixin, views.APIView):
+    """List and create Chat Sessions.
+
+    The list carries per-session summaries only; messages are loaded per
+    session from ``SessionMessagesView``.
+    """
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        sessions = ChatSession.objects.filter(user=request.user).order_by('-created_at')
-        data = []
-        for s in sessions:
-            jobs = list(s.jobs.order_by('created_at').values(
-                'id', 'status', 'input_data', 'result', 'cost', 'created_at', 'completed_at'
-            ))
-            # Format jobs slightly
-            formatted_jobs = []
-            for j in jobs:
-                formatted_jobs.append({
-                    "id": j['id'],
-                    "status": j['status'],
-                    "prompt": j['input_data'].get('prompt', ''),
-                    "model": j['input_data'].get('model', ''),
-                    "cost": str(j['cost']) if j['cost'] else None,
-                    "result": j['result'],
-                    "created_at": j['created_at'],
-                    "completed_at": j['completed_at'],
-                })
-            
-            data.append({
-                "id": str(s.id),
-                "name": s.name,
-                "created_at": s.created_at,
-                "jobs": formatted_jobs,
-            })
-        return Response(data)
+        """Return one page of session summaries, newest session first.
+
+        Four queries whatever the page size: the sessions with their job
+        aggregates, the same aggregates over archived jobs, the last message
+        of each, and the models used in each.
+        """
+        last_job = Job.objects.filter(session=OuterRef("pk")).order_by("-created_at", "-id")
+        sessions = ChatSession.objects.filter(user=request.user).annotate(
+            message_count=Count("jobs"),
+            completed_count=Count("jobs", filter=Q(jobs__status="COMPLETED")),
+            total_cost=Sum("jobs__cost"),
+            last_message_at=Max("jobs__created_at"),
+            last_message_id=Subquery(last_job.values("id")[:1]),
+        ).values(
+            "id", "name", "created_at", "message_count", "completed_count",
+            "total_cost", "last_message_at", "last_message_id",
+        )
+        try:
+            rows, next_cursor = keyset_page(
+                sessions, request.query_params.get("cursor"),
+                page_size(request.query_params),
+            )
+        except PaginationError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        session_ids = [r["id"] for r in rows]
+        _add_archived_totals(rows, session_ids)
+
+        preview_fields = ("id", "status", "prompt", "model", "created_at")
+        last_messages = {
+            row["id"]: _job_row(row, preview_fields)
+            for row in Job.objects.filter(
+                id__in=[r["last_message_id"] for r in rows if r["last_message_id"]],
+            ).annotate(**_job_prompt(preview=True)).values(*preview_fields)
+        }
+        models_by_session = {}
+        for row in Job.objects.filter(session_id__in=session_ids).exclude(
+            model="",
+        ).values("session_id", "model").union(
+            ArchivedJob.objects.filter(session_id__in=session_ids).exclude(
+                model="",
+            ).values("session_id", "model"),
+        ):
+            models_by_session.setdefault(row["session_id"], []).append(row["model"])
+
+        data = [{
+            "id": str(r["id"]),
+            "name": r["name"],
+            "created_at": r["created_at"],
+            "message_count": r["message_count"],
+            "completed_count": r["completed_count"],
+            "total_cost": (
+                f'{r["total_cost"]:.2f}' if r["total_cost"] is not None else None
+            ),
+            "models": sorted(models_by_session.get(r["id"], [])),
+            "last_message_at": r["last_message_at"],
+            "last_message": last_messages.get(r["last_message_id"]),
+        } for r in rows]
+        return Response({"results": data, "next": next_cursor})
 
     def post(self, request):
         name = request.data.get("name", "New Chat")
@@ -266,6 +434,57 @@ class SessionListView(views.APIView):
         }, status=status.HTTP_201_CREATED)
 
 
+class SessionMessagesView(ReplicaReadMixin, views.APIView):
+    """Cursor-paginated message history of one chat session.
+
+    Pages run from the newest messages back; ``next`` fetches older ones.
+    Within a page messages are in chronological order, ready to prepend.
+    Offloaded results stay blob references; ``jobs/<id>/result/`` streams them.
+    Archived messages are read through the same cursor and merged in.
+    """
+    permission_classes = [IsAuthenticated]
+
+    MESSAGE_FIELDS = (
+        "id", "session_id", "status", "prompt", "model", "cost",
+        "result", "created_at", "completed_at",
+    )
+
+    def get(self, request, session_id):
+        """Return one page of the session's messages."""
+        if not ChatSession.objects.filter(id=session_id, user=request.user).exists():
+            return Response({"error": "Not found"}, status=status.HTTP_404_NOT_FOUND)
+        jobs = Job.objects.filter(session_id=session_id).annotate(
+            **_job_prompt(),
+        ).values(*self.MESSAGE_FIELDS)
+        archived = ArchivedJob.objects.filter(session_id=session_id)
+        cursor = request.query_params.get("cursor")
+        try:
+            limit = page_size(request.query_params)
+            rows, next_cursor = merge_pages([
+                keyset_page(jobs, cursor, limit), keyset_page(archived, cursor, limit),
+            ], limit)
+        except PaginationError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({
+            "results": [
+                _job_row(
+                    row if isinstance(row, dict) else self._archived_row(row),
+                    self.MESSAGE_FIELDS,
+                )
+                for row in reversed(rows)
+            ],
+            "next": next_cursor,
+        })
+
+    def _archived_row(self, archived):
+        """Return the message fields of an archived job, restored from its payload."""
+        job = archived.to_job()
+        row = {f: getattr(job, f) for f in self.MESSAGE_FIELDS if f != "prompt"}
+        prompt = (job.input_data or {}).get("prompt")
+        row["prompt"] = job.prompt_preview if prompt is None else prompt
+        return row
+
+
 class SessionDetailView(views.APIView):
     """Retrieve, update or delete a specific Chat Session."""
     permission_classes = [IsAuthenticated]
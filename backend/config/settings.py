@@ -74,6 +74,8 @@ INSTALLED_APPS = [
 
 
 MIDDLEWARE = [
+    "core.middleware.RequestLatencyMiddleware",
+    "core.middleware.ReadYourWritesMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware", # For static files in prod
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -144,10 +146,39 @@ ASGI_APPLICATION = "config.asgi.application"
 # Database
 # https://docs.djangoproject.com/en/6.0/ref/settings/#databases
 
+# Threads for consumer database calls; 0 keeps Channels' single thread-sensitive executor
+DB_EXECUTOR_THREADS = int(os.environ.get("DB_EXECUTOR_THREADS", "0"))
+
+# Postgres connection pool (psycopg_pool). Persistent per-thread connections
+# (CONN_MAX_AGE) leak under ASGI, where sync code runs on many short-lived
+# threads; a pool caps the total and hands connections back after each call.
+DB_POOL = os.environ.get("DB_POOL", "True") == "True"
+DB_POOL_MIN_SIZE = int(os.environ.get("DB_POOL_MIN_SIZE", "2"))
+# One connection per consumer DB thread, plus headroom for sync HTTP views
+DB_POOL_MAX_SIZE = int(os.environ.get(
+    "DB_POOL_MAX_SIZE", str(max(DB_EXECUTOR_THREADS, 1) + 4),
+))
+# Seconds a caller waits for a free connection before PoolTimeout
+DB_POOL_TIMEOUT = float(os.environ.get("DB_POOL_TIMEOUT", "10"))
+# Seconds an idle connection above min size is kept
+DB_POOL_MAX_IDLE = float(os.environ.get("DB_POOL_MAX_IDLE", "300"))
+
 if os.environ.get("DATABASE_URL"):
     DATABASES = {
-        "default": dj_database_url.config(conn_max_age=600, ssl_require=True)
+        "default": dj_database_url.config(ssl_require=True, conn_health_checks=True)
     }
+    if DB_POOL and DATABASES["default"]["ENGINE"] == "django.db.backends.postgresql":
+        # Pools require CONN_MAX_AGE=0; CONN_HEALTH_CHECKS makes the pool check
+        # each connection on checkout
+        DATABASES["default"]["CONN_MAX_AGE"] = 0
+        DATABASES["default"].setdefault("OPTIONS", {})["pool"] = {
+            "min_size": DB_POOL_MIN_SIZE,
+            "max_size": DB_POOL_MAX_SIZE,
+            "timeout": DB_POOL_TIMEOUT,
+            "max_idle": DB_POOL_MAX_IDLE,
+        }
+    else:
+        DATABASES["default"]["CONN_MAX_AGE"] = 600
 else:
     DATABASES = {
         "default": {
@@ -156,6 +187,27 @@ else:
         }
     }
 
+# Optional read replica for dashboard and stats reads, e.g.
+# DATABASE_REPLICA_URL=sqlite:///replica.sqlite3 to try it locally with a copy
+# of db.sqlite3. Writes and migrations always use "default".
+DATABASE_REPLICA_URL = os.environ.get("DATABASE_REPLICA_URL")
+if DATABASE_REPLICA_URL:
+    DATABASES["replica"] = dj_database_url.parse(DATABASE_REPLICA_URL)
+    if "pool" in DATABASES["default"].get("OPTIONS", {}) and (
+        DATABASES["replica"]["ENGINE"] == "django.db.backends.postgresql"
+    ):
+        DATABASES["replica"].setdefault("OPTIONS", {})["pool"] = {
+            **DATABASES["default"]["OPTIONS"]["pool"],
+        }
+        DATABASES["replica"]["CONN_HEALTH_CHECKS"] = True
+    # Tests run both aliases against the one test database
+    DATABASES["replica"]["TEST"] = {"MIRROR": "default"}
+
+DATABASE_ROUTERS = ["core.db_router.ReplicaRouter"]
+
+# Seconds a user's reads stay on the primary after they write
+DB_READ_YOUR_WRITES_SECONDS = int(os.environ.get("DB_READ_YOUR_WRITES_SECONDS", "5"))
+
 # Django 6.0 removed sites migrations; allauth still needs them
 MIGRATION_MODULES = {
     "sites": "custom_migrations.sites",
@@ -202,6 +254,15 @@ STORAGES = {
     "staticfiles": {
         "BACKEND": "whitenoise.storage.CompressedManifestStaticFilesStorage",
     },
+    # Large job results (computing/blobs.py); any Django storage backend can replace this
+    "job_results": {
+        "BACKEND": "django.core.files.storage.FileSystemStorage",
+        "OPTIONS": {
+            "location": os.environ.get("JOB_RESULT_BLOB_ROOT", str(BASE_DIR / "blobs")),
+            # Blob names are content hashes, so a rewrite stores the same bytes
+            "allow_overwrite": True,
+        },
+    },
 }
 
 AUTH_USER_MODEL = "core.User"
@@ -222,12 +283,34 @@ if not os.environ.get("CELERY_BROKER_URL"):
     CELERY_TASK_ALWAYS_EAGER = True
     CELERY_TASK_EAGER_PROPAGATES = True
 
+# Finished jobs older than this many days move to the compressed archive; 0 keeps them
+JOB_RETENTION_DAYS = int(os.environ.get("JOB_RETENTION_DAYS", "90"))
+# Jobs archived per transaction
+JOB_ARCHIVE_BATCH_SIZE = int(os.environ.get("JOB_ARCHIVE_BATCH_SIZE", "500"))
+# Job results at least this many bytes of JSON go to the job_results blob store; 0 keeps them inline
+JOB_RESULT_BLOB_THRESHOLD = int(os.environ.get("JOB_RESULT_BLOB_THRESHOLD", "16384"))
+
+# Periodic tasks for celery beat
+CELERY_BEAT_SCHEDULE = {
+    "archive-old-jobs": {
+        "task": "computing.tasks.archive_old_jobs",
+        "schedule": 60 * 60,
+    },
+}
+
 # CHANNELS
 REDIS_URL = os.environ.get("REDIS_URL")
 if REDIS_URL:
+    # Shared so read-your-writes pins hold across worker processes
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+        }
+    }
     CHANNEL_LAYERS = {
         "default": {
-            "BACKEND": "channels_redis.core.RedisChannelLayer",
+            "BACKEND": "core.channel_layers.InstrumentedRedisChannelLayer",
             "CONFIG": {
                 "hosts": [REDIS_URL],
             },
@@ -236,11 +319,18 @@ if REDIS_URL:
 else:
     CHANNEL_LAYERS = {
         "default": {
-            "BACKEND": "channels.layers.InMemoryChannelLayer",
+            "BACKEND": "core.channel_layers.InstrumentedInMemoryChannelLayer",
         }
     }
 
 
+# Prometheus scrape endpoint (/metrics); requires "Authorization: Bearer <token>" when set
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN", "")
+
+# Log event-loop stalls longer than this, with a stack sample; 0 disables the monitor
+LOOP_BLOCK_THRESHOLD_MS = int(os.environ.get("LOOP_BLOCK_THRESHOLD_MS", "0"))
+
+
 # REST FRAMEWORK
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
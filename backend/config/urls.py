@@ -2,6 +2,8 @@
 from django.contrib import admin
 from django.urls import path, include
 
+from core.views import metrics_view
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/core/', include('core.urls')),
@@ -11,4 +13,6 @@ urlpatterns = [
     path('accounts/', include('allauth.urls')),
     # Custom OAuth callback to issue JWT tokens
     path('api/auth/oauth/callback/', include('core.oauth_urls')),
+    # Prometheus scrape target
+    path('metrics', metrics_view, name='metrics'),
 ]
@@ -0,0 +1,27 @@
+"""Channel layers that record ``group_send`` latency."""
+import time
+
+from channels.layers import InMemoryChannelLayer
+from channels_redis.core import RedisChannelLayer
+
+from .metrics import GROUP_SEND_LATENCY
+
+
+class GroupSendTimingMixin:
+    """Observe the duration of every ``group_send`` on the layer."""
+
+    async def group_send(self, group, message):
+        """Send to a group, timing the call."""
+        start = time.perf_counter()
+        try:
+            return await super().group_send(group, message)
+        finally:
+            GROUP_SEND_LATENCY.observe(time.perf_counter() - start)
+
+
+class InstrumentedInMemoryChannelLayer(GroupSendTimingMixin, InMemoryChannelLayer):
+    """In-memory layer (development, tests) with group_send timing."""
+
+
+class InstrumentedRedisChannelLayer(GroupSendTimingMixin, RedisChannelLayer):
+    """Redis layer (production) with group_send timing."""
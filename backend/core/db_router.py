@@ -0,0 +1,96 @@
+"""Route designated read-only queries to a read replica.
+
+Reads go to the ``replica`` alias only inside :func:`read_from_replica`
+(or a view using :class:`ReplicaReadMixin`), and only when that alias is
+configured. Everything else, including every write, uses ``default``.
+
+A user who has just written is pinned to the primary for
+``DB_READ_YOUR_WRITES_SECONDS`` so their next page load cannot miss the
+write because of replication lag. The pin lives in the cache so it holds
+across processes when a shared cache is configured.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.permissions import SAFE_METHODS
+
+REPLICA_ALIAS = "replica"
+
+_use_replica = ContextVar("use_replica", default=False)
+
+
+def replica_configured():
+    """Return True when a replica database alias is configured."""
+    return REPLICA_ALIAS in settings.DATABASES
+
+
+def _pin_key(user_id):
+    return f"db:primary_pin:{user_id}"
+
+
+def mark_written(*user_ids):
+    """Pin the given users' reads to the primary for the read-your-writes window."""
+    window = settings.DB_READ_YOUR_WRITES_SECONDS
+    if not replica_configured() or window <= 0:
+        return
+    cache.set_many({_pin_key(uid): 1 for uid in user_ids if uid is not None}, window)
+
+
+def recently_wrote(user_id):
+    """Return True if ``user_id`` wrote within the read-your-writes window."""
+    return user_id is not None and cache.get(_pin_key(user_id)) is not None
+
+
+def replica_reads_active():
+    """Return True if reads in the current context go to the replica."""
+    return _use_replica.get()
+
+
+@contextmanager
+def read_from_replica(user_id=None):
+    """Send reads in this block to the replica unless ``user_id`` is pinned."""
+    token = _use_replica.set(replica_configured() and not recently_wrote(user_id))
+    try:
+        yield
+    finally:
+        _use_replica.reset(token)
+
+
+class ReplicaReadMixin:
+    """Serve a DRF view's GET/HEAD/OPTIONS requests from the replica."""
+
+    def dispatch(self, request, *args, **kwargs):
+        """Run the request with replica routing reset afterwards."""
+        token = _use_replica.set(False)
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        finally:
+            _use_replica.reset(token)
+
+    def initial(self, request, *args, **kwargs):
+        """Switch to the replica once the user is authenticated."""
+        super().initial(request, *args, **kwargs)
+        if request.method in SAFE_METHODS and replica_configured():
+            _use_replica.set(not recently_wrote(request.user.pk))
+
+
+class ReplicaRouter:
+    """Database router for the optional ``replica`` alias."""
+
+    def db_for_read(self, model, **hints):  # pylint: disable=unused-argument
+        """Use the replica inside a replica-read context."""
+        return REPLICA_ALIAS if _use_replica.get() else None
+
+    def db_for_write(self, model, **hints):  # pylint: disable=unused-argument
+        """Always write to the primary."""
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):  # pylint: disable=unused-argument
+        """The replica holds the same data, so relations across it are fine."""
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):  # pylint: disable=unused-argument
+        """Only migrate the primary; the replica follows by replication."""
+        return db != REPLICA_ALIAS
@@ -0,0 +1,61 @@
+"""Instrumented ``database_sync_to_async`` for Channels consumers.
+
+By default calls run like Channels' own helper: on the single
+thread-sensitive executor shared with the rest of the ASGI app. Setting
+``DB_EXECUTOR_THREADS`` moves them to a dedicated pool of that many
+threads instead, so independent queries no longer serialize behind each
+other.
+"""
+import functools
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from channels.db import DatabaseSyncToAsync
+from django.conf import settings
+
+from .metrics import DB_EXECUTOR_QUEUE_WAIT, DB_EXECUTOR_RUN_TIME
+
+# Dedicated DB thread pools by size, created on first use
+_EXECUTORS = {}
+
+
+def get_executor():
+    """Return the dedicated DB thread pool, or None when it is disabled."""
+    threads = settings.DB_EXECUTOR_THREADS
+    if threads <= 0:
+        return None
+    if threads not in _EXECUTORS:
+        _EXECUTORS[threads] = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="db")
+    return _EXECUTORS[threads]
+
+
+def database_sync_to_async(func):
+    """Drop-in for ``channels.db.database_sync_to_async`` that records, per
+    function, how long each call waits for an executor thread and how long
+    it then runs.
+
+    Works on plain functions and on methods.
+    """
+    name = func.__qualname__
+    queue_wait = DB_EXECUTOR_QUEUE_WAIT.labels(name)
+    run_time = DB_EXECUTOR_RUN_TIME.labels(name)
+
+    def timed(queued_at, *args, **kwargs):
+        started = time.perf_counter()
+        queue_wait.observe(started - queued_at)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            run_time.observe(time.perf_counter() - started)
+
+    executor = get_executor()
+    if executor is None:
+        runner = DatabaseSyncToAsync(timed)
+    else:
+        runner = DatabaseSyncToAsync(timed, thread_sensitive=False, executor=executor)
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        return await runner(time.perf_counter(), *args, **kwargs)
+
+    return wrapper
@@ -0,0 +1,92 @@
+"""Detect callbacks that block the asyncio event loop."""
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+
+from django.conf import settings
+
+from .metrics import EVENT_LOOP_BLOCKED
+
+logger = logging.getLogger(__name__)
+
+
+class LoopMonitor:
+    """Watchdog for one event loop.
+
+    A callback on the loop records a heartbeat every ``threshold / 2``
+    seconds. A daemon thread checks the heartbeat; if it is overdue by more
+    than ``threshold`` the loop is stuck in a callback, and the thread logs
+    a stack sample of the loop thread while it is still blocked. Once the
+    loop recovers, the stall's length is observed in ``EVENT_LOOP_BLOCKED``.
+    """
+
+    def __init__(self, threshold):
+        self.threshold = threshold
+        self._loop = None
+        self._loop_thread_id = None
+        self._last_tick = 0.0
+        self._stop = threading.Event()
+        self._thread = None
+        self.stalls = 0
+
+    @property
+    def interval(self):
+        """Seconds between heartbeats."""
+        return self.threshold / 2
+
+    def ensure_running(self):
+        """Start watching the running loop unless already doing so."""
+        if self.threshold <= 0:
+            return
+        loop = asyncio.get_running_loop()
+        if loop is self._loop and self._thread is not None and self._thread.is_alive():
+            return
+        self.stop()
+        self._loop = loop
+        self._loop_thread_id = threading.get_ident()
+        self._last_tick = time.monotonic()
+        self._stop = threading.Event()
+        loop.call_later(self.interval, self._tick, self._stop)
+        self._thread = threading.Thread(
+            target=self._watch, args=(self._stop,), name="loop-monitor", daemon=True,
+        )
+        self._thread.start()
+
+    def stop(self):
+        """Stop the heartbeat and the watchdog thread."""
+        self._stop.set()
+
+    def _tick(self, stop):
+        now = time.monotonic()
+        blocked = now - self._last_tick - self.interval
+        self._last_tick = now
+        if blocked > self.threshold:
+            EVENT_LOOP_BLOCKED.observe(blocked)
+            logger.warning("Event loop was blocked for %.0f ms", blocked * 1000)
+        if not stop.is_set():
+            asyncio.get_running_loop().call_later(self.interval, self._tick, stop)
+
+    def _watch(self, stop):
+        reported = None
+        while not stop.wait(self.interval / 2):
+            if self._loop.is_closed():
+                return
+            last_tick = self._last_tick
+            overdue = time.monotonic() - last_tick - self.interval
+            if overdue <= self.threshold or reported == last_tick:
+                continue
+            # Report each stall once, with what the loop thread is running now
+            reported = last_tick
+            self.stalls += 1
+            frame = sys._current_frames().get(self._loop_thread_id)  # pylint: disable=protected-access
+            stack = "".join(traceback.format_stack(frame)) if frame else "<unavailable>"
+            logger.warning(
+                "Event loop blocked for over %.0f ms; loop thread stack:\n%s",
+                overdue * 1000, stack,
+            )
+
+
+loop_monitor = LoopMonitor(settings.LOOP_BLOCK_THRESHOLD_MS / 1000)
@@ -0,0 +1,328 @@
+"""In-process metrics registry with Prometheus text exposition.
+
+Counters, gauges and histograms are plain Python numbers updated in place:
+no locks, and no allocation once a label set has been seen. Updates happen
+on the event loop or under the GIL, which is accurate enough for
+monitoring. Each metric caps its number of label sets so user-supplied
+values (model names) cannot grow memory without bound; extra label sets
+are folded into ``"other"``.
+"""
+import bisect
+import math
+
+# Seconds; covers fast DB round-trips up to long inference jobs
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+# Label sets kept per metric before new ones are folded into "other"
+MAX_SERIES = 200
+OVERFLOW_LABEL = "other"
+
+
+class _CounterChild:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, amount=1):
+        """Add ``amount`` to the counter."""
+        self.value += amount
+
+
+class _GaugeChild(_CounterChild):
+    __slots__ = ()
+
+    def dec(self, amount=1):
+        """Subtract ``amount`` from the gauge."""
+        self.value -= amount
+
+    def set(self, value):
+        """Set the gauge to ``value``."""
+        self.value = value
+
+
+class _HistogramChild:
+    __slots__ = ("bounds", "counts", "sum")
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+
+    def observe(self, value):
+        """Record one observation."""
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+
+class _Metric:
+    """A named metric family with optional labels."""
+    kind = ""
+
+    def __init__(self, name, documentation, labelnames=(), registry=None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children = {}
+        if not self.labelnames:
+            self._default = self._children[()] = self._new_child()
+        (registry if registry is not None else REGISTRY).register(self)
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, *values):
+        """Return the child for the given label values, creating it once."""
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}")
+            if len(self._children) >= MAX_SERIES:
+                values = (OVERFLOW_LABEL,) * len(values)
+                child = self._children.get(values)
+            if child is None:
+                child = self._children[values] = self._new_child()
+        return child
+
+    def _label_str(self, values, extra=()):
+        pairs = list(zip(self.labelnames, values)) + list(extra)
+        if not pairs:
+            return ""
+        body = ",".join(f'{k}="{_escape(str(v))}"' for k, v in pairs)
+        return "{" + body + "}"
+
+    def _samples(self):
+        for values, child in list(self._children.items()):
+            yield f"{self.name}{self._label_str(values)} {_format(child.value)}"
+
+    def expose(self):
+        """Return the metric family in Prometheus text format."""
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+        lines.extend(self._samples())
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    """Monotonically increasing count."""
+    kind = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount=1):
+        """Increment the unlabelled counter."""
+        self._default.value += amount
+
+
+class Gauge(_Metric):
+    """Value that can go up and down."""
+    kind = "gauge"
+
+    def _new_child(self):
+        return _GaugeChild()
+
+    def inc(self, amount=1):
+        """Increment the unlabelled gauge."""
+        self._default.value += amount
+
+    def dec(self, amount=1):
+        """Decrement the unlabelled gauge."""
+        self._default.value -= amount
+
+    def set(self, value):
+        """Set the unlabelled gauge."""
+        self._default.value = value
+
+
+class Histogram(_Metric):
+    """Bucketed distribution of observed values."""
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS,
+                 registry=None):
+        self.bounds = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames, registry)
+
+    def _new_child(self):
+        return _HistogramChild(self.bounds)
+
+    def observe(self, value):
+        """Record an observation on the unlabelled histogram."""
+        self._default.observe(value)
+
+    def _samples(self):
+        for values, child in list(self._children.items()):
+            cumulative = 0
+            for bound, count in zip(self.bounds + (math.inf,), child.counts):
+                cumulative += count
+                le = self._label_str(values, (("le", _format(bound)),))
+                yield f"{self.name}_bucket{le} {cumulative}"
+            labels = self._label_str(values)
+            yield f"{self.name}_sum{labels} {_format(child.sum)}"
+            yield f"{self.name}_count{labels} {cumulative}"
+
+
+class Registry:
+    """Collection of metric families rendered together."""
+
+    def __init__(self):
+        self._metrics = {}
+        self._collectors = []
+
+    def register(self, metric):
+        """Add a metric family; names must be unique."""
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} already registered")
+        self._metrics[metric.name] = metric
+
+    def add_collector(self, collector):
+        """Call ``collector()`` before each render to refresh sampled values."""
+        self._collectors.append(collector)
+
+    def get(self, name):
+        """Return a registered metric family by name, or None."""
+        return self._metrics.get(name)
+
+    def render(self):
+        """Return every metric in Prometheus text exposition format."""
+        for collector in self._collectors:
+            collector()
+        return "\n".join(m.expose() for m in self._metrics.values()) + "\n"
+
+
+def _escape(value):
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format(value):
+    if value == math.inf:
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return repr(value)
+    return str(value)
+
+
+REGISTRY = Registry()
+
+# --- Application metrics ---
+
+GPU_CONSUMERS = Gauge(
+    "gpuconnect_gpu_consumers_connected", "Open GPU agent WebSocket connections.",
+)
+DASHBOARD_CONSUMERS = Gauge(
+    "gpuconnect_dashboard_consumers_connected", "Open dashboard WebSocket connections.",
+)
+JOBS_SUBMITTED = Counter(
+    "gpuconnect_jobs_submitted_total", "Jobs submitted, by model.", ("model",),
+)
+JOBS_COMPLETED = Counter(
+    "gpuconnect_jobs_completed_total", "Jobs completed successfully, by model.", ("model",),
+)
+JOBS_FAILED = Counter(
+    "gpuconnect_jobs_failed_total", "Jobs that failed, by model.", ("model",),
+)
+JOB_LATENCY = Histogram(
+    "gpuconnect_job_latency_seconds",
+    "Time from dispatch to the node's final result, by model.", ("model",),
+)
+JOB_FIRST_TOKEN = Histogram(
+    "gpuconnect_job_first_token_seconds",
+    "Time from dispatch to the first streamed chunk, by model.", ("model",),
+)
+GROUP_SEND_LATENCY = Histogram(
+    "gpuconnect_channel_layer_group_send_seconds",
+    "Duration of channel-layer group_send calls.",
+)
+DB_EXECUTOR_QUEUE_WAIT = Histogram(
+    "gpuconnect_db_executor_queue_wait_seconds",
+    "Time database_sync_to_async calls wait for an executor thread, by function.",
+    ("function",),
+)
+DB_EXECUTOR_RUN_TIME = Histogram(
+    "gpuconnect_db_executor_run_seconds",
+    "Time database_sync_to_async calls spend running on the thread, by function.",
+    ("function",),
+)
+EVENT_LOOP_BLOCKED = Histogram(
+    "gpuconnect_event_loop_blocked_seconds",
+    "Stalls of the asyncio event loop longer than the detection threshold.",
+)
+DB_POOL_SIZE = Gauge(
+    "gpuconnect_db_pool_connections",
+    "Connections open in the database pool, by alias.", ("alias",),
+)
+DB_POOL_AVAILABLE = Gauge(
+    "gpuconnect_db_pool_connections_available",
+    "Idle connections in the database pool, by alias.", ("alias",),
+)
+DB_POOL_MAX = Gauge(
+    "gpuconnect_db_pool_connections_max",
+    "Configured maximum size of the database pool, by alias.", ("alias",),
+)
+DB_POOL_WAITING = Gauge(
+    "gpuconnect_db_pool_requests_waiting",
+    "Callers currently waiting for a pooled connection, by alias.", ("alias",),
+)
+DB_POOL_QUEUED = Counter(
+    "gpuconnect_db_pool_requests_queued_total",
+    "Connection requests that had to wait because the pool was exhausted.", ("alias",),
+)
+DB_POOL_WAIT_TIME = Counter(
+    "gpuconnect_db_pool_request_wait_seconds_total",
+    "Total time callers spent waiting for a pooled connection.", ("alias",),
+)
+DB_POOL_TIMEOUTS = Counter(
+    "gpuconnect_db_pool_request_errors_total",
+    "Connection requests that timed out or failed, by alias.", ("alias",),
+)
+OUTBOUND_QUEUED = Gauge(
+    "gpuconnect_outbound_queue_messages",
+    "Messages waiting in dashboard outbound queues, across connections.",
+)
+OUTBOUND_QUEUE_DEPTH = Histogram(
+    "gpuconnect_outbound_queue_depth",
+    "Depth of a dashboard connection's outbound queue after each enqueue.",
+    buckets=(1, 5, 10, 25, 50, 100, 250, 500),
+)
+OUTBOUND_COALESCED = Counter(
+    "gpuconnect_outbound_messages_coalesced_total",
+    "Dashboard messages folded into one already queued.",
+)
+OUTBOUND_SENT = Counter(
+    "gpuconnect_outbound_messages_sent_total",
+    "Dashboard messages written from outbound queues.",
+)
+OUTBOUND_OVERFLOWS = Counter(
+    "gpuconnect_outbound_queue_overflows_total",
+    "Dashboard connections dropped because their outbound queue was full.",
+)
+HTTP_REQUEST_LATENCY = Histogram(
+    "gpuconnect_http_request_seconds",
+    "HTTP request latency, by URL name and method.", ("view", "method"),
+)
+
+
+def record_pool_stats(alias, pool):
+    """Copy a psycopg_pool ``get_stats()`` snapshot into the pool metrics."""
+    stats = pool.get_stats()
+    DB_POOL_SIZE.labels(alias).set(stats.get("pool_size", 0))
+    DB_POOL_AVAILABLE.labels(alias).set(stats.get("pool_available", 0))
+    DB_POOL_MAX.labels(alias).set(stats.get("pool_max", 0))
+    DB_POOL_WAITING.labels(alias).set(stats.get("requests_waiting", 0))
+    # The pool keeps these as running totals since it opened
+    DB_POOL_QUEUED.labels(alias).value = stats.get("requests_queued", 0)
+    DB_POOL_WAIT_TIME.labels(alias).value = stats.get("requests_wait_ms", 0) / 1000
+    DB_POOL_TIMEOUTS.labels(alias).value = stats.get("requests_errors", 0)
+
+
+def _collect_db_pools():
+    from django.db import connections  # pylint: disable=import-outside-toplevel
+    for alias in connections:
+        pool = getattr(connections[alias], "pool", None)
+        if pool is not None:
+            record_pool_stats(alias, pool)
+
+
+REGISTRY.add_collector(_collect_db_pools)
@@ -0,0 +1,45 @@
+"""HTTP middleware for request metrics and replica read-your-writes."""
+import time
+
+from rest_framework.permissions import SAFE_METHODS
+
+from .db_router import mark_written
+from .metrics import HTTP_REQUEST_LATENCY
+
+
+class RequestLatencyMiddleware:
+    """Record request latency labelled by resolved URL name and method.
+
+    Using the URL name rather than the path keeps the label set bounded.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        start = time.perf_counter()
+        response = self.get_response(request)
+        match = request.resolver_match
+        view = (match.view_name or match.route) if match else "unmatched"
+        HTTP_REQUEST_LATENCY.labels(view, request.method).observe(
+            time.perf_counter() - start
+        )
+        return response
+
+
+class ReadYourWritesMiddleware:
+    """Pin a user's reads to the primary after a successful write request.
+
+    Runs after the view, when DRF has set ``request.user`` from the token.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if request.method not in SAFE_METHODS and response.status_code < 400:
+            user = getattr(request, "user", None)
+            if user is not None and user.is_authenticated:
+                mark_written(user.pk)
+        return response
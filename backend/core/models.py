@@ -1,10 +1,16 @@
 """Core models — custom User and AgentToken for GPU provider auth."""
 import hashlib
 import secrets
+import threading
 from decimal import Decimal
 
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.utils import timezone
+
+# Token IDs validated since the last write-behind flush of last_used
+_pending_last_used = set()
+_pending_last_used_lock = threading.Lock()
 
 
 class User(AbstractUser):
@@ -63,19 +69,46 @@ class AgentToken(models.Model):
         )
         return agent_token, raw_token
 
+    @staticmethod
+    def revocation_group(token_hash: str) -> str:
+        """Channel-layer group notified when the token with this hash is revoked."""
+        return f"agent_token_{token_hash}"
+
     @classmethod
-    def validate(cls, raw_token: str):
-        """Validate a raw token. Returns the AgentToken or None."""
+    def validate(cls, raw_token: str, touch: bool = True):
+        """Validate a raw token. Returns the AgentToken or None.
+
+        With ``touch=False`` the ``last_used`` write is deferred to the
+        write-behind buffer drained by ``flush_last_used``.
+        """
         token_hash = cls.hash_token(raw_token)
         try:
             token = cls.objects.select_related('user').get(
                 token_hash=token_hash,
                 is_active=True
             )
-            # Update last_used
-            from django.utils import timezone  # pylint: disable=import-outside-toplevel
-            token.last_used = timezone.now()
-            token.save(update_fields=['last_used'])
-            return token
         except cls.DoesNotExist:
             return None
+
+        if touch:
+            token.last_used = timezone.now()
+            token.save(update_fields=['last_used'])
+        else:
+            cls.defer_last_used([token.id])
+        return token
+
+    @classmethod
+    def defer_last_used(cls, token_ids):
+        """Queue tokens for the next ``flush_last_used``."""
+        with _pending_last_used_lock:
+            _pending_last_used.update(token_ids)
+
+    @classmethod
+    def flush_last_used(cls) -> int:
+        """Write deferred last_used timestamps in one UPDATE; return rows updated."""
+        with _pending_last_used_lock:
+            if not _pending_last_used:
+                return 0
+            token_ids = list(_pending_last_used)
+            _pending_last_used.clear()
+        return cls.objects.filter(id__in=token_ids).update(last_used=timezone.now())
@@ -0,0 +1,115 @@
+"""Tests for replica routing and read-your-writes pinning."""
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from rest_framework import views
+from rest_framework.response import Response
+from rest_framework.test import APIClient, APIRequestFactory, force_authenticate
+
+from computing.models import Job
+from core import db_router
+
+User = get_user_model()
+
+
+class _ProbeView(db_router.ReplicaReadMixin, views.APIView):
+    """Reports whether its handler ran with replica reads enabled."""
+
+    def get(self, _request):  # pylint: disable=missing-function-docstring
+        return Response({"replica": db_router.replica_reads_active()})
+
+    def post(self, _request):  # pylint: disable=missing-function-docstring
+        return Response({"replica": db_router.replica_reads_active()})
+
+
+@pytest.fixture
+def replica(monkeypatch):
+    """Behave as if a replica alias were configured."""
+    monkeypatch.setattr(db_router, "replica_configured", lambda: True)
+    cache.clear()
+    yield
+    cache.clear()
+
+
+class TestReplicaRouter:
+    """Alias selection."""
+
+    def setup_method(self):
+        self.router = db_router.ReplicaRouter()
+
+    @pytest.mark.usefixtures("replica")
+    def test_reads_use_default_outside_replica_block(self):
+        assert self.router.db_for_read(Job) is None
+
+    @pytest.mark.usefixtures("replica")
+    def test_reads_use_replica_inside_block(self):
+        with db_router.read_from_replica(user_id=1):
+            assert self.router.db_for_read(Job) == "replica"
+            assert self.router.db_for_write(Job) == "default"
+        assert self.router.db_for_read(Job) is None
+
+    @pytest.mark.usefixtures("replica")
+    def test_recent_writer_pinned_to_primary(self, settings):
+        settings.DB_READ_YOUR_WRITES_SECONDS = 30
+        db_router.mark_written(1)
+        with db_router.read_from_replica(user_id=1):
+            assert self.router.db_for_read(Job) is None
+        with db_router.read_from_replica(user_id=2):
+            assert self.router.db_for_read(Job) == "replica"
+
+    def test_no_replica_configured_reads_stay_on_default(self):
+        with db_router.read_from_replica(user_id=1):
+            assert self.router.db_for_read(Job) is None
+
+    def test_replica_never_migrated(self):
+        assert self.router.allow_migrate("default", "computing") is True
+        assert self.router.allow_migrate("replica", "computing") is False
+
+
+@pytest.mark.django_db
+class TestReplicaReadMixin:
+    """Views opt in to replica reads for safe methods."""
+
+    def setup_method(self):
+        self.factory = APIRequestFactory()
+        self.user = User.objects.create_user(username="reader", password="p")
+
+    def _call(self, method):
+        request = getattr(self.factory, method)("/probe/")
+        force_authenticate(request, user=self.user)
+        return _ProbeView.as_view()(request).data["replica"]
+
+    @pytest.mark.usefixtures("replica")
+    def test_get_reads_from_replica(self):
+        assert self._call("get") is True
+        assert db_router.replica_reads_active() is False
+
+    @pytest.mark.usefixtures("replica")
+    def test_post_stays_on_primary(self):
+        assert self._call("post") is False
+
+    @pytest.mark.usefixtures("replica")
+    def test_pinned_user_reads_from_primary(self):
+        db_router.mark_written(self.user.pk)
+        assert self._call("get") is False
+
+
+@pytest.mark.django_db
+class TestReadYourWritesMiddleware:
+    """Successful writes pin the user."""
+
+    @pytest.mark.usefixtures("replica")
+    def test_write_request_pins_user(self):
+        user = User.objects.create_user(username="writer", password="p")
+        client = APIClient()
+        client.force_authenticate(user=user)
+        assert client.post("/api/computing/sessions/", {"name": "x"}).status_code == 201
+        assert db_router.recently_wrote(user.pk)
+
+    @pytest.mark.usefixtures("replica")
+    def test_read_request_does_not_pin(self):
+        user = User.objects.create_user(username="looker", password="p")
+        client = APIClient()
+        client.force_authenticate(user=user)
+        client.get("/api/core/health/")
+        assert not db_router.recently_wrote(user.pk)
@@ -0,0 +1,181 @@
+"""Tests for the metrics registry, instrumentation hooks and /metrics."""
+import asyncio
+import logging
+import time
+
+import pytest
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from core import executor, metrics
+from core.executor import database_sync_to_async
+from core.loop_monitor import LoopMonitor
+
+
+def _registry():
+    return metrics.Registry()
+
+
+class TestMetricTypes:
+    """Counter, gauge and histogram exposition."""
+
+    def test_counter_with_labels(self):
+        registry = _registry()
+        jobs = metrics.Counter("t_jobs_total", "Jobs.", ("model",), registry=registry)
+        jobs.labels("llama3").inc()
+        jobs.labels("llama3").inc(2)
+        text = registry.render()
+        assert "# TYPE t_jobs_total counter" in text
+        assert 't_jobs_total{model="llama3"} 3' in text
+
+    def test_gauge_up_and_down(self):
+        registry = _registry()
+        conns = metrics.Gauge("t_conns", "Connections.", registry=registry)
+        conns.inc()
+        conns.inc()
+        conns.dec()
+        assert "t_conns 1" in registry.render()
+
+    def test_histogram_buckets_are_cumulative(self):
+        registry = _registry()
+        latency = metrics.Histogram("t_seconds", "Latency.", buckets=(1, 5), registry=registry)
+        for value in (0.5, 2, 7):
+            latency.observe(value)
+        text = registry.render()
+        assert 't_seconds_bucket{le="1"} 1' in text
+        assert 't_seconds_bucket{le="5"} 2' in text
+        assert 't_seconds_bucket{le="+Inf"} 3' in text
+        assert "t_seconds_sum 9.5" in text
+        assert "t_seconds_count 3" in text
+
+    def test_label_values_are_escaped(self):
+        registry = _registry()
+        jobs = metrics.Counter("t_esc_total", "Jobs.", ("model",), registry=registry)
+        jobs.labels('a"b').inc()
+        assert 't_esc_total{model="a\\"b"} 1' in registry.render()
+
+    def test_label_sets_are_capped(self, monkeypatch):
+        monkeypatch.setattr(metrics, "MAX_SERIES", 2)
+        registry = _registry()
+        jobs = metrics.Counter("t_cap_total", "Jobs.", ("model",), registry=registry)
+        for name in ("a", "b", "c", "d"):
+            jobs.labels(name).inc()
+        text = registry.render()
+        assert 't_cap_total{model="other"} 2' in text
+        assert 'model="c"' not in text
+
+    def test_collectors_run_before_render(self):
+        registry = _registry()
+        conns = metrics.Gauge("t_sampled", "Sampled.", registry=registry)
+        registry.add_collector(lambda: conns.set(7))
+        assert "t_sampled 7" in registry.render()
+
+    def test_pool_stats_recorded(self):
+        from psycopg_pool import ConnectionPool
+        pool = ConnectionPool("", open=False, min_size=0, max_size=6)
+        metrics.record_pool_stats("t_pool", pool)
+        text = metrics.REGISTRY.render()
+        assert 'gpuconnect_db_pool_connections_max{alias="t_pool"} 6' in text
+        assert 'gpuconnect_db_pool_requests_waiting{alias="t_pool"} 0' in text
+
+    def test_duplicate_names_rejected(self):
+        registry = _registry()
+        metrics.Counter("t_dup_total", "Jobs.", registry=registry)
+        with pytest.raises(ValueError):
+            metrics.Counter("t_dup_total", "Jobs.", registry=registry)
+
+
+@pytest.mark.asyncio
+class TestInstrumentation:
+    """Channel-layer and executor hooks feed the shared registry."""
+
+    async def test_group_send_latency_recorded(self):
+        from channels.layers import get_channel_layer
+        child = metrics.GROUP_SEND_LATENCY.labels()
+        before = sum(child.counts)
+        await get_channel_layer().group_send("metrics_test", {"type": "noop"})
+        assert sum(child.counts) == before + 1
+
+    @pytest.mark.django_db(transaction=True)
+    async def test_database_sync_to_async_records_queue_wait_and_run_time(self):
+        def add(a, b):
+            time.sleep(0.01)
+            return a + b
+
+        wrapped = database_sync_to_async(add)
+        queue_wait = metrics.DB_EXECUTOR_QUEUE_WAIT.labels(add.__qualname__)
+        run_time = metrics.DB_EXECUTOR_RUN_TIME.labels(add.__qualname__)
+        before = sum(queue_wait.counts)
+
+        assert await wrapped(1, 2) == 3
+        assert sum(queue_wait.counts) == before + 1
+        assert sum(run_time.counts) == before + 1
+        assert run_time.sum >= 0.01
+
+    @pytest.mark.django_db(transaction=True)
+    async def test_dedicated_pool_runs_calls_concurrently(self, settings, monkeypatch):
+        settings.DB_EXECUTOR_THREADS = 2
+        monkeypatch.setattr(executor, "_EXECUTORS", {})
+
+        @database_sync_to_async
+        def slow():
+            time.sleep(0.2)
+
+        started = time.perf_counter()
+        await asyncio.gather(slow(), slow())
+        assert time.perf_counter() - started < 0.35
+        executor.get_executor().shutdown()
+
+
+@pytest.mark.asyncio
+class TestLoopMonitor:
+    """Stalls of the event loop are detected and sampled."""
+
+    async def test_blocking_callback_logged_with_stack(self, caplog):
+        monitor = LoopMonitor(0.05)
+        child = metrics.EVENT_LOOP_BLOCKED.labels()
+        before = sum(child.counts)
+        monitor.ensure_running()
+        try:
+            await asyncio.sleep(0.1)
+            with caplog.at_level(logging.WARNING, logger="core.loop_monitor"):
+                time.sleep(0.3)  # block the loop
+                await asyncio.sleep(0.1)
+        finally:
+            monitor.stop()
+        assert monitor.stalls == 1
+        assert "test_blocking_callback_logged_with_stack" in caplog.text
+        assert sum(child.counts) == before + 1
+
+    async def test_disabled_when_threshold_is_zero(self):
+        monitor = LoopMonitor(0)
+        monitor.ensure_running()
+        assert monitor._thread is None  # pylint: disable=protected-access
+
+
+@pytest.mark.django_db
+class TestMetricsEndpoint:
+    """GET /metrics"""
+
+    def setup_method(self):
+        self.client = APIClient()
+
+    def test_metrics_exposed(self):  # pylint: disable=missing-function-docstring
+        resp = self.client.get(reverse('metrics'))
+        assert resp.status_code == 200
+        assert resp['Content-Type'].startswith("text/plain; version=0.0.4")
+        body = resp.content.decode()
+        assert "gpuconnect_gpu_consumers_connected" in body
+        assert "gpuconnect_http_request_seconds" in body
+
+    def test_request_latency_labelled_by_url_name(self):  # pylint: disable=missing-function-docstring
+        self.client.get(reverse('metrics'))
+        body = self.client.get(reverse('metrics')).content.decode()
+        assert 'gpuconnect_http_request_seconds_count{view="metrics",method="GET"}' in body
+
+    @override_settings(METRICS_TOKEN="s3cret")
+    def test_token_required_when_configured(self):  # pylint: disable=missing-function-docstring
+        assert self.client.get(reverse('metrics')).status_code == 401
+        resp = self.client.get(reverse('metrics'), HTTP_AUTHORIZATION="Bearer s3cret")
+        assert resp.status_code == 200
@@ -69,6 +69,24 @@ class TestAgentToken:
         assert result.user == self.user
         assert result.last_used is not None
 
+    def test_validate_without_touch_defers_last_used(self):
+        """validate(touch=False) leaves last_used to flush_last_used()."""
+        agent_token, raw = AgentToken.generate(self.user)
+        assert AgentToken.validate(raw, touch=False) is not None
+        agent_token.refresh_from_db()
+        assert agent_token.last_used is None
+
+        assert AgentToken.flush_last_used() == 1
+        agent_token.refresh_from_db()
+        assert agent_token.last_used is not None
+        assert AgentToken.flush_last_used() == 0
+
+    def test_revocation_group_is_per_token(self):
+        """Each token hash maps to its own revocation group."""
+        group = AgentToken.revocation_group(AgentToken.hash_token("gpc_a"))
+        assert group.startswith("agent_token_")
+        assert group != AgentToken.revocation_group(AgentToken.hash_token("gpc_b"))
+
     def test_validate_returns_none_for_invalid(self):
         """validate() returns None for invalid token."""
         result = AgentToken.validate("gpc_doesnotexist123")
@@ -206,6 +206,36 @@ class AgentTokenRevokeViewTests(TestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data['status'], 'revoked')
 
+    def test_revoke_pushes_revocation_event(self):
+        """Revoking publishes token_revoked to the token's group."""
+        from unittest.mock import AsyncMock, MagicMock, patch
+        from core.models import AgentToken
+        token = AgentToken.objects.get(id=self.token_id)
+        with patch("core.views.get_channel_layer") as mock_cl:
+            mock_layer = MagicMock()
+            mock_layer.group_send = AsyncMock()
+            mock_cl.return_value = mock_layer
+            self.client.post(f'/api/core/agent-token/{self.token_id}/revoke/')
+        mock_layer.group_send.assert_awaited_once_with(
+            AgentToken.revocation_group(token.token_hash),
+            {"type": "token_revoked"},
+        )
+
+    def test_revoke_survives_channel_layer_failure(self):
+        """A failed broadcast still revokes the token and returns 200."""
+        from unittest.mock import AsyncMock, MagicMock, patch
+        from core.models import AgentToken
+        with patch("core.views.get_channel_layer") as mock_cl:
+            mock_layer = MagicMock()
+            mock_layer.group_send = AsyncMock(side_effect=ConnectionError("redis down"))
+            mock_cl.return_value = mock_layer
+            with self.assertLogs("core.views", level="ERROR"):
+                response = self.client.post(
+                    f'/api/core/agent-token/{self.token_id}/revoke/',
+                )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(AgentToken.objects.get(id=self.token_id).is_active)
+
     def test_revoke_nonexistent_token(self):
         """Revoking a nonexistent token returns 404."""
         response = self.client.post(
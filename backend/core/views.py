@@ -1,12 +1,21 @@
 """Views for the core module — registration, profiles, and agent tokens."""
+import logging
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.http import HttpResponse
+from django.utils.crypto import constant_time_compare
 from django.utils import timezone
 from rest_framework import generics, permissions, views, status
 from rest_framework.response import Response
 
+from .metrics import REGISTRY
 from .models import AgentToken
 from .serializers import RegisterSerializer, UserSerializer
 
+logger = logging.getLogger(__name__)
 User = get_user_model()
 
 class RegisterView(generics.CreateAPIView):
@@ -77,14 +86,23 @@ class AgentTokenRevokeView(views.APIView):
         """Revoke an agent token by ID."""
         try:
             token = AgentToken.objects.get(id=token_id, user=request.user, is_active=True)
-            token.is_active = False
-            token.save()
-            return Response({"status": "revoked", "id": token_id})
         except AgentToken.DoesNotExist:
             return Response(
                 {"error": "Token not found or already revoked."},
                 status=status.HTTP_404_NOT_FOUND
             )
+        token.is_active = False
+        token.save()
+        # Connected agents using this token disconnect immediately; the token
+        # is already revoked, so a broadcast failure only delays that
+        try:
+            async_to_sync(get_channel_layer().group_send)(
+                AgentToken.revocation_group(token.token_hash),
+                {"type": "token_revoked"},
+            )
+        except Exception as e:  # pylint: disable=broad-except
+            logger.error("Failed to broadcast revocation of token %s: %s", token_id, e)
+        return Response({"status": "revoked", "id": token_id})
 
 
 class HealthCheckView(views.APIView):
@@ -99,3 +117,14 @@ class HealthCheckView(views.APIView):
             "timestamp": timezone.now().isoformat(),
             "version": "2.1"
         })
+
+
+def metrics_view(request):
+    """Expose process metrics in Prometheus text format."""
+    if settings.METRICS_TOKEN:
+        header = request.headers.get("Authorization", "")
+        if not constant_time_compare(header, f"Bearer {settings.METRICS_TOKEN}"):
+            return HttpResponse(status=401)
+    return HttpResponse(
+        REGISTRY.render(), content_type="text/plain; version=0.0.4; charset=utf-8",
+    )
@@ -0,0 +1,47 @@
+# Generated by Django 6.1.2 on 2026-10-19 06:36
+
+from django.conf import settings
+from django.db import migrations, models
+
+BATCH_SIZE = 1000
+
+
+def backfill_balance_after(apps, schema_editor):
+    """Walk each user's ledger back from their current balance."""
+    CreditLog = apps.get_model('payments', 'CreditLog')
+    User = apps.get_model(*settings.AUTH_USER_MODEL.split('.'))
+    user_ids = CreditLog.objects.values_list('user_id', flat=True).distinct()
+    for user in User.objects.filter(id__in=user_ids).only('id', 'wallet_balance'):
+        balance = user.wallet_balance
+        batch = []
+        for log in CreditLog.objects.filter(user_id=user.id).order_by(
+            '-created_at', '-id',
+        ).only('id', 'amount').iterator(chunk_size=BATCH_SIZE):
+            log.balance_after = balance
+            balance -= log.amount
+            batch.append(log)
+            if len(batch) == BATCH_SIZE:
+                CreditLog.objects.bulk_update(batch, ['balance_after'])
+                batch = []
+        CreditLog.objects.bulk_update(batch, ['balance_after'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='creditlog',
+            name='balance_after',
+            field=models.DecimalField(decimal_places=2, max_digits=12, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='creditlog',
+            index=models.Index(fields=['user', '-created_at', '-id'], name='creditlog_user_created_idx'),
+        ),
+        migrations.RunPython(backfill_balance_after, migrations.RunPython.noop),
+    ]
@@ -27,9 +27,33 @@ class Transaction(models.Model):
         return f"{self.type} - {self.amount} - {self.status}"
 
 class CreditLog(models.Model):
-    """Ledger entry tracking wallet balance changes."""
+    """Ledger entry tracking wallet balance changes.
+
+    ``balance_after`` is the wallet balance once the entry was applied, so
+    any page of the ledger shows balances without summing earlier rows.
+    """
 
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     amount = models.DecimalField(max_digits=12, decimal_places=2)
+    balance_after = models.DecimalField(max_digits=12, decimal_places=2, null=True)
     description = models.CharField(max_length=255)
     created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        """Index the per-user ledger in page order."""
+        indexes = [
+            models.Index(
+                fields=['user', '-created_at', '-id'],
+                name='creditlog_user_created_idx',
+            ),
+        ]
+
+    @classmethod
+    def record(cls, user, amount, description):
+        """Append an entry for a change already applied to ``user.wallet_balance``."""
+        return cls.objects.create(
+            user=user,
+            amount=amount,
+            balance_after=user.wallet_balance,
+            description=description,
+        )
@@ -1,6 +1,7 @@
 """Business logic for wallet credits and payment processing."""
 from django.contrib.auth import get_user_model
 from django.db import transaction
+from django.db.models import F
 
 from .models import CreditLog, Transaction
 
@@ -9,6 +10,32 @@ User = get_user_model()
 
 class CreditService:
     """Service class for processing transactions and credit transfers."""
+
+    @staticmethod
+    def debit(user, amount):
+        """Take ``amount`` from ``user``'s wallet if the balance covers it.
+
+        A single conditional ``UPDATE``, so concurrent debits can neither
+        overdraw the wallet nor overwrite each other. Returns whether the
+        debit happened; if so ``user.wallet_balance`` is the new balance.
+        Run it in the transaction that writes the ledger entry, which keeps
+        the row locked until that entry is in.
+        """
+        taken = User.objects.filter(pk=user.pk, wallet_balance__gte=amount).update(
+            wallet_balance=F("wallet_balance") - amount,
+        )
+        if taken:
+            user.refresh_from_db(fields=["wallet_balance"])
+        return bool(taken)
+
+    @staticmethod
+    def credit(user, amount):
+        """Add ``amount`` to ``user``'s wallet in a single ``UPDATE``."""
+        User.objects.filter(pk=user.pk).update(
+            wallet_balance=F("wallet_balance") + amount,
+        )
+        user.refresh_from_db(fields=["wallet_balance"])
+
     @staticmethod
     @transaction.atomic
     def process_transaction(transaction_id):
@@ -22,29 +49,27 @@ class CreditService:
 
             user = txn.user
             if txn.type == 'DEPOSIT':
-                user.wallet_balance += txn.amount
-                CreditLog.objects.create(
-                    user=user,
+                CreditService.credit(user, txn.amount)
+                CreditLog.record(
+                    user,
                     amount=txn.amount,
-                    description=f"Deposit via {txn.gateway_id}"
+                    description=f"Deposit via {txn.gateway_id}",
                 )
                 txn.status = 'SUCCESS'
             elif txn.type == 'WITHDRAWAL':
-                if user.wallet_balance < txn.amount:
+                if not CreditService.debit(user, txn.amount):
                     txn.status = 'FAILED'
                     txn.save()
                     return False
 
-                user.wallet_balance -= txn.amount
-                CreditLog.objects.create(
-                    user=user,
+                CreditLog.record(
+                    user,
                     amount=-txn.amount,
-                    description="Withdrawal request"
+                    description="Withdrawal request",
                 )
                 txn.status = 'SUCCESS'
 
             txn.save()
-            user.save()
             return True
         except Transaction.DoesNotExist:
             return False
@@ -55,21 +80,17 @@ class CreditService:
         """
         Transfers credits from Consumer (sender) to Provider (receiver).
         """
-        if sender.wallet_balance < amount:
+        if not CreditService.debit(sender, amount):
             raise ValueError("Insufficient funds")
-
-        sender.wallet_balance -= amount
-        sender.save()
-        CreditLog.objects.create(
-            user=sender,
+        CreditLog.record(
+            sender,
             amount=-amount,
             description=f"Payment for Job {job_id}",
         )
 
-        receiver.wallet_balance += amount
-        receiver.save()
-        CreditLog.objects.create(
-            user=receiver,
+        CreditService.credit(receiver, amount)
+        CreditLog.record(
+            receiver,
             amount=amount,
             description=f"Earnings for Job {job_id}",
         )
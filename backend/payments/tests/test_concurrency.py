@@ -0,0 +1,114 @@
+"""
+Test Suite: Concurrent wallet updates
+Covers: parallel job submissions and credits keep the ledger consistent
+"""
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+
+import pytest
+from django.db import OperationalError, connection, transaction
+from rest_framework.test import APIClient
+
+from computing.models import Job, Node
+from core.models import User
+from payments.models import CreditLog
+from payments.services import CreditService
+
+SUBMISSIONS = 2000
+WORKERS = 16
+
+
+def _parallel(func, count):
+    """Run ``func(i)`` for ``count`` values of ``i`` on ``WORKERS`` threads.
+
+    Returns a Counter of the results. SQLite's shared-cache test database
+    rejects some concurrent writers with "table is locked" where Postgres
+    would wait; those calls are counted as "locked".
+    """
+    def run(i):
+        try:
+            return func(i)
+        except OperationalError:
+            return "locked"
+        finally:
+            connection.close()
+
+    with ThreadPoolExecutor(WORKERS) as pool:
+        return Counter(pool.map(run, range(count)))
+
+
+def _assert_ledger_consistent(user, opening):
+    """The wallet equals the opening balance plus its ledger, entry by entry."""
+    user.refresh_from_db()
+    assert user.wallet_balance >= 0
+    balance = opening
+    for amount, balance_after in CreditLog.objects.filter(user=user).order_by(
+        "id",
+    ).values_list("amount", "balance_after"):
+        balance += amount
+        assert balance_after == balance
+    assert user.wallet_balance == balance
+
+
+@pytest.mark.django_db(transaction=True)
+class TestConcurrentWallets:
+    """Balance updates are conditional UPDATEs, so no write is lost."""
+
+    def setup_method(self):
+        self.consumer = User.objects.create_user(
+            username='racer', password='p', wallet_balance=Decimal('500.00'),
+        )
+        self.provider = User.objects.create_user(
+            username='race_provider', password='p', wallet_balance=Decimal('0.00'),
+        )
+        Node.objects.create(
+            owner=self.provider, node_id='race-node', name='Race Node',
+            gpu_info={'models': ['llama2']}, is_active=True,
+        )
+
+    def test_parallel_submissions(self):  # pylint: disable=missing-function-docstring
+        def submit(_):
+            client = APIClient()
+            # Each request reads its own, soon stale, copy of the user row
+            client.force_authenticate(user=User.objects.get(id=self.consumer.id))
+            return client.post(
+                '/api/computing/submit-job/',
+                {'prompt': 'hi', 'model': 'llama2'}, format='json',
+            ).status_code
+
+        codes = _parallel(submit, SUBMISSIONS)
+
+        # A lock error can strike after the debit commits (while dispatching),
+        # so the committed ledger, not the responses, counts the debits
+        assert set(codes) <= {201, 402, "locked"}
+        debits = CreditLog.objects.filter(user=self.consumer, amount__lt=0).count()
+        assert Job.objects.filter(user=self.consumer).count() == debits
+        assert codes[201] <= debits <= codes[201] + codes["locked"]
+        _assert_ledger_consistent(self.consumer, Decimal('500.00'))
+        assert self.consumer.wallet_balance == Decimal('500.00') - debits * Decimal('1.00')
+        # The balance only falls, so a refusal means it was spent down to zero
+        assert debits <= 500
+        if codes[402]:
+            assert self.consumer.wallet_balance == 0
+
+    def test_parallel_debits_and_credits(self):  # pylint: disable=missing-function-docstring
+        def move(i):
+            with transaction.atomic():
+                user = User.objects.get(id=self.consumer.id)
+                if i % 3:
+                    if not CreditService.debit(user, Decimal('1.00')):
+                        return 'refused'
+                    CreditLog.record(user, amount=Decimal('-1.00'), description='debit')
+                    return 'debit'
+                CreditService.credit(user, Decimal('1.00'))
+                CreditLog.record(user, amount=Decimal('1.00'), description='credit')
+                return 'credit'
+
+        results = _parallel(move, SUBMISSIONS)
+
+        assert set(results) <= {'debit', 'credit', 'refused', 'locked'}
+        _assert_ledger_consistent(self.consumer, Decimal('500.00'))
+        assert self.consumer.wallet_balance == (
+            Decimal('500.00') + results['credit'] - results['debit']
+        )
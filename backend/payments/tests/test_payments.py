@@ -197,6 +197,45 @@ class TestWalletBalanceView:
         assert resp.status_code == 200
         assert len(resp.data['logs']) == 1
 
+    def test_logs_carry_running_balance(self):
+        """Each entry shows the balance it left, newest first."""
+        other = User.objects.create_user(username='other', password='p')
+        CreditService.transfer_credits(self.user, other, Decimal('5.00'), job_id=1)
+        CreditService.transfer_credits(other, self.user, Decimal('2.00'), job_id=2)
+        self.client.force_authenticate(user=self.user)
+        logs = self.client.get(reverse('wallet')).data['logs']
+        assert [log['balance_after'] for log in logs] == ['72.00', '70.00']
+
+    def test_logs_paginate(self):
+        """limit and cursor page through the ledger."""
+        for i in range(5):
+            CreditLog.objects.create(
+                user=self.user, amount=Decimal('1.00'), description=f'Entry {i}'
+            )
+        self.client.force_authenticate(user=self.user)
+        url = reverse('wallet')
+        first = self.client.get(url, {'limit': 3}).data
+        rest = self.client.get(url, {'limit': 3, 'cursor': first['next']}).data
+        descriptions = [log['description'] for log in first['logs'] + rest['logs']]
+        assert descriptions == [f'Entry {i}' for i in range(4, -1, -1)]
+        assert rest['next'] is None
+
+    def test_page_query_count_is_constant(self, django_assert_num_queries):
+        """A page costs the same whatever the ledger length."""
+        CreditLog.objects.bulk_create(
+            CreditLog(user=self.user, amount=Decimal('1.00'), description='x')
+            for _ in range(300)
+        )
+        self.client.force_authenticate(user=self.user)
+        with django_assert_num_queries(1):
+            resp = self.client.get(reverse('wallet'), {'limit': 20})
+        assert len(resp.data['logs']) == 20
+
+    def test_invalid_cursor_returns_400(self):  # pylint: disable=missing-function-docstring
+        self.client.force_authenticate(user=self.user)
+        resp = self.client.get(reverse('wallet'), {'cursor': '!!'})
+        assert resp.status_code == 400
+
 
 @pytest.mark.django_db
 class TestDepositView:
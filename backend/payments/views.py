@@ -3,6 +3,8 @@ from rest_framework import generics, permissions, status
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from core.pagination import PaginationError, keyset_page, page_size
+
 from .models import Transaction, CreditLog
 from .serializers import TransactionSerializer, CreditLogSerializer
 from .services import CreditService
@@ -14,12 +16,23 @@ class WalletBalanceView(APIView):
     permission_classes = (permissions.IsAuthenticated,)
 
     def get(self, request):
-        """Return wallet balance and recent credit log entries."""
-        logs = CreditLog.objects.filter(user=request.user).order_by('-created_at')
-        serializer = CreditLogSerializer(logs, many=True)
+        """Return wallet balance and one page of credit log entries, newest first.
+
+        Pass the returned ``next`` as ``cursor`` for older entries; each
+        entry carries its own ``balance_after``.
+        """
+        logs = CreditLog.objects.filter(user=request.user)
+        try:
+            page, next_cursor = keyset_page(
+                logs, request.query_params.get('cursor'),
+                page_size(request.query_params),
+            )
+        except PaginationError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
         return Response({
             "balance": request.user.wallet_balance,
-            "logs": serializer.data
+            "logs": CreditLogSerializer(page, many=True).data,
+            "next": next_cursor,
         })
 
 class DepositView(generics.CreateAPIView):
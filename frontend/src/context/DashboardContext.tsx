@@ -26,12 +26,22 @@ interface JobInfo {
   completed_at: string | null;
   session_id?: string;
   streamed_text?: string;
+  stream_seq?: number;
 }
 
 export interface ChatSession {
   id: string;
   name: string;
   jobs: JobInfo[];
+  // Summary from the session list; jobs hold only the pages loaded so far
+  message_count?: number;
+  completed_count?: number;
+  total_cost?: string | null;
+  models?: string[];
+  last_message?: Pick<JobInfo, 'id' | 'status' | 'prompt' | 'model' | 'created_at'> | null;
+  last_message_at?: string | null;
+  messagesLoaded?: boolean;
+  olderCursor?: string | null;
 }
 
 interface DashboardContextType {
@@ -46,6 +56,9 @@ interface DashboardContextType {
   setSessions: React.Dispatch<React.SetStateAction<ChatSession[]>>;
   activeSessionId: string;
   setActiveSessionId: (id: string) => void;
+  loadOlderMessages: (sessionId: string) => Promise<void>;
+  sessionsCursor: string | null;
+  loadMoreSessions: () => Promise<void>;
 }
 
 const DashboardContext = createContext<DashboardContextType>({
@@ -59,7 +72,10 @@ const DashboardContext = createContext<DashboardContextType>({
   sessions: [],
   setSessions: () => {},
   activeSessionId: 'default',
-  setActiveSessionId: () => {}
+  setActiveSessionId: () => {},
+  loadOlderMessages: async () => {},
+  sessionsCursor: null,
+  loadMoreSessions: async () => {}
 });
 
 export const useDashboard = () => useContext(DashboardContext);
@@ -84,29 +100,108 @@ export const DashboardProvider: React.FC<{ children: React.ReactNode }> = ({ chi
     activeSessionIdRef.current = id;
     setActiveSessionId(id);
   };
+  // Latest sessions for the socket callbacks, and tasks awaiting a stream replay
+  const sessionsRef = useRef<ChatSession[]>(sessions);
+  sessionsRef.current = sessions;
+  const resumingRef = useRef<Set<number>>(new Set());
+  // Cursor of the next page of session summaries, null once all are loaded
+  const [sessionsCursor, setSessionsCursor] = useState<string | null>(null);
+  const loadingSessionsRef = useRef(false);
 
-  // Fetch sessions from REST
+  const apiUrl = import.meta.env.VITE_API_URL || 'http://localhost:8000';
+
+  // Fetch one page of session summaries; later pages are appended
+  const fetchSessions = async (cursor?: string | null) => {
+    if (loadingSessionsRef.current) return;
+    loadingSessionsRef.current = true;
+    try {
+      const res: any = await axios.get(`${apiUrl}/api/computing/sessions/`, {
+        headers: { Authorization: `Bearer ${token}` },
+        params: cursor ? { cursor } : undefined
+      });
+      const page: ChatSession[] = (res.data?.results || []).map((s: any) => ({ ...s, jobs: [] }));
+      setSessions(prev => {
+        if (!cursor) {
+          const def = prev.find(p => p.id === 'default');
+          return def ? [def, ...page] : page;
+        }
+        // Sessions created since the first page may already be listed
+        const known = new Set(prev.map(p => p.id));
+        return [...prev, ...page.filter(s => !known.has(s.id))];
+      });
+      setSessionsCursor(res.data?.next || null);
+    } catch (err) {
+      console.error('Failed to fetch sessions', err);
+    } finally {
+      loadingSessionsRef.current = false;
+    }
+  };
+
+  // Load the newest page of sessions; older ones load on demand
   useEffect(() => {
     if (!token) return;
-    const fetchSessions = async () => {
+    fetchSessions();
+  }, [token]);
+
+  const loadMoreSessions = async () => {
+    if (sessionsCursor) await fetchSessions(sessionsCursor);
+  };
+
+  // Merge a page of messages into a session, keeping jobs already held
+  const mergeMessages = (sessionId: string, page: JobInfo[], olderCursor: string | null) => {
+    setSessions(prev => prev.map(session => {
+      if (session.id !== sessionId) return session;
+      const pageIds = new Set(page.map(j => j.id));
+      return {
+        ...session,
+        jobs: [...page, ...session.jobs.filter(j => !pageIds.has(j.id))],
+        messagesLoaded: true,
+        olderCursor
+      };
+    }));
+  };
+
+  // Large results arrive as blob references; fetch the full documents
+  const resolveResults = (jobs: JobInfo[]): Promise<JobInfo[]> =>
+    Promise.all(jobs.map(async job => {
+      if (!job.result?.blob) return job;
       try {
-        const res = await axios.get(`${import.meta.env.VITE_API_URL || 'http://localhost:8000'}/api/computing/sessions/`, {
+        const res = await axios.get(`${apiUrl}/api/computing/jobs/${job.id}/result/`, {
           headers: { Authorization: `Bearer ${token}` }
         });
-        const backendSessions = res.data.map((s: any) => ({
-          ...s,
-          jobs: s.jobs || []
-        }));
-        setSessions(prev => {
-          const def = prev.find(p => p.id === 'default');
-          return def ? [def, ...backendSessions] : backendSessions;
-        });
+        return { ...job, result: res.data };
       } catch (err) {
-        console.error('Failed to fetch sessions', err);
+        console.error(`Failed to fetch the result of job ${job.id}`, err);
+        return job;
       }
-    };
-    fetchSessions();
-  }, [token]);
+    }));
+
+  const fetchMessages = async (sessionId: string, cursor?: string | null) => {
+    const res = await axios.get(`${apiUrl}/api/computing/sessions/${sessionId}/messages/`, {
+      headers: { Authorization: `Bearer ${token}` },
+      params: cursor ? { cursor } : undefined
+    });
+    const page = await resolveResults(res.data?.results || []);
+    mergeMessages(sessionId, page, res.data?.next || null);
+  };
+
+  // Load the newest page of messages when a session is first opened
+  useEffect(() => {
+    if (!token || activeSessionId === 'default') return;
+    const session = sessionsRef.current.find(s => s.id === activeSessionId);
+    if (!session || session.messagesLoaded) return;
+    fetchMessages(activeSessionId).catch(err => console.error('Failed to fetch messages', err));
+  }, [token, activeSessionId]);
+
+  const loadOlderMessages = async (sessionId: string) => {
+    const session = sessionsRef.current.find(s => s.id === sessionId);
+    if (!session?.olderCursor) return;
+    try {
+      await fetchMessages(sessionId, session.olderCursor);
+    } catch (err) {
+      console.error('Failed to fetch older messages', err);
+    }
+  };
 
   // Distribute incoming recentJobs into sessions (fully immutable updates)
   useEffect(() => {
@@ -165,6 +260,18 @@ export const DashboardProvider: React.FC<{ children: React.ReactNode }> = ({ chi
     socket.onopen = () => {
       console.log('Dashboard WS Connected');
       setLoading(false);
+      // Ask for stream text missed while disconnected; live frames for these
+      // tasks are ignored until the replay arrives
+      resumingRef.current = new Set();
+      sessionsRef.current.forEach(session => session.jobs.forEach((job: any) => {
+        if (job.status !== 'PENDING' || resumingRef.current.has(job.id)) return;
+        resumingRef.current.add(job.id);
+        socket.send(JSON.stringify({
+          type: 'resume',
+          task_id: job.id,
+          last_seq: job.stream_seq ?? 0,
+        }));
+      }));
     };
 
     socket.onmessage = (event) => {
@@ -185,6 +292,32 @@ export const DashboardProvider: React.FC<{ children: React.ReactNode }> = ({ chi
     ws.current = socket;
   };
 
+  const appendStreamText = (msg: any) => {
+    setSessions(prev =>
+      prev.map(session => {
+        const jobIndex = session.jobs.findIndex((j: any) => j.id === msg.task_id);
+        if (jobIndex === -1) return session;
+        const oldJob = session.jobs[jobIndex];
+        // Frames are batched server-side and numbered per task; skip replays
+        if (msg.seq !== undefined && msg.seq <= (oldJob.stream_seq ?? 0)) return session;
+        const updatedJob = {
+          ...oldJob,
+          // A truncated replay carries the whole text so far, not a continuation
+          streamed_text: msg.truncated ? msg.chunk : (oldJob.streamed_text || '') + msg.chunk,
+          stream_seq: msg.seq ?? oldJob.stream_seq,
+        };
+        return {
+          ...session,
+          jobs: [
+            ...session.jobs.slice(0, jobIndex),
+            updatedJob,
+            ...session.jobs.slice(jobIndex + 1),
+          ],
+        };
+      })
+    );
+  };
+
   const handleMessage = (msg: any) => {
     switch (msg.type) {
       case 'stats_update':
@@ -197,8 +330,8 @@ export const DashboardProvider: React.FC<{ children: React.ReactNode }> = ({ chi
         setBalance(parseFloat(msg.balance));
         break;
       case 'jobs_update':
-        // Initial bulk list
-        setRecentJobs(msg.jobs);
+        // Initial bulk list; the server resolves offloaded results
+        setRecentJobs(msg.jobs || []);
         break;
       case 'job_update':
         // Single job update (prepend or update existing)
@@ -213,25 +346,12 @@ export const DashboardProvider: React.FC<{ children: React.ReactNode }> = ({ chi
         });
         break;
       case 'job_stream':
-        setSessions(prev =>
-          prev.map(session => {
-            const jobIndex = session.jobs.findIndex((j: any) => j.id === msg.task_id);
-            if (jobIndex === -1) return session;
-            const oldJob = session.jobs[jobIndex];
-            const updatedJob = {
-              ...oldJob,
-              streamed_text: (oldJob.streamed_text || '') + msg.chunk,
-            };
-            return {
-              ...session,
-              jobs: [
-                ...session.jobs.slice(0, jobIndex),
-                updatedJob,
-                ...session.jobs.slice(jobIndex + 1),
-              ],
-            };
-          })
-        );
+        if (resumingRef.current.has(msg.task_id)) break;
+        appendStreamText(msg);
+        break;
+      case 'job_stream_replay':
+        resumingRef.current.delete(msg.task_id);
+        if (msg.chunk) appendStreamText(msg);
         break;
       case 'provider_stats_update':
         setProviderStats(msg.stats);
@@ -269,7 +389,7 @@ export const DashboardProvider: React.FC<{ children: React.ReactNode }> = ({ chi
   }, [user]);
 
   return (
-    <DashboardContext.Provider value={{ stats, models, balance, recentJobs, providerStats, setProviderDays, loading, sessions, setSessions, activeSessionId, setActiveSessionId: _setActiveSessionId }}>
+    <DashboardContext.Provider value={{ stats, models, balance, recentJobs, providerStats, setProviderDays, loading, sessions, setSessions, activeSessionId, setActiveSessionId: _setActiveSessionId, loadOlderMessages, sessionsCursor, loadMoreSessions }}>
       {children}
     </DashboardContext.Provider>
   );
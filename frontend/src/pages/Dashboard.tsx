@@ -1,6 +1,6 @@
 import React, { useState, useEffect } from 'react';
 import { useAuth } from '../context/AuthContext';
-import { useDashboard } from '../context/DashboardContext';
+import { useDashboard, type ChatSession } from '../context/DashboardContext';
 import { LayoutDashboard, Wallet, Server, RefreshCw, TrendingUp, Cpu, ArrowUpRight, ArrowDownRight, Filter, MessageSquare, Plus, Send, Zap, Loader2, User, ChevronUp, Pencil, Check } from 'lucide-react';
 import { AreaChart, Area, BarChart, Bar, XAxis, YAxis, CartesianGrid, Tooltip, ResponsiveContainer, PieChart, Pie, Cell } from 'recharts';
 import axios from 'axios';
@@ -46,15 +46,41 @@ const WalletCard = ({ balance, onRefresh }: { balance: number, onRefresh: () =>
 );
 
 /* ===== Recent Chats (Overview) ===== */
+// Totals from loaded jobs once the whole history is held, else from the list summary
+const summarizeSession = (session: ChatSession) => {
+  const jobs = session.jobs;
+  const last = jobs.length ? jobs[jobs.length - 1] : session.last_message;
+  const jobModels = jobs.map(j => j.model).filter(Boolean) as string[];
+  if (session.message_count === undefined || (session.messagesLoaded && !session.olderCursor)) {
+    return {
+      count: jobs.length,
+      successful: jobs.filter(j => j.status === 'COMPLETED').length,
+      models: Array.from(new Set(jobModels)),
+      totalCost: jobs.reduce((sum, j) => sum + (parseFloat(j.cost || '0') || 0), 0),
+      last,
+    };
+  }
+  return {
+    count: Math.max(session.message_count, jobs.length),
+    successful: session.completed_count || 0,
+    models: Array.from(new Set([...(session.models || []), ...jobModels])),
+    totalCost: parseFloat(session.total_cost || '0') || 0,
+    last,
+  };
+};
+
 const RecentChats = ({ onSelectChat }: { onSelectChat: (id: string) => void }) => {
   const { sessions } = useDashboard();
 
   // Show only sessions that have jobs
-  const activeSessions = sessions.filter(s => s.jobs.length > 0).sort((a, b) => {
-    const tA = a.jobs.length ? new Date(a.jobs[a.jobs.length-1].created_at).getTime() : 0;
-    const tB = b.jobs.length ? new Date(b.jobs[b.jobs.length-1].created_at).getTime() : 0;
-    return tB - tA;
-  });
+  const activeSessions = sessions
+    .map(session => ({ session, summary: summarizeSession(session) }))
+    .filter(({ summary }) => summary.count > 0)
+    .sort((a, b) => {
+      const tA = a.summary.last ? new Date(a.summary.last.created_at).getTime() : 0;
+      const tB = b.summary.last ? new Date(b.summary.last.created_at).getTime() : 0;
+      return tB - tA;
+    });
 
   return (
     <div className="glass-card">
@@ -68,10 +94,9 @@ const RecentChats = ({ onSelectChat }: { onSelectChat: (id: string) => void }) =
           </div>
         ) : (
           <div style={{ display: 'flex', flexDirection: 'column', gap: '12px', maxHeight: '500px', overflowY: 'auto', paddingRight: '8px' }}>
-            {activeSessions.map(session => {
-              const successful = session.jobs.filter(j => j.status === 'COMPLETED').length;
-              const uniqueModels = Array.from(new Set(session.jobs.map(j => j.model))).filter(Boolean) as string[];
-              const totalCost = session.jobs.reduce((sum, j) => sum + (parseFloat(j.cost || '0') || 0), 0);
+            {activeSessions.map(({ session, summary }) => {
+              const { successful, totalCost } = summary;
+              const uniqueModels = summary.models;
 
               return (
               <div 
@@ -104,7 +129,7 @@ const RecentChats = ({ onSelectChat }: { onSelectChat: (id: string) => void }) =
                     </span>
                     <div style={{ fontSize: '12px', color: 'var(--text-muted)', marginTop: '6px', display: 'flex', gap: '12px', alignItems: 'center' }}>
                       <span style={{ display: 'flex', alignItems: 'center', gap: '4px' }}>
-                        <MessageSquare size={12} /> {session.jobs.length} Msgs
+                        <MessageSquare size={12} /> {summary.count} Msgs
                       </span>
                       {successful > 0 && <span style={{color: 'var(--success)'}}>({successful} successful)</span>}
                       {uniqueModels.length > 0 && (
@@ -120,9 +145,9 @@ const RecentChats = ({ onSelectChat }: { onSelectChat: (id: string) => void }) =
                     </div>
                   )}
                 </div>
-                {session.jobs.length > 0 && (
+                {summary.last && (
                   <p style={{ fontSize: '13px', color: 'var(--text-muted)', margin: 0, whiteSpace: 'nowrap', overflow: 'hidden', textOverflow: 'ellipsis', background: 'rgba(0,0,0,0.2)', padding: '8px 12px', borderRadius: '6px' }}>
-                    {session.jobs[session.jobs.length - 1]?.prompt}
+                    {summary.last.prompt}
                   </p>
                 )}
               </div>
@@ -680,7 +705,7 @@ const ProviderDashboard = ({ token }: { token: string | null }) => {
 
 /* ===== PLAYGROUND / CHAT DASHBOARD ===== */
 const PlaygroundDashboard = ({ token }: { token: string | null }) => {
-  const { models, loading: loadingModels, sessions, setSessions, activeSessionId, setActiveSessionId, balance } = useDashboard();
+  const { models, loading: loadingModels, sessions, setSessions, activeSessionId, setActiveSessionId, balance, loadOlderMessages, sessionsCursor, loadMoreSessions } = useDashboard();
   const [prompt, setPrompt] = useState('');
   const [selectedModel, setSelectedModel] = useState('');
   const [submitting, setSubmitting] = useState(false);
@@ -827,7 +852,14 @@ const PlaygroundDashboard = ({ token }: { token: string | null }) => {
           </button>
         </div>
         
-        <div style={{ flex: 1, overflowY: 'auto', padding: '0 16px 16px', display: 'flex', flexDirection: 'column', gap: '8px' }}>
+        <div
+          style={{ flex: 1, overflowY: 'auto', padding: '0 16px 16px', display: 'flex', flexDirection: 'column', gap: '8px' }}
+          onScroll={e => {
+            // Fetch the next page of sessions as the list nears its end
+            const el = e.currentTarget;
+            if (sessionsCursor && el.scrollHeight - el.scrollTop - el.clientHeight < 80) loadMoreSessions();
+          }}
+        >
           <div style={{ fontSize: '11px', color: 'var(--text-muted)', textTransform: 'uppercase', letterSpacing: '0.5px', marginBottom: '8px', marginTop: '8px' }}>
             Recent Sessions
           </div>
@@ -924,6 +956,18 @@ const PlaygroundDashboard = ({ token }: { token: string | null }) => {
               </button>
             </div>
           ))}
+          {sessionsCursor && (
+            <button
+              onClick={() => loadMoreSessions()}
+              style={{
+                alignSelf: 'center', padding: '6px 14px', background: 'transparent',
+                color: 'var(--text-muted)', border: '1px solid var(--border)',
+                borderRadius: '8px', fontSize: '13px', cursor: 'pointer'
+              }}
+            >
+              Load more sessions
+            </button>
+          )}
         </div>
       </div>
 
@@ -944,7 +988,20 @@ const PlaygroundDashboard = ({ token }: { token: string | null }) => {
               </p>
             </div>
           ) : (
-            chatJobs.map(job => (
+            <>
+            {activeSession?.olderCursor && (
+              <button
+                onClick={() => loadOlderMessages(activeSession.id)}
+                style={{
+                  alignSelf: 'center', padding: '6px 14px', background: 'transparent',
+                  color: 'var(--text-muted)', border: '1px solid var(--border)',
+                  borderRadius: '8px', fontSize: '13px', cursor: 'pointer'
+                }}
+              >
+                <ChevronUp size={14} /> Load earlier messages
+              </button>
+            )}
+            {chatJobs.map(job => (
               <React.Fragment key={job.id}>
                 {/* User Prompt */}
                 <div style={{ display: 'flex', gap: '16px', flexDirection: 'row-reverse' }}>
@@ -1012,7 +1069,8 @@ const PlaygroundDashboard = ({ token }: { token: string | null }) => {
                   </div>
                 </div>
               </React.Fragment>
-            ))
+            ))}
+            </>
           )}
         </div>
 
@@ -38,6 +38,17 @@ const TestDashboardComponent = () => {
   )
 }
 
+const SessionsComponent = () => {
+  const { sessions, sessionsCursor, loadMoreSessions } = useDashboard()
+  return (
+    <div>
+      <div data-testid="sessions">{sessions.map(s => s.id).join(',')}</div>
+      <div data-testid="cursor">{sessionsCursor ?? 'none'}</div>
+      <button onClick={() => loadMoreSessions()}>more</button>
+    </div>
+  )
+}
+
 describe('DashboardContext', () => {
   beforeEach(() => {
     localStorage.clear()
@@ -99,4 +110,39 @@ describe('DashboardContext', () => {
     expect(screen.getByTestId('models')).toHaveTextContent('0')
     expect(screen.getByTestId('jobs')).toHaveTextContent('0')
   })
+
+  it('should load session pages on demand', async () => {
+    localStorage.setItem('token', 'test-token')
+    vi.mocked(axios.get).mockImplementation(async (url: string, config?: any) => {
+      if (!url.endsWith('/api/computing/sessions/')) {
+        return { data: { id: 1, username: 'testuser', role: 'USER', wallet_balance: 50 } }
+      }
+      return config?.params?.cursor === 'page2'
+        ? { data: { results: [{ id: 's2', name: 'Older' }], next: null } }
+        : { data: { results: [{ id: 's1', name: 'Newest' }], next: 'page2' } }
+    })
+
+    render(
+      <AuthProvider>
+        <DashboardProvider>
+          <SessionsComponent />
+        </DashboardProvider>
+      </AuthProvider>
+    )
+
+    await waitFor(() => {
+      expect(screen.getByTestId('sessions')).toHaveTextContent('default,s1')
+    })
+    expect(screen.getByTestId('cursor')).toHaveTextContent('page2')
+    const sessionCalls = () => vi.mocked(axios.get).mock.calls
+      .filter(([url]) => String(url).endsWith('/api/computing/sessions/'))
+    expect(sessionCalls()).toHaveLength(1)
+
+    screen.getByText('more').click()
+    await waitFor(() => {
+      expect(screen.getByTestId('sessions')).toHaveTextContent('default,s1,s2')
+    })
+    expect(screen.getByTestId('cursor')).toHaveTextContent('none')
+    expect(sessionCalls()).toHaveLength(2)
+  })
 })